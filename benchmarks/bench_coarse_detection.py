@@ -0,0 +1,112 @@
+"""Full resolution vs coarse-to-fine point detection on high resolution images.
+
+    python benchmarks/bench_coarse_detection.py --width 6000 --height 4000
+"""
+
+import argparse
+import time
+
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.funcs import find_points
+
+
+def render_board(pattern, nx, ny, width, height, rng):
+    """Render a warped pattern, returning the image and true point positions."""
+    square = 100
+    if pattern == "Checkerboard":
+        board_w, board_h = (nx + 3) * square, (ny + 3) * square
+        board = np.full((board_h, board_w), 255, np.uint8)
+        for i in range(nx + 1):
+            for j in range(ny + 1):
+                if (i + j) % 2 == 0:
+                    x, y = (i + 1) * square, (j + 1) * square
+                    board[y : y + square, x : x + square] = 0
+        grid = np.mgrid[0:nx, 0:ny].T.reshape(-1, 2) + 2
+        points = grid * square - 0.5  # corners lie between pixel centres
+        max_scale = np.inf
+    else:
+        step = 2 if pattern == "Asymmetric Circles" else 1
+        board_w, board_h = (nx * step + 2) * square, (ny + 2) * square
+        board = np.full((board_h, board_w), 255, np.uint8)
+        grid = np.mgrid[0:nx, 0:ny].T.reshape(-1, 2).astype(np.float64)
+        if step == 2:
+            grid[:, 0] = grid[:, 0] * 2 + grid[:, 1] % 2
+        points = (grid + 1.5) * square
+        radius = square // 5
+        # keep the blobs below the default blob detector's maximum area (5000 px)
+        max_scale = 25 / radius
+        for x, y in points:
+            cv.circle(
+                board, (int(x * 16), int(y * 16)), radius * 16, 0, -1, cv.LINE_AA, 4
+            )
+
+    src = np.float32([[0, 0], [board_w, 0], [board_w, board_h], [0, board_h]])
+    scale = min(0.7 * min(width / board_w, height / board_h), max_scale)
+    dst = src * scale + np.float32([width * 0.15, height * 0.15])
+    dst += rng.uniform(-0.05, 0.05, (4, 2)).astype(np.float32) * min(width, height)
+    homography = cv.getPerspectiveTransform(src, dst)
+
+    img = cv.warpPerspective(
+        board, homography, (width, height), flags=cv.INTER_AREA, borderValue=255
+    )
+    img = cv.GaussianBlur(img, (0, 0), 1.0)
+    noise = rng.normal(0, 2, img.shape)
+    img = np.clip(img + noise, 0, 255).astype(np.uint8)
+
+    true_points = cv.perspectiveTransform(
+        points.reshape(-1, 1, 2).astype(np.float64), homography
+    )
+    return cv.cvtColor(img, cv.COLOR_GRAY2BGR), true_points.astype(np.float32)
+
+
+def point_error(imgpoints, true_points):
+    # symmetric grids may be reported in either order, match to the nearest
+    dists = np.linalg.norm(
+        imgpoints.reshape(-1, 1, 2) - true_points.reshape(1, -1, 2), axis=-1
+    )
+    return dists.min(axis=1).mean()
+
+
+def run(pattern, nx, ny, width, height, n_images, seed=0):
+    rng = np.random.default_rng(seed)
+    results = {False: [], True: []}
+    for _ in range(n_images):
+        img, true_points = render_board(pattern, nx, ny, width, height, rng)
+        for coarse in results:
+            start = time.perf_counter()
+            _, ret, _, imgpoints = find_points(img, nx, ny, pattern, coarse=coarse)
+            elapsed = time.perf_counter() - start
+            error = point_error(imgpoints, true_points) if ret else np.nan
+            results[coarse].append((elapsed, ret, error))
+    return {k: np.array(v, dtype=float) for k, v in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=6000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--images", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.width} x {args.height}, {args.images} images per pattern")
+    print(f"{'pattern':<20}{'mode':<16}{'time (s)':>10}{'found':>8}{'error (px)':>12}")
+    for pattern, nx, ny in [
+        ("Checkerboard", 9, 6),
+        ("Circles", 7, 6),
+        ("Asymmetric Circles", 4, 11),
+    ]:
+        results = run(pattern, nx, ny, args.width, args.height, args.images)
+        for coarse, label in [(False, "full"), (True, "coarse-to-fine")]:
+            elapsed, found, error = results[coarse].T
+            print(
+                f"{pattern:<20}{label:<16}{elapsed.mean():>10.3f}"
+                f"{int(found.sum()):>5}/{len(found):<2}{np.nanmean(error):>12.3f}"
+            )
+        speedup = results[False][:, 0].mean() / results[True][:, 0].mean()
+        print(f"{pattern:<20}{'speedup':<16}{speedup:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
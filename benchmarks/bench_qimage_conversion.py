@@ -0,0 +1,66 @@
+"""Per-frame cost of converting OpenCV arrays to scaled display pixmaps.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_qimage_conversion.py
+"""
+
+import argparse
+import time
+
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.defs import QtGui, QtWidgets
+from camera_calibration.funcs import QImageBuffer
+
+
+def old_pixmap(img, width):
+    """Previous path: cvtColor to RGB, QImage over the temporary, full size pixmap."""
+    if img.ndim == 2:
+        img = cv.cvtColor(img, cv.COLOR_GRAY2BGR)
+    if img.dtype != np.uint8:
+        img = cv.convertScaleAbs(img, alpha=1 / 256)
+    height, w, _ = img.shape
+    rgb = cv.cvtColor(img, cv.COLOR_BGR2RGB)
+    qimage = QtGui.QImage(rgb.data, w, height, 3 * w, QtGui.QImage.Format_RGB888)
+    return QtGui.QPixmap(qimage).scaledToWidth(width)
+
+
+def time_per_frame(func, frames, width, repeats):
+    func(frames[0], width)
+    start = time.perf_counter()
+    for i in range(repeats):
+        func(frames[i % len(frames)], width)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--display-width", type=int, default=640)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication([])  # noqa: F841, pixmaps need a gui application
+    rng = np.random.default_rng(0)
+
+    print(f"display width {args.display_width}, ms per frame")
+    print(f"{'input':<26}{'old':>10}{'new':>10}{'speedup':>10}")
+    for width, height in [(640, 480), (1280, 960), (1920, 1080), (3840, 2160)]:
+        for label, shape, dtype in [
+            ("bgr8", (height, width, 3), np.uint8),
+            ("gray8", (height, width), np.uint8),
+            ("gray16", (height, width), np.uint16),
+        ]:
+            frames = [
+                rng.integers(0, np.iinfo(dtype).max, shape, dtype) for _ in range(4)
+            ]
+            buffer = QImageBuffer()
+            old = time_per_frame(old_pixmap, frames, args.display_width, args.repeats)
+            new = time_per_frame(
+                buffer.pixmap, frames, args.display_width, args.repeats
+            )
+            name = f"{width}x{height} {label}"
+            print(f"{name:<26}{old:>10.2f}{new:>10.2f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
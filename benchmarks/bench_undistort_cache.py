@@ -0,0 +1,68 @@
+"""Building undistortion maps vs the in-memory and on-disk map cache.
+
+    python benchmarks/bench_undistort_cache.py --width 3840 --height 2160
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from camera_calibration.funcs import UndistortMapCache, compute_undistort_maps
+
+
+def timed(func, repeats):
+    times = []
+    for _ in range(repeats):
+        t = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--fisheye", action="store_true")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    shape = (args.height, args.width, 3)
+    K = np.array(
+        [
+            [0.75 * args.width, 0, args.width / 2],
+            [0, 0.75 * args.width, args.height / 2],
+            [0, 0, 1],
+        ]
+    )
+    D = np.array([[-0.25, 0.08, 0.001, -0.0005, -0.01]])
+    if args.fisheye:
+        D = np.array([[0.05], [-0.02], [0.01], [-0.002]])
+
+    build = timed(
+        lambda: compute_undistort_maps(shape, K, D, args.fisheye), args.repeats
+    )
+    print(f"build:       {build * 1000:8.2f} ms")
+
+    memory_cache = UndistortMapCache()
+    memory_cache.get(shape, K, D, args.fisheye)
+    hit = timed(lambda: memory_cache.get(shape, K, D, args.fisheye), args.repeats)
+    print(f"memory hit:  {hit * 1000:8.2f} ms")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        UndistortMapCache(cache_dir=cache_dir).get(shape, K, D, args.fisheye)
+        # a new cache per run, as in a new process
+        load = timed(
+            lambda: UndistortMapCache(cache_dir=cache_dir).get(
+                shape, K, D, args.fisheye
+            ),
+            args.repeats,
+        )
+        print(f"disk (mmap): {load * 1000:8.2f} ms")
+    print(f"speedup: {build / hit:.0f}x in memory, {build / load:.0f}x from disk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Calibrating on a selected view subset vs all views of a redundant sequence.
+
+    python benchmarks/bench_view_selection.py --views 300 --select 40
+
+The solver cost grows steeply with the number of views, calibrating all views of a
+1000 view sequence takes hours.
+"""
+
+import argparse
+import time
+
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.funcs import calibrate, select_views
+from camera_calibration.funcs.intrinsic_calc import make_objpoints
+
+
+def rig_sequence(count, width, height, K, D, rng, nx=9, ny=6):
+    """Views from a slowly moving board, like the frames of an automated rig."""
+    objp = make_objpoints(nx, ny)
+    rvec = np.zeros(3)
+    tvec = np.array([-4.0, -2.5, 14.0])
+    objpoints, imgpoints = [], []
+    while len(objpoints) < count:
+        new_rvec = rvec + rng.normal(0, 0.03, 3)
+        new_tvec = tvec + rng.normal(0, [0.25, 0.25, 0.3])
+        new_rvec = np.clip(new_rvec, -0.7, 0.7)
+        new_tvec[2] = np.clip(new_tvec[2], 8, 22)
+        points, _ = cv.projectPoints(objp, new_rvec, new_tvec, K, D)
+        points = points.reshape(-1, 2)
+        if points.min() < 0 or (points > (width, height)).any():
+            tvec[:2] += (np.array([width, height]) / 2 - points.mean(axis=0)) * 0.002
+            continue
+        rvec, tvec = new_rvec, new_tvec
+        points += rng.normal(0, 0.2, points.shape)
+        objpoints.append(objp)
+        imgpoints.append(points.astype(np.float32).reshape(-1, 1, 2))
+    return objpoints, imgpoints
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--views", type=int, default=300)
+    parser.add_argument("--select", type=int, default=40)
+    parser.add_argument("--trials", type=int, default=5, help="Random subsets.")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    shape = (args.width, args.height)
+    K = np.array([[1400, 0, args.width / 2], [0, 1400, args.height / 2], [0, 0, 1]])
+    D = np.array([[-0.25, 0.08, 0.001, -0.0005, -0.01]])
+    objpoints, imgpoints = rig_sequence(args.views, args.width, args.height, K, D, rng)
+
+    start = time.perf_counter()
+    selected = select_views(objpoints, imgpoints, shape, args.select)
+    selection_time = time.perf_counter() - start
+    print(f"{args.views} views, selected {len(selected)} in {selection_time:.2f} s")
+
+    subsets = [("all", [range(args.views)]), ("selected", [selected])]
+    subsets.append(
+        (
+            "random",
+            [
+                rng.choice(args.views, args.select, replace=False)
+                for _ in range(args.trials)
+            ],
+        )
+    )
+    print(f"{'views':<10}{'count':>7}{'time (s)':>10}{'fx err':>10}{'cx err':>10}")
+    for label, trials in subsets:
+        results = []
+        for indices in trials:
+            start = time.perf_counter()
+            _, K_est, _, _, _ = calibrate(
+                [objpoints[i] for i in indices], [imgpoints[i] for i in indices], shape
+            )
+            elapsed = time.perf_counter() - start
+            fx_error = abs(K_est[0, 0] - K[0, 0])
+            cx_error = abs(K_est[0, 2] - K[0, 2])
+            results.append((elapsed, fx_error, cx_error))
+        elapsed, fx_error, cx_error = np.mean(results, axis=0)
+        print(
+            f"{label:<10}{len(trials[0]):>7}{elapsed:>10.2f}{fx_error:>10.3f}"
+            f"{cx_error:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Cold vs warm-started recalibration after adding a few views to a large set.
+
+    python benchmarks/bench_warm_start.py --views 300 --added 2
+"""
+
+import argparse
+import time
+
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.funcs import calibrate
+from camera_calibration.funcs.intrinsic_calc import make_objpoints
+
+
+def synthetic_views(count, nx, ny, width, height, rng, fisheye=False):
+    """Noisy projections of a board seen from random poses that fit in the image."""
+    K = np.array(
+        [[0.75 * width, 0, width / 2], [0, 0.75 * width, height / 2], [0, 0, 1]]
+    )
+    D = np.array([[-0.25, 0.08, 0.001, -0.0005, -0.01]])
+    if fisheye:
+        D = np.array([[0.05], [-0.02], [0.01], [-0.002]])
+    objp = make_objpoints(nx, ny)
+    objpoints, imgpoints = [], []
+    while len(objpoints) < count:
+        rvec = rng.normal(0, 0.35, 3)
+        tvec = np.array(
+            [rng.uniform(-8, 0), rng.uniform(-5.5, 0.5), rng.uniform(8, 20)]
+        )
+        if fisheye:
+            points, _ = cv.fisheye.projectPoints(objp[:, None], rvec, tvec, K, D)
+        else:
+            points, _ = cv.projectPoints(objp, rvec, tvec, K, D)
+        points = points.reshape(-1, 2)
+        if points.min() < 0 or (points > (width, height)).any():
+            continue
+        points += rng.normal(0, 0.2, points.shape)
+        objpoints.append(objp)
+        imgpoints.append(points.astype(np.float32).reshape(-1, 1, 2))
+    return objpoints, imgpoints
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--views", type=int, default=300)
+    parser.add_argument("--added", type=int, default=2)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    shape = (args.width, args.height)
+    objpoints, imgpoints = synthetic_views(
+        args.views, 9, 6, args.width, args.height, rng
+    )
+    old = args.views - args.added
+
+    rms, K, D, rvecs, tvecs = calibrate(objpoints[:old], imgpoints[:old], shape)
+    extrinsics = (list(rvecs) + [None] * args.added, list(tvecs) + [None] * args.added)
+
+    print(f"{old} views + {args.added} added")
+    print(f"{'mode':<8}{'time (s)':>10}{'rms':>12}{'fx':>10}")
+    for mode, warm_start in [("cold", ()), ("warm", (K, D, *extrinsics))]:
+        start = time.perf_counter()
+        rms, K_new, *_ = calibrate(objpoints, imgpoints, shape, False, *warm_start)
+        elapsed = time.perf_counter() - start
+        print(f"{mode:<8}{elapsed:>10.3f}{rms:>12.6f}{K_new[0, 0]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
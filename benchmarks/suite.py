@@ -0,0 +1,217 @@
+"""Benchmark suite for the detection, calibration, undistortion and display hot paths.
+
+    python benchmarks/suite.py -o results.json
+    python benchmarks/suite.py --baseline results.json --max-slowdown 1.2
+
+Runs headless (QImage doesn't need a display) and needs the package installed
+(poetry install). Each case is timed until it has run for --min-time seconds, at least
+--repeats times, and the median is compared against the baseline. The exit code is 1 if
+any case is slower than the baseline by more than --max-slowdown.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import cv2 as cv
+import numpy as np
+
+from bench_coarse_detection import render_board
+from bench_warm_start import synthetic_views
+from camera_calibration.funcs import (
+    calibrate,
+    compute_undistort_maps,
+    cvImg_to_qImg,
+    find_points,
+    get_undistort_funcs,
+    undistort_maps,
+)
+
+patterns = [("Checkerboard", 9, 6), ("Circles", 7, 6), ("Asymmetric Circles", 4, 11)]
+resolutions = [(640, 480), (1920, 1080), (4000, 3000)]
+view_counts = [10, 25, 50, 100]
+quick_resolutions = resolutions[:2]
+quick_view_counts = view_counts[:2]
+
+
+def detection_cases(resolutions):
+    rng = np.random.default_rng(0)
+    for pattern, nx, ny in patterns:
+        for width, height in resolutions:
+            img, _ = render_board(pattern, nx, ny, width, height, rng)
+            name = f"find_points/{pattern.replace(' ', '_').lower()}/{width}x{height}"
+            if not find_points(img, nx, ny, pattern)[1]:
+                # e.g. circles below the blob detector's minimum area, timing the
+                # failure path would be misleading
+                print(f"skipped {name}, the pattern isn't found", file=sys.stderr)
+                continue
+            yield name, lambda img=img, p=pattern, nx=nx, ny=ny: find_points(
+                img, nx, ny, p
+            ), 1
+
+
+def calibration_cases(view_counts):
+    for fisheye in (False, True):
+        model = "fisheye" if fisheye else "standard"
+        rng = np.random.default_rng(0)
+        objpoints, imgpoints = synthetic_views(
+            max(view_counts), 9, 6, 1920, 1080, rng, fisheye
+        )
+        for count in view_counts:
+            yield f"calibrate/{model}/{count}_views", lambda n=count, f=fisheye: (
+                calibrate(objpoints[:n], imgpoints[:n], (1920, 1080), f)
+            ), 1
+
+
+def undistortion_cases():
+    width, height = 1920, 1080
+    K = np.array([[1440.0, 0, width / 2], [0, 1440, height / 2], [0, 0, 1]])
+    distortion = {
+        "standard": np.array([[-0.25, 0.08, 0.001, -0.0005, -0.01]]),
+        "fisheye": np.array([[0.05], [-0.02], [0.01], [-0.002]]),
+    }
+    img = np.random.default_rng(0).integers(0, 256, (height, width, 3), np.uint8)
+    for model, D in distortion.items():
+        fisheye = model == "fisheye"
+        yield f"compute_undistort_maps/{model}/{width}x{height}", lambda D=D, f=fisheye: (
+            compute_undistort_maps(img.shape, K, D, f)
+        ), 1
+
+        def build_cached(D=D, f=fisheye):
+            # a cache miss every run, a hit only times the lookup
+            undistort_maps.clear()
+            return get_undistort_funcs(img.shape, K, D, f)
+
+        yield f"get_undistort_funcs/{model}/{width}x{height}", build_cached, 1
+
+        map_x, map_y, _ = get_undistort_funcs(img.shape, K, D, fisheye)
+        yield f"remap/{model}/{width}x{height}", lambda x=map_x, y=map_y: cv.remap(
+            img, x, y, cv.INTER_LINEAR
+        ), 1
+
+
+def qimage_cases(resolutions):
+    rng = np.random.default_rng(0)
+    for width, height in resolutions:
+        img = rng.integers(0, 256, (height, width, 3), np.uint8)
+        yield f"cvImg_to_qImg/bgr/{width}x{height}", lambda img=img: cvImg_to_qImg(
+            img
+        ), 1
+
+
+def measure(func, min_time, repeats):
+    func()  # warm up caches, lazy initialisation and the OpenCV thread pool
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeats or time.perf_counter() - start < min_time:
+        t = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def environment():
+    return dict(
+        timestamp=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        machine=platform.machine(),
+        cpu_count=os.cpu_count(),
+        opencv=cv.__version__,
+        opencv_threads=cv.getNumThreads(),
+        numpy=np.__version__,
+    )
+
+
+def compare(results, baseline, max_slowdown, name_filter=""):
+    """Print the ratio to the baseline of each case, returns the regressed cases."""
+    old_env, new_env = baseline["environment"], results["environment"]
+    for key in ("machine", "cpu_count", "opencv", "opencv_threads", "numpy"):
+        if old_env.get(key) != new_env.get(key):
+            print(f"note: {key} {old_env.get(key)} -> {new_env.get(key)}")
+
+    regressions = []
+    print(f"{'case':<48}{'baseline':>12}{'now':>12}{'ratio':>8}")
+    for name, case in results["cases"].items():
+        if name not in baseline["cases"]:
+            print(f"{name:<48}{'-':>12}{case['median']:>12.5f}")
+            continue
+        old = baseline["cases"][name]["median"]
+        ratio = case["median"] / old
+        flag = ""
+        if ratio > max_slowdown:
+            flag = "  slower"
+            regressions.append(name)
+        elif ratio < 1 / max_slowdown:
+            flag = "  faster"
+        print(f"{name:<48}{old:>12.5f}{case['median']:>12.5f}{ratio:>8.2f}{flag}")
+    for name in baseline["cases"]:
+        if name_filter in name and name not in results["cases"]:
+            print(f"{name:<48}{'missing':>12}")
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="Write the results as JSON.")
+    parser.add_argument("--baseline", help="Compare against a previous --output.")
+    parser.add_argument("--max-slowdown", type=float, default=1.2)
+    parser.add_argument("-k", "--filter", default="", help="Only cases containing.")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds per case.")
+    parser.add_argument("--repeats", type=int, default=5, help="Minimum runs per case.")
+    parser.add_argument("--threads", type=int, help="OpenCV threads, default all.")
+    parser.add_argument(
+        "--quick", action="store_true", help="Skip the largest images and view counts."
+    )
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        cv.setNumThreads(args.threads)
+
+    results = dict(environment=environment(), cases={})
+    groups = [
+        lambda: detection_cases(quick_resolutions if args.quick else resolutions),
+        lambda: calibration_cases(quick_view_counts if args.quick else view_counts),
+        undistortion_cases,
+        lambda: qimage_cases(quick_resolutions if args.quick else resolutions),
+    ]
+    for group in groups:
+        for name, func, items in group():
+            if args.filter not in name:
+                continue
+            times = measure(func, args.min_time, args.repeats)
+            median = statistics.median(times)
+            results["cases"][name] = dict(
+                median=median,
+                min=min(times),
+                mean=statistics.mean(times),
+                stdev=statistics.stdev(times) if len(times) > 1 else 0,
+                runs=len(times),
+                per_second=items / median,
+            )
+            print(f"{name:<48}{median:>12.5f} s{items / median:>10.1f} /s", flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        if regressions := compare(results, baseline, args.max_slowdown, args.filter):
+            print(
+                f"{len(regressions)} cases missing or slower than "
+                f"{args.max_slowdown}x baseline"
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
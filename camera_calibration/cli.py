@@ -0,0 +1,277 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from camera_calibration.defs import map_cache_dir
+from camera_calibration.funcs import batch_calibrate, save_calibration
+from camera_calibration.funcs.batch_calc import image_files_in
+from camera_calibration.funcs.uncertainty import methods
+
+patterns = ["Checkerboard", "Circles", "Asymmetric Circles"]
+
+
+def add_batch_parser(subparsers):
+    parser = subparsers.add_parser(
+        "batch", help="Calibrate from image files without the GUI."
+    )
+    parser.add_argument("inputs", nargs="+", help="Image files or folders.")
+    parser.add_argument(
+        "-o", "--output", required=True, help="Output file (.json or .npz)."
+    )
+    parser.add_argument("--pattern", choices=patterns, default="Checkerboard")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=6)
+    parser.add_argument("--spacing", type=float, default=1, help="Size/spacing (mm).")
+    parser.add_argument("--fisheye", action="store_true")
+    parser.add_argument(
+        "--coarse",
+        action="store_true",
+        help="Locate the pattern on a downscaled image, refine at full resolution.",
+    )
+    parser.add_argument(
+        "--max-views",
+        type=int,
+        default=0,
+        help="Calibrate on at most this many views, chosen for coverage and pose "
+        "diversity (0 = all).",
+    )
+    parser.add_argument(
+        "--max-error",
+        type=float,
+        default=0,
+        help="Drop views with an RMS reprojection error above this many pixels and "
+        "recalibrate (0 = keep all).",
+    )
+    parser.add_argument(
+        "--uncertainty",
+        choices=methods,
+        help="Log the standard deviation and confidence interval of each parameter "
+        "from calibrations of resampled views.",
+    )
+    parser.add_argument(
+        "--resamples", type=int, default=200, help="Bootstrap resamples."
+    )
+    parser.add_argument(
+        "-j", "--workers", type=int, default=os.cpu_count(), help="Worker processes."
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=None, help="Images per work unit."
+    )
+    parser.set_defaults(func=run_batch)
+
+
+def run_batch(args):
+    if not args.output.endswith((".json", ".npz")):
+        raise SystemExit("Output must be a .json or .npz file.")
+
+    img_files = list(image_files_in(args.inputs))
+    logging.info(f"Calibrating from {len(img_files)} images, {args.workers} workers")
+
+    start = time.perf_counter()
+    try:
+        (
+            rms_error,
+            intrinsic_matrix,
+            distortion_coeffs,
+            rotation_vecs,
+            translation_vecs,
+        ) = batch_calibrate(
+            img_files,
+            args.rows,
+            args.cols,
+            args.pattern,
+            args.spacing,
+            args.fisheye,
+            args.workers,
+            args.chunk_size,
+            args.coarse,
+            args.max_views,
+            args.max_error,
+            args.uncertainty,
+            args.resamples,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    logging.info(
+        f"{len(rotation_vecs)} views, RMS error {rms_error:.4f}, "
+        f"{time.perf_counter() - start:.1f} s"
+    )
+    save_calibration(args.output, intrinsic_matrix, distortion_coeffs, args.fisheye)
+    logging.info(f"Saved to {args.output}")
+
+
+def add_undistort_parser(subparsers):
+    parser = subparsers.add_parser(
+        "undistort", help="Undistort image files, folders and videos."
+    )
+    parser.add_argument("calibration", help="Calibration file (.json or .npz).")
+    parser.add_argument("inputs", nargs="+", help="Images, videos or folders.")
+    parser.add_argument("-o", "--output", required=True, help="Output folder.")
+    parser.add_argument(
+        "--crop",
+        action="store_true",
+        help="Crop to the valid region of interest (not with fisheye).",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        help="Free scaling 0-1 (fisheye: balance), default 1 (fisheye: 0).",
+    )
+    parser.add_argument(
+        "--map-cache",
+        default=str(map_cache_dir()),
+        help="Folder keeping the undistortion maps for later runs, '' to disable "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "-j", "--workers", type=int, default=os.cpu_count(), help="Worker threads."
+    )
+    parser.set_defaults(func=run_undistort)
+
+
+def run_undistort(args):
+    from camera_calibration.funcs import (
+        UndistortMapCache,
+        load_calibration,
+        undistort_batch,
+    )
+
+    try:
+        intrinsic_matrix, distortion_coeffs, fisheye = load_calibration(
+            args.calibration
+        )
+        stats = undistort_batch(
+            args.inputs,
+            args.output,
+            intrinsic_matrix,
+            distortion_coeffs,
+            fisheye,
+            args.crop,
+            args.alpha,
+            args.workers,
+            UndistortMapCache(cache_dir=args.map_cache) if args.map_cache else None,
+        )
+    except (OSError, ValueError, KeyError) as e:
+        raise SystemExit(str(e))
+
+    logging.info(
+        f"Undistorted {stats['frames']} frames to {args.output} in "
+        f"{stats['seconds']:.1f} s ({stats['fps']:.1f} frames/s)"
+    )
+
+
+def add_synth_parser(subparsers):
+    parser = subparsers.add_parser(
+        "synth", help="Render calibration images of a known camera and board poses."
+    )
+    parser.add_argument("output", help="Output folder, with ground_truth.json.")
+    parser.add_argument("-n", "--count", type=int, default=50)
+    parser.add_argument("--pattern", choices=patterns, default="Checkerboard")
+    parser.add_argument("--rows", type=int, default=7)
+    parser.add_argument("--cols", type=int, default=10)
+    parser.add_argument("--spacing", type=float, default=1, help="Size/spacing (mm).")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=960)
+    parser.add_argument(
+        "--focal", type=float, help="Focal length (pixels), default 0.8 x width."
+    )
+    parser.add_argument(
+        "--distortion",
+        type=float,
+        nargs="+",
+        help="k1 k2 p1 p2 k3, or k1 k2 k3 k4 with --fisheye.",
+    )
+    parser.add_argument("--fisheye", action="store_true")
+    parser.add_argument("--noise", type=float, default=2.0, help="Grey levels.")
+    parser.add_argument("--blur", type=float, default=0.8, help="Gaussian sigma.")
+    parser.add_argument(
+        "--lighting", type=float, default=0.3, help="Gain/gradient variation."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "-j", "--workers", type=int, default=os.cpu_count(), help="Worker processes."
+    )
+    parser.set_defaults(func=run_synth)
+
+
+def run_synth(args):
+    from camera_calibration.funcs.synthetic import (
+        SyntheticBoard,
+        SyntheticCamera,
+        write_dataset,
+    )
+
+    focal = args.focal or 0.8 * args.width
+    intrinsic_matrix = np.array(
+        [
+            [focal, 0, (args.width - 1) / 2],
+            [0, focal, (args.height - 1) / 2],
+            [0, 0, 1],
+        ]
+    )
+    distortion_coeffs = None
+    if args.distortion:
+        distortion_coeffs = np.array(args.distortion, np.float64)
+        distortion_coeffs = distortion_coeffs.reshape(
+            (-1, 1) if args.fisheye else (1, -1)
+        )
+
+    camera = SyntheticCamera(
+        args.width, args.height, intrinsic_matrix, distortion_coeffs, args.fisheye
+    )
+    board = SyntheticBoard(args.pattern, args.rows - 1, args.cols - 1, args.spacing)
+
+    start = time.perf_counter()
+    try:
+        write_dataset(
+            args.output,
+            camera,
+            board,
+            args.count,
+            args.seed,
+            args.workers,
+            noise=args.noise,
+            blur=args.blur,
+            lighting=args.lighting,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    elapsed = time.perf_counter() - start
+    logging.info(
+        f"Wrote {args.count} images to {args.output} in {elapsed:.1f} s "
+        f"({args.count / elapsed:.0f} images/s)"
+    )
+
+
+def main(argv=None):
+    # spawned worker processes of a frozen build start here
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(prog="camera_calibration")
+    subparsers = parser.add_subparsers(dest="command")
+    add_batch_parser(subparsers)
+    add_undistort_parser(subparsers)
+    add_synth_parser(subparsers)
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        from camera_calibration.main_widget import main as gui_main
+
+        gui_main()
+        return
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s: %(message)s",
+        stream=sys.stdout,
+    )
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
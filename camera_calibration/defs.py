@@ -45,6 +45,14 @@ def settings_file() -> Path:
     return f
 
 
+def points_cache_file() -> Path:
+    return settings_file().parent / f"{project_name}-points.sqlite"
+
+
+def map_cache_dir() -> Path:
+    return settings_file().parent / f"{project_name}-maps"
+
+
 def log_file() -> Path:
     return Path.cwd() / f"{project_name}.log"
 
@@ -1 +1,2 @@
 from .image_display import ImageDisplay
+from .gallery_view import GalleryView
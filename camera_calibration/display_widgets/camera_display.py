@@ -1,7 +1,9 @@
+import cv2 as cv
 import qtawesome as qta
 
-from camera_calibration.defs import QtCore, QtWidgets, QtGui, Signal
-from camera_calibration.funcs import cvImg_to_qImg
+from camera_calibration.defs import QtCore, QtWidgets, Signal
+from camera_calibration.funcs import QImageBuffer, KeyframeSelector
+from camera_calibration.workers.worker_live_detect import LiveDetectWorker
 from camera_calibration.workers.worker_stream import StreamWorker
 
 
@@ -9,7 +11,7 @@ class CameraDisplay(QtWidgets.QWidget):
     add_image = Signal(object, str)
     closed = Signal()
 
-    def __init__(self, camera_no, parent=None):
+    def __init__(self, camera_no, pattern_settings, parent=None):
         super().__init__(parent=parent)
 
         self.setWindowFlags(QtCore.Qt.WindowType.Window)
@@ -27,36 +29,192 @@ class CameraDisplay(QtWidgets.QWidget):
         )
         layout.addWidget(self.pixmap_label)
 
+        overlay_layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(overlay_layout)
+
+        self.overlay_checkbox = QtWidgets.QCheckBox("Live detection", self)
+        self.overlay_checkbox.toggled.connect(self.overlay_toggled)
+        overlay_layout.addWidget(self.overlay_checkbox)
+
+        self.detect_width_spinbox = QtWidgets.QSpinBox(self)
+        self.detect_width_spinbox.setPrefix("Width ")
+        self.detect_width_spinbox.setSuffix(" px")
+        self.detect_width_spinbox.setRange(160, 3840)
+        self.detect_width_spinbox.setSingleStep(160)
+        self.detect_width_spinbox.setValue(640)
+        self.detect_width_spinbox.setToolTip(
+            "Frames are downscaled to this width for live detection."
+        )
+        self.detect_width_spinbox.valueChanged.connect(self.detect_width_changed)
+        overlay_layout.addWidget(self.detect_width_spinbox)
+
+        self.overlay_label = QtWidgets.QLabel(self)
+        overlay_layout.addWidget(self.overlay_label, 1)
+
+        self.stream_label = QtWidgets.QLabel(self)
+        overlay_layout.addWidget(self.stream_label)
+
+        auto_layout = QtWidgets.QHBoxLayout()
+        layout.addLayout(auto_layout)
+
+        self.auto_checkbox = QtWidgets.QCheckBox("Auto capture", self)
+        self.auto_checkbox.setToolTip(
+            "Capture frames that show the board in a new part of the image, "
+            "at a new tilt or at a new distance."
+        )
+        self.auto_checkbox.toggled.connect(self.auto_toggled)
+        auto_layout.addWidget(self.auto_checkbox)
+
+        self.max_views_spinbox = QtWidgets.QSpinBox(self)
+        self.max_views_spinbox.setPrefix("Stop after ")
+        self.max_views_spinbox.setSuffix(" views")
+        self.max_views_spinbox.setRange(0, 1000)
+        self.max_views_spinbox.setSpecialValueText("No view limit")
+        self.max_views_spinbox.setValue(20)
+        auto_layout.addWidget(self.max_views_spinbox)
+
+        self.coverage_spinbox = QtWidgets.QSpinBox(self)
+        self.coverage_spinbox.setPrefix("or ")
+        self.coverage_spinbox.setSuffix(" % coverage")
+        self.coverage_spinbox.setRange(0, 100)
+        self.coverage_spinbox.setSpecialValueText("No coverage limit")
+        self.coverage_spinbox.setValue(80)
+        auto_layout.addWidget(self.coverage_spinbox)
+
+        self.auto_label = QtWidgets.QLabel(self)
+        auto_layout.addWidget(self.auto_label, 1)
+
         self.camera_button = QtWidgets.QPushButton(self)
         self.camera_button.setIcon(qta.icon("mdi6.camera"))
         self.camera_button.clicked.connect(self.camera_button_clicked)
         layout.addWidget(self.camera_button)
 
+        self.pattern_size = None
+        self.overlay = None
+        self.keyframes = None
+
+        self.detect_thread = QtCore.QThread()
+        self.detect_worker = LiveDetectWorker(self.detect_width_spinbox.value())
+        self.detect_worker.moveToThread(self.detect_thread)
+        self.detect_thread.started.connect(self.detect_worker.run)
+        self.detect_worker.points_found.connect(self.overlay_points_found)
+        self.set_pattern_settings(pattern_settings)
+
         self.stream_thread = QtCore.QThread()
         self.stream_worker = StreamWorker(self.camera_no)
         self.stream_worker.moveToThread(self.stream_thread)
         self.stream_thread.started.connect(self.stream_worker.stream)
-        self.stream_worker.new_frame.connect(self.set_image)
+        self.stream_worker.frame_ready.connect(self.frame_ready)
         self.stream_worker.finished.connect(self.stream_finished)
         self.stream_thread.start()
 
+        self.stats_timer = QtCore.QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.update_stream_stats)
+        self.stats_timer.start()
+        self.last_captured = 0
+
         self.image = None
+        self.image_buffer = QImageBuffer()
         self.pixmap = None
         self.count = 1
 
-    def set_image(self, image):
-        qt_img = cvImg_to_qImg(image)
-        self.pixmap = QtGui.QPixmap(qt_img)
-        self.pixmap_label.setPixmap(
-            self.pixmap.scaledToWidth(self.pixmap_label.width())
+    def set_pattern_settings(self, settings):
+        self.pattern_size = (settings["rows"] - 1, settings["cols"] - 1)
+        self.detect_worker.set_pattern_settings(*self.pattern_size, settings["pattern"])
+        self.overlay = None
+        if self.keyframes is not None:
+            # start over, views of the previous pattern don't count for the new one
+            self.start_keyframes()
+
+    def frame_ready(self):
+        if self.stream_worker is not None:
+            frame = self.stream_worker.take_frame()
+            if frame is not None:
+                self.set_image(frame)
+
+    def update_stream_stats(self):
+        if self.stream_worker is None:
+            return
+        captured = self.stream_worker.captured
+        fps = (captured - self.last_captured) * 1000 / self.stats_timer.interval()
+        self.last_captured = captured
+        self.stream_label.setText(
+            f"camera {fps:.0f} fps, dropped {self.stream_worker.dropped}, "
+            f"queued {self.stream_worker.queue_depth}"
         )
+
+    def set_image(self, image):
         self.image = image
+        if self.overlay_checkbox.isChecked():
+            self.detect_worker.submit(image)
+            if self.overlay is not None:
+                image = image.copy()
+                cv.drawChessboardCorners(image, self.pattern_size, *self.overlay)
+
+        self.pixmap = self.image_buffer.pixmap(image, self.pixmap_label.width())
+        self.pixmap_label.setPixmap(self.pixmap)
+
+    def overlay_toggled(self, checked):
+        self.overlay = None
+        self.overlay_label.clear()
+        if checked:
+            self.detect_thread.start()
+        else:
+            self.auto_checkbox.setChecked(False)
+            self.stop_detection()
+
+    def auto_toggled(self, checked):
+        self.max_views_spinbox.setDisabled(checked)
+        self.coverage_spinbox.setDisabled(checked)
+        if checked:
+            self.start_keyframes()
+            self.overlay_checkbox.setChecked(True)
+        else:
+            self.keyframes = None
+
+    def start_keyframes(self):
+        self.keyframes = KeyframeSelector(
+            *self.pattern_size,
+            max_views=self.max_views_spinbox.value(),
+            target_coverage=self.coverage_spinbox.value() / 100,
+        )
+        self.update_auto_label()
+
+    def update_auto_label(self):
+        self.auto_label.setText(
+            f"{self.keyframes.views} views, "
+            f"{self.keyframes.coverage_fraction:.0%} coverage"
+        )
+
+    def detect_width_changed(self, value):
+        self.detect_worker.detect_width = value
+
+    def overlay_points_found(self, frame, ret, imgpoints, latency, fps):
+        if not self.overlay_checkbox.isChecked():
+            return
+        self.overlay = (imgpoints, ret) if ret else None
+        self.overlay_label.setText(f"{fps:.1f} fps, {latency * 1000:.0f} ms")
+
+        if ret and self.keyframes is not None:
+            if self.keyframes.consider(imgpoints, frame.shape):
+                self.add_image.emit(frame, f"camera_{self.count}")
+                self.count += 1
+                self.update_auto_label()
+            if self.keyframes.done:
+                self.auto_checkbox.setChecked(False)
+
+    def stop_detection(self):
+        self.detect_worker.stop()
+        self.detect_thread.quit()
+        self.detect_thread.wait()
 
     def camera_button_clicked(self):
         self.add_image.emit(self.image, f"camera_{self.count}")
         self.count += 1
 
     def stream_finished(self):
+        self.stats_timer.stop()
         self.stream_thread.exit()
         self.stream_worker = None
         self.close()
@@ -66,13 +224,14 @@ class CameraDisplay(QtWidgets.QWidget):
             self.stream_worker.stop_stream()
             event.ignore()
         else:
+            self.stop_detection()
             event.accept()
             self.closed.emit()
 
 
 if __name__ == "__main__":
     app = QtWidgets.QApplication([])
-    widget = CameraDisplay(1)
+    widget = CameraDisplay(1, dict(rows=7, cols=10, pattern="Checkerboard"))
     widget.show()
 
     app.exec()
@@ -0,0 +1,206 @@
+import qtawesome as qta
+
+from camera_calibration.defs import QtCore, QtWidgets, QtGui, Signal
+
+
+class GalleryModel(QtCore.QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+
+        self.items = []
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.items[index.row()]
+        if role in (
+            QtCore.Qt.ItemDataRole.DisplayRole,
+            QtCore.Qt.ItemDataRole.ToolTipRole,
+        ):
+            return item.label
+        if role == QtCore.Qt.ItemDataRole.UserRole:
+            return item
+        return None
+
+    def add_item(self, item):
+        row = len(self.items)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.items.append(item)
+        self.endInsertRows()
+        item.changed.connect(self.item_changed)
+
+    def remove_item(self, item):
+        row = self.items.index(item)
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self.items[row]
+        self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.items.clear()
+        self.endResetModel()
+
+    def item_changed(self):
+        item = self.sender()
+        if item in self.items:
+            index = self.index(self.items.index(item))
+            self.dataChanged.emit(index, index)
+
+
+class GalleryDelegate(QtWidgets.QStyledItemDelegate):
+    close_clicked = Signal(object)
+
+    margin = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+
+        self.tile_width = 100
+        self.close_icon = qta.icon("mdi6.close")
+
+    @staticmethod
+    def label_height(font_metrics):
+        return font_metrics.height() + 4
+
+    def tile_size(self, font_metrics):
+        label_height = self.label_height(font_metrics)
+        return QtCore.QSize(
+            self.tile_width + 2 * self.margin,
+            self.tile_width * 3 // 4 + label_height + 3 * self.margin,
+        )
+
+    def sizeHint(self, option, index):
+        return self.tile_size(option.fontMetrics)
+
+    def rects(self, option):
+        rect = option.rect.adjusted(
+            self.margin, self.margin, -self.margin, -self.margin
+        )
+        label_height = self.label_height(option.fontMetrics)
+        close_rect = QtCore.QRect(
+            rect.right() - label_height + 1, rect.top(), label_height, label_height
+        )
+        label_rect = QtCore.QRect(
+            rect.left(), rect.top(), rect.width() - label_height, label_height
+        )
+        thumb_rect = rect.adjusted(0, label_height + self.margin, 0, 0)
+        return label_rect, close_rect, thumb_rect
+
+    def paint(self, painter, option, index):
+        item = index.data(QtCore.Qt.ItemDataRole.UserRole)
+        label_rect, close_rect, thumb_rect = self.rects(option)
+
+        painter.save()
+        painter.setPen(option.palette.color(QtGui.QPalette.ColorRole.Mid))
+        painter.drawRect(option.rect.adjusted(1, 1, -2, -2))
+
+        painter.setPen(option.palette.color(QtGui.QPalette.ColorRole.Text))
+        label = option.fontMetrics.elidedText(
+            item.label or "", QtCore.Qt.TextElideMode.ElideRight, label_rect.width()
+        )
+        painter.drawText(
+            label_rect,
+            QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter,
+            label,
+        )
+        self.close_icon.paint(painter, close_rect)
+
+        if item.image is not None and thumb_rect.isValid():
+            pixmap = item.pixmap(thumb_rect.size())
+            x = thumb_rect.left() + (thumb_rect.width() - pixmap.width()) // 2
+            painter.drawPixmap(x, thumb_rect.top(), pixmap)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QtCore.QEvent.Type.MouseButtonRelease:
+            _, close_rect, _ = self.rects(option)
+            if close_rect.contains(event.pos()):
+                self.close_clicked.emit(index.data(QtCore.Qt.ItemDataRole.UserRole))
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+class GalleryView(QtWidgets.QListView):
+    """Gallery of thumbnails, only tiles in view are painted."""
+
+    remove_requested = Signal(object)
+    tile_width_changed = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+
+        self.setViewMode(QtWidgets.QListView.ViewMode.IconMode)
+        self.setResizeMode(QtWidgets.QListView.ResizeMode.Adjust)
+        self.setMovement(QtWidgets.QListView.Movement.Static)
+        self.setLayoutMode(QtWidgets.QListView.LayoutMode.Batched)
+        self.setBatchSize(500)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(
+            QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel
+        )
+
+        QtGui.QPixmapCache.setCacheLimit(max(QtGui.QPixmapCache.cacheLimit(), 65536))
+
+        self.gallery_model = GalleryModel(self)
+        self.setModel(self.gallery_model)
+
+        self.delegate = GalleryDelegate(self)
+        self.delegate.close_clicked.connect(self.remove_requested.emit)
+        self.setItemDelegate(self.delegate)
+        self.set_tile_width(self.delegate.tile_width)
+
+    @property
+    def items(self):
+        return self.gallery_model.items
+
+    def add_item(self, item):
+        self.gallery_model.add_item(item)
+
+    def remove_item(self, item):
+        self.gallery_model.remove_item(item)
+
+    def clear(self):
+        self.gallery_model.clear()
+
+    def set_tile_width(self, width):
+        self.delegate.tile_width = max(int(width), 20)
+        self.setGridSize(self.delegate.tile_size(self.fontMetrics()))
+        self.verticalScrollBar().setSingleStep(self.gridSize().height() // 4)
+
+    def visible_items(self):
+        viewport = self.viewport().rect()
+        return [
+            item
+            for row, item in enumerate(self.gallery_model.items)
+            if self.visualRect(self.gallery_model.index(row)).intersects(viewport)
+        ]
+
+    def wheelEvent(self, evt):
+        if evt.modifiers() == QtCore.Qt.KeyboardModifier.ControlModifier:
+            self.set_tile_width(self.delegate.tile_width + evt.angleDelta().y() / 12)
+            self.tile_width_changed.emit(self.delegate.tile_width)
+            evt.accept()
+        else:
+            super().wheelEvent(evt)
+
+
+if __name__ == "__main__":
+    import numpy as np
+
+    from camera_calibration.display_widgets.image_display import ImageDisplay
+
+    app = QtWidgets.QApplication([])
+    widget = GalleryView()
+    for i in range(10000):
+        image_display = ImageDisplay()
+        image_display.set_image(
+            np.full([300, 400, 3], i % 256, dtype=np.uint8), f"image_{i}"
+        )
+        widget.add_item(image_display)
+    widget.show()
+
+    app.exec()
@@ -1,82 +1,145 @@
+import itertools
+
 import cv2 as cv
-import qtawesome as qta
+import numpy as np
 
 from camera_calibration.custom_components import tab10_gbr, tab10_rgb
-from camera_calibration.defs import QtCore, QtWidgets, QtGui, Signal
-from camera_calibration.funcs import cvImg_to_qImg, find_points
+from camera_calibration.defs import QtCore, QtGui, Signal
+from camera_calibration.funcs import QImageBuffer, make_thumbnail
+
 
+class ImageDisplay(QtCore.QObject):
+    """Image in the gallery, painted by GalleryDelegate when in view."""
 
-class ImageDisplay(QtWidgets.QFrame):
-    close_clicked = Signal()
+    changed = Signal()
+    uid = itertools.count()
+    qimage_buffer = QImageBuffer()  # shared, pixmaps are only made on the GUI thread
 
     def __init__(self, parent=None):
         super().__init__(parent=parent)
 
-        layout = QtWidgets.QGridLayout(self)
-        self.setFrameShape(QtWidgets.QFrame.StyledPanel)
-
-        self.item_label = QtWidgets.QLabel(self)
-        self.item_label.setSizePolicy(
-            QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum
-        )
-        layout.addWidget(self.item_label, 0, 0)
+        self.key = f"gallery-{next(self.uid)}"
+        self.version = 0
 
-        self.delete_button = QtWidgets.QPushButton(self)
-        self.delete_button.setIcon(qta.icon("mdi6.close"))
-        self.delete_button.setFlat(True)
-        self.delete_button.clicked.connect(self.close_clicked.emit)
-        layout.addWidget(self.delete_button, 0, 1)
-
-        self.pixmap_label = QtWidgets.QLabel(self)
-        self.pixmap_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignHCenter)
-        layout.addWidget(self.pixmap_label, 1, 0, 1, 2)
-
-        self.raw_image = None
+        self.source = None
+        self.thumbnail = None
+        self.img_hash = None
         self.image = None
         self.label = None
-        self.pixmap = None
-        self.image_width = 200
 
         self.objpoints = None
         self.imgpoints = None
         self.shape = None
-        layout.rowStretch(-1)
-
-    def set_image(self, image, label=None, processed=False):
-        qt_img = cvImg_to_qImg(image)
-        self.pixmap = QtGui.QPixmap(qt_img)
-        self.pixmap_label.setPixmap(self.pixmap.scaledToWidth(self.image_width))
-        self.image = image
-        if not processed:
-            self.raw_image = image
-            self.shape = self.raw_image.shape[:2][::-1]
 
+        # undistorted preview, see ThumbnailUndistortion
+        self.undistortion = None
+        self.undistorted = None
+
+        # results for every settings tried, so switching back is instant
+        self.results = {}
+        self.settings_key = None
+
+    def set_image(self, image, label=None, source=None, thumbnail=None):
+        """Keep a thumbnail of image, full resolution is reloaded from source."""
+        if thumbnail is None:
+            thumbnail = make_thumbnail(image)
+        self.set_thumbnail(thumbnail, image.shape[:2][::-1], label, source)
+
+    def set_thumbnail(self, thumbnail, shape, label=None, source=None):
+        """As set_image when only the thumbnail is at hand, shape is (w, h)."""
+        self.shape = tuple(shape)
+        self.thumbnail = thumbnail
+        self.source = source
         if label is not None:
             self.label = label
-            self.item_label.setText(label)
+        self.show_image(self.thumbnail)
+
+    def set_undistortion(self, undistortion):
+        """Show the thumbnail undistorted once set_undistorted gives it, or None."""
+        self.undistortion = undistortion
+        self.undistorted = None
+        self.refresh()
+
+    def set_undistorted(self, undistortion, image):
+        if undistortion is self.undistortion:  # not a preview since replaced
+            self.undistorted = image
+            self.refresh()
+
+    def base_image(self):
+        if self.undistortion is not None and self.undistorted is not None:
+            return self.undistorted
+        return self.thumbnail
+
+    def refresh(self):
+        if self.settings_key in self.results:
+            self.show_points(*self.results[self.settings_key])
+        else:
+            self.show_image(self.base_image())
 
-    def scale_image_to_width(self, width):
-        self.image_width = width
-        self.pixmap_label.setPixmap(self.pixmap.scaledToWidth(self.image_width))
+    def show_image(self, image):
+        self.image = image
+        self.version += 1
+        self.changed.emit()
+
+    def pixmap(self, size):
+        """Thumbnail scaled to fit size, converted only when first painted."""
+        key = f"{self.key}-{self.version}-{size.width()}x{size.height()}"
+        if (pixmap := QtGui.QPixmapCache.find(key)) is None:
+            qimage = self.qimage_buffer.wrap(self.image).scaled(
+                size,
+                QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                QtCore.Qt.TransformationMode.SmoothTransformation,
+            )
+            pixmap = QtGui.QPixmap.fromImage(qimage)
+            QtGui.QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    @property
+    def raw_image(self):
+        return self.source.load() if self.source is not None else None
+
+    def release(self):
+        if self.source is not None:
+            self.source.release()
+            self.source = None
+
+    def request_points(self, settings_key):
+        """Show results for settings_key, returns False if they need detecting."""
+        self.settings_key = settings_key
+        if settings_key in self.results:
+            self.show_points(*self.results[settings_key])
+            return True
 
-    def find_points(self, nx, ny, pattern):
-        pool = QtCore.QThreadPool.globalInstance()
-        runnable = FindPointsRunnable(self.raw_image, nx, ny, pattern)
-        runnable.setAutoDelete(True)
-        runnable.find_points_signal.points_found.connect(self.points_found)
-        pool.start(runnable)
+        self.objpoints = None
+        self.imgpoints = None
+        self.show_image(self.base_image())
+        return False
 
     def points_found(self, results):
-        nx, ny, img, ret, objpoints, imgpoints = results
+        if results is None:  # the full resolution image couldn't be loaded
+            return
+        settings_key = results[0]
+        self.results[settings_key] = results
+        if settings_key == self.settings_key:
+            self.show_points(*results)
+
+    def show_points(self, settings_key, ret, objpoints, imgpoints):
+        nx, ny, _, _ = settings_key
+        base_image = self.base_image()
         if ret:
             self.objpoints = objpoints
             self.imgpoints = imgpoints
-            self.image = self.draw_ok(self.image, (nx, ny), imgpoints, ret)
+            if base_image is self.thumbnail:
+                scale = np.float32(self.thumbnail.shape[1] / self.shape[0])
+                points = imgpoints * scale
+            else:
+                points = self.undistortion.undistort_points(imgpoints, base_image.shape)
+            image = self.draw_ok(base_image, (nx, ny), points, ret)
         else:
             self.objpoints = None
             self.imgpoints = None
-            self.image = self.draw_error(self.image)
-        self.set_image(self.image, processed=True)
+            image = self.draw_error(base_image)
+        self.show_image(image)
 
     @staticmethod
     def draw_ok(image, pattern_size, imgpoints, ret):
@@ -154,39 +217,3 @@ class ImageDisplay(QtWidgets.QFrame):
             value=tab10_gbr["red"],
         )
         return image
-
-
-class FindPointsSignals(QtCore.QObject):
-    points_found = Signal(object)
-
-
-class FindPointsRunnable(QtCore.QRunnable):
-    def __init__(self, img, nx, ny, pattern):
-        super().__init__()
-
-        self.img = img
-        self.nx = nx
-        self.ny = ny
-        self.pattern = pattern
-        self.find_points_signal = FindPointsSignals()
-
-    def run(self):
-        img, ret, objpoints, imgpoints = find_points(
-            self.img, self.nx, self.ny, self.pattern
-        )
-        self.find_points_signal.points_found.emit(
-            (self.nx, self.ny, img, ret, objpoints, imgpoints)
-        )
-
-
-if __name__ == "__main__":
-    import numpy as np
-
-    black_img = np.zeros([100, 100, 3], dtype=np.uint8)
-
-    app = QtWidgets.QApplication([])
-    widget = ImageDisplay()
-    widget.set_image(black_img, "test")
-    widget.show()
-
-    app.exec()
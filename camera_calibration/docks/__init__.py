@@ -1,3 +1,4 @@
 from .dock_calibrate import CalibrateDock
 from .dock_camera import CameraDock
 from .dock_pattern import PatternDock
+from .dock_video import VideoDock
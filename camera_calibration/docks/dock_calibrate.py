@@ -2,10 +2,13 @@ import qtawesome as qta
 
 from camera_calibration.custom_components.dock_base import BaseDock
 from camera_calibration.defs import QtCore, QtWidgets, Signal
+from camera_calibration.funcs.uncertainty import methods
 
 
 class CalibrateDock(BaseDock):
     start_calibrate = Signal(bool)
+    estimate_uncertainty = Signal(str, int)  # method, resamples
+    cancel_clicked = Signal()
     save_clicked = Signal()
 
     def __init__(self):
@@ -25,6 +28,93 @@ class CalibrateDock(BaseDock):
         self.calibrate_button.clicked.connect(self.calibrate_button_clicked)
         self.dock_layout.addWidget(self.calibrate_button)
 
+        self.auto_checkbox = QtWidgets.QCheckBox("Recalibrate on changes", self)
+        self.auto_checkbox.setToolTip(
+            "Recalibrate whenever views are added or removed, "
+            "starting from the previous results."
+        )
+        self.dock_layout.addWidget(self.auto_checkbox)
+
+        self.max_views_spinbox = QtWidgets.QSpinBox(self)
+        self.max_views_spinbox.setPrefix("Use at most ")
+        self.max_views_spinbox.setSuffix(" views")
+        self.max_views_spinbox.setRange(0, 100000)
+        self.max_views_spinbox.setSpecialValueText("Use all views")
+        self.max_views_spinbox.setValue(100)
+        self.max_views_spinbox.setToolTip(
+            "Calibrate on a subset of the views that covers the image and spans the "
+            "board poses, the solver time grows steeply with the number of views."
+        )
+        self.dock_layout.addWidget(self.max_views_spinbox)
+
+        self.max_error_spinbox = QtWidgets.QDoubleSpinBox(self)
+        self.max_error_spinbox.setPrefix("Drop views above ")
+        self.max_error_spinbox.setSuffix(" px")
+        self.max_error_spinbox.setRange(0, 100)
+        self.max_error_spinbox.setSingleStep(0.5)
+        self.max_error_spinbox.setSpecialValueText("Keep all views")
+        self.max_error_spinbox.setValue(0)
+        self.max_error_spinbox.setToolTip(
+            "Drop the views whose RMS reprojection error is above this and "
+            "recalibrate, e.g. blurred frames or misdetected patterns."
+        )
+        self.dock_layout.addWidget(self.max_error_spinbox)
+
+        uncertainty_layout = QtWidgets.QHBoxLayout()
+        self.dock_layout.addLayout(uncertainty_layout)
+
+        self.uncertainty_combobox = QtWidgets.QComboBox(self)
+        self.uncertainty_combobox.addItems(methods)
+        self.uncertainty_combobox.setToolTip(
+            "Bootstrap: resample the views with replacement. "
+            "Jackknife: leave each view out once."
+        )
+        uncertainty_layout.addWidget(self.uncertainty_combobox)
+
+        self.resamples_spinbox = QtWidgets.QSpinBox(self)
+        self.resamples_spinbox.setSuffix(" resamples")
+        self.resamples_spinbox.setRange(10, 10000)
+        self.resamples_spinbox.setValue(200)
+        uncertainty_layout.addWidget(self.resamples_spinbox)
+        self.uncertainty_combobox.currentTextChanged.connect(
+            lambda method: self.resamples_spinbox.setEnabled(method == "Bootstrap")
+        )
+
+        self.uncertainty_button = QtWidgets.QPushButton(self)
+        self.uncertainty_button.setIcon(qta.icon("mdi.chart-bell-curve"))
+        self.uncertainty_button.setToolTip(
+            "Estimate the uncertainty of the results by recalibrating on resampled "
+            "views, using all cores."
+        )
+        self.uncertainty_button.clicked.connect(self.uncertainty_button_clicked)
+        uncertainty_layout.addWidget(self.uncertainty_button)
+
+        busy_layout = QtWidgets.QHBoxLayout()
+        self.dock_layout.addLayout(busy_layout)
+
+        self.busy_bar = QtWidgets.QProgressBar(self)
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setTextVisible(False)
+        self.busy_bar.setVisible(False)
+        busy_layout.addWidget(self.busy_bar)
+
+        self.cancel_button = QtWidgets.QPushButton(self)
+        self.cancel_button.setIcon(qta.icon("mdi.close-circle"))
+        self.cancel_button.setToolTip("Cancel calibration.")
+        self.cancel_button.setVisible(False)
+        self.cancel_button.clicked.connect(self.cancel_clicked)
+        busy_layout.addWidget(self.cancel_button)
+
+        self.status_label = QtWidgets.QLabel(self)
+        self.dock_layout.addWidget(self.status_label)
+
+        self.elapsed_timer = QtCore.QElapsedTimer()
+        self.status_timer = QtCore.QTimer(self)
+        self.status_timer.setInterval(100)
+        self.status_timer.timeout.connect(self.update_status)
+        self.views = 0
+        self.busy_message = ""
+
         self.results_scroll_area = QtWidgets.QScrollArea(self)
         self.results_scroll_area.setWidgetResizable(True)
         self.results_contents = QtWidgets.QWidget(self)
@@ -32,12 +122,24 @@ class CalibrateDock(BaseDock):
         self.scroll_area_layout = QtWidgets.QVBoxLayout(self.results_contents)
         self.dock_layout.addWidget(self.results_scroll_area)
 
+        self.undistort_checkbox = QtWidgets.QCheckBox("Show undistorted", self)
+        self.undistort_checkbox.setToolTip(
+            "Show the gallery thumbnails undistorted with the results."
+        )
+        self.dock_layout.addWidget(self.undistort_checkbox)
+
         self.results_label = QtWidgets.QLabel(self)
         self.results_label.setTextInteractionFlags(
             QtCore.Qt.TextInteractionFlag.TextSelectableByMouse
         )
         self.scroll_area_layout.addWidget(self.results_label)
 
+        self.uncertainty_label = QtWidgets.QLabel(self)
+        self.uncertainty_label.setTextInteractionFlags(
+            QtCore.Qt.TextInteractionFlag.TextSelectableByMouse
+        )
+        self.scroll_area_layout.addWidget(self.uncertainty_label)
+
         icon_size = 18
         self.save_button = QtWidgets.QPushButton(self)
         self.save_button.setIcon(qta.icon("mdi.content-save"))
@@ -51,6 +153,41 @@ class CalibrateDock(BaseDock):
         camera_model = self.camera_model_combobox.currentText().replace(" ", "").lower()
         self.start_calibrate.emit(camera_model == "fisheye")
 
+    def uncertainty_button_clicked(self):
+        self.estimate_uncertainty.emit(
+            self.uncertainty_combobox.currentText(), self.resamples_spinbox.value()
+        )
+
+    def set_busy(self, views, message="Calibrating {views} views"):
+        self.views = views
+        self.busy_message = message
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setVisible(True)
+        self.cancel_button.setVisible(True)
+        self.elapsed_timer.start()
+        self.status_timer.start()
+        self.update_status()
+
+    def set_done(self, message):
+        """Leave the busy state, message may contain {views} and {elapsed}."""
+        self.status_timer.stop()
+        self.busy_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
+        self.status_label.setText(
+            message.format(
+                views=self.views, elapsed=self.elapsed_timer.elapsed() / 1000
+            )
+        )
+
+    def set_progress(self, done, total):
+        self.busy_bar.setRange(0, total)
+        self.busy_bar.setValue(done)
+
+    def update_status(self):
+        elapsed = self.elapsed_timer.elapsed() / 1000
+        message = self.busy_message.format(views=self.views)
+        self.status_label.setText(f"{message}... {elapsed:.1f} s")
+
     def set_results(
         self,
         rms_error,
@@ -59,7 +196,11 @@ class CalibrateDock(BaseDock):
         rotation_vecs,
         translation_vecs,
         fisheye,
+        view_errors=(),
+        excluded=(),
     ):
+        """view_errors: (label, RMS error, corner errors) of each view used,
+        excluded: (label, reason) of each view left out."""
         fx = intrinsic_matrix[0, 0]
         fy = intrinsic_matrix[1, 1]
         cx = intrinsic_matrix[0, 2]
@@ -101,7 +242,23 @@ class CalibrateDock(BaseDock):
                 f"p2 = {p2:.4f}\n"
                 f"k3 = {k3:.4f}\n"
             )
+        if len(view_errors):
+            output_text += "\nView RMS Error (pixels), worst first,\n"
+            for label, error, corner_errors in sorted(
+                view_errors, key=lambda view: view[1], reverse=True
+            ):
+                output_text += (
+                    f"{label} = {error:.3f} (max {corner_errors.max():.3f})\n"
+                )
+        if len(excluded):
+            output_text += "\nExcluded Views,\n"
+            for label, reason in excluded:
+                output_text += f"{label}: {reason}\n"
         self.results_label.setText(f"Results:\n\n{output_text}")
+        self.uncertainty_label.setText("")
+
+    def set_uncertainty(self, text):
+        self.uncertainty_label.setText(f"Uncertainty:\n\n{text}")
 
 
 if __name__ == "__main__":
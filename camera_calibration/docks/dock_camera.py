@@ -1,10 +1,10 @@
-import re
+import json
 
 import qtawesome as qta
 
 from camera_calibration.custom_components.dock_base import BaseDock
-from camera_calibration.defs import QtWidgets, Signal
-from camera_calibration.funcs.opencv_camera import get_cameras
+from camera_calibration.defs import QtCore, QtWidgets, Signal
+from camera_calibration.workers.worker_camera import CameraProbeWorker
 
 
 class CameraDock(BaseDock):
@@ -16,8 +16,10 @@ class CameraDock(BaseDock):
 
         self.setWindowTitle("Camera")
 
-        self.cameras = []
+        self.backend = backend
+        self.cameras = None  # probed camera info, None until probed or restored
         self.camera_no = 0
+        self.probe_worker = None
 
         devices_layout = QtWidgets.QHBoxLayout()
         self.dock_layout.addLayout(devices_layout)
@@ -27,7 +29,6 @@ class CameraDock(BaseDock):
             QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Maximum
         )
         devices_layout.addWidget(self.devices_combobox)
-        self.refresh_devices()
 
         self.refresh_button = QtWidgets.QPushButton(self)
         self.refresh_button.setIcon(qta.icon("mdi.refresh"))
@@ -50,23 +51,69 @@ class CameraDock(BaseDock):
             self.settings_button.clicked.connect(self.settings_button_clicked.emit)
             self.dock_layout.addWidget(self.settings_button)
 
+        # probe after settings are restored, and only if nothing was cached
+        QtCore.QTimer.singleShot(0, self.refresh_if_unknown)
+
+    def refresh_if_unknown(self):
+        if self.cameras is None:
+            self.refresh_devices()
+
     def refresh_devices(self):
+        if self.probe_worker is not None:
+            return
+        self.refresh_button.setDisabled(True)
+        self.connect_button.setDisabled(True)
         self.devices_combobox.clear()
-        self.cameras = get_cameras(10)
-        self.devices_combobox.addItems([f"Camera {i}" for i in self.cameras])
-        if self.camera_no and self.camera_no in self.cameras:
-            self.devices_combobox.setCurrentText(f"Camera {self.camera_no}")
+        self.devices_combobox.setPlaceholderText("Searching for cameras...")
+
+        self.probe_worker = CameraProbeWorker(10, backend=self.backend)
+        self.probe_worker.finished.connect(self.devices_found)
+        self.probe_worker.start()
+
+    def devices_found(self, cameras):
+        self.probe_worker = None
+        self.refresh_button.setDisabled(False)
+        self.set_cameras(cameras)
+
+    def set_cameras(self, cameras):
+        current = self.devices_combobox.currentText()
+        self.cameras = cameras
+        self.devices_combobox.clear()
+        self.devices_combobox.setPlaceholderText("No cameras found")
+        for info in cameras:
+            text = f"Camera {info['index']} ({info['backend']}"
+            if info["resolutions"]:
+                width, height = max(info["resolutions"])
+                text += f", up to {width}x{height}"
+            self.devices_combobox.addItem(f"{text})", info)
+        self.devices_combobox.setCurrentIndex(
+            max(self.devices_combobox.findText(current), 0) if cameras else -1
+        )
+        self.connect_button.setDisabled(not cameras)
 
     def connect_button_clicked(self):
-        camera = self.devices_combobox.currentText()
+        info = self.devices_combobox.currentData()
         self.connect_button.setDisabled(True)
         self.refresh_button.setDisabled(True)
-        self.connect_camera_clicked.emit(int(re.findall(r"\d+", camera)[0]))
+        self.connect_camera_clicked.emit(info["index"])
 
     def camera_closed(self):
         self.connect_button.setDisabled(False)
         self.refresh_button.setDisabled(False)
 
+    def gui_save(self, settings):
+        super().gui_save(settings)
+        if self.cameras is not None:
+            settings.setValue(f"{self.save_heading}/cameras", json.dumps(self.cameras))
+
+    def gui_restore(self, settings):
+        if value := settings.value(f"{self.save_heading}/cameras"):
+            cameras = json.loads(value)
+            for info in cameras:
+                info["resolutions"] = [tuple(r) for r in info["resolutions"]]
+            self.set_cameras(cameras)
+        super().gui_restore(settings)
+
 
 if __name__ == "__main__":
     app = QtWidgets.QApplication([])
@@ -8,6 +8,8 @@ from camera_calibration.funcs import make_pattern_pixmap
 
 
 class PatternDock(BaseDock):
+    detection_settings_changed = Signal()
+
     def __init__(self):
         super().__init__()
 
@@ -16,6 +18,12 @@ class PatternDock(BaseDock):
 
         self.display = None
 
+        # wait for spin box changes to settle before re-detecting
+        self.detection_timer = QtCore.QTimer(self)
+        self.detection_timer.setSingleShot(True)
+        self.detection_timer.setInterval(300)
+        self.detection_timer.timeout.connect(self.detection_settings_changed.emit)
+
         row_layout = QtWidgets.QHBoxLayout()
         self.dock_layout.addLayout(row_layout)
 
@@ -24,6 +32,9 @@ class PatternDock(BaseDock):
             ["Checkerboard", "Circles", "Asymmetric Circles"]
         )
         self.show_pattern_combobox.currentIndexChanged.connect(self.update_pattern)
+        self.show_pattern_combobox.currentIndexChanged.connect(
+            self.detection_timer.start
+        )
         row_layout.addWidget(self.show_pattern_combobox)
 
         row_layout = QtWidgets.QHBoxLayout()
@@ -34,6 +45,7 @@ class PatternDock(BaseDock):
         self.show_col_spinbox.setRange(1, 100)
         self.show_col_spinbox.setValue(6)
         self.show_col_spinbox.valueChanged.connect(self.update_pattern)
+        self.show_col_spinbox.valueChanged.connect(self.detection_timer.start)
         row_layout.addWidget(self.show_col_spinbox)
 
         self.show_row_spinbox = QtWidgets.QSpinBox(self)
@@ -41,6 +53,7 @@ class PatternDock(BaseDock):
         self.show_row_spinbox.setRange(1, 100)
         self.show_row_spinbox.setValue(6)
         self.show_row_spinbox.valueChanged.connect(self.update_pattern)
+        self.show_row_spinbox.valueChanged.connect(self.detection_timer.start)
         row_layout.addWidget(self.show_row_spinbox)
 
         row_layout = QtWidgets.QHBoxLayout()
@@ -71,6 +84,21 @@ class PatternDock(BaseDock):
         row_layout = QtWidgets.QHBoxLayout()
         self.dock_layout.addLayout(row_layout)
 
+        # coarse-to-fine detection is remembered separately for each pattern
+        self.coarse_patterns = set()
+        self.coarse_checkbox = QtWidgets.QCheckBox("Coarse-to-fine detection", self)
+        self.coarse_checkbox.setToolTip(
+            "Locate the pattern on a downscaled image and refine at full resolution.\n"
+            "Faster for high resolution images."
+        )
+        self.coarse_checkbox.toggled.connect(self.coarse_checkbox_toggled)
+        self.coarse_checkbox.toggled.connect(self.detection_timer.start)
+        self.show_pattern_combobox.currentIndexChanged.connect(self.pattern_changed)
+        row_layout.addWidget(self.coarse_checkbox)
+
+        row_layout = QtWidgets.QHBoxLayout()
+        self.dock_layout.addLayout(row_layout)
+
         # self.screen_combobox = QtWidgets.QComboBox(self)
         # for i in range(len(self.screens)):
         #     self.screen_combobox.addItem("Screen {}".format(i + 1))
@@ -96,6 +124,20 @@ class PatternDock(BaseDock):
         else:
             self.display = None
 
+    def coarse_checkbox_toggled(self, checked):
+        pattern = self.show_pattern_combobox.currentText()
+        if checked:
+            self.coarse_patterns.add(pattern)
+        else:
+            self.coarse_patterns.discard(pattern)
+
+    def pattern_changed(self):
+        self.coarse_checkbox.blockSignals(True)
+        self.coarse_checkbox.setChecked(
+            self.show_pattern_combobox.currentText() in self.coarse_patterns
+        )
+        self.coarse_checkbox.blockSignals(False)
+
     def get_settings(self):
         return dict(
             pattern=self.show_pattern_combobox.currentText(),
@@ -103,8 +145,18 @@ class PatternDock(BaseDock):
             cols=self.show_col_spinbox.value(),
             size=self.show_size_spinbox.value(),
             radius_rate=self.show_radius_spinbox.value(),
+            coarse=self.coarse_checkbox.isChecked(),
         )
 
+    def set_settings(self, settings):
+        """Inverse of get_settings."""
+        self.show_pattern_combobox.setCurrentText(settings["pattern"])
+        self.show_row_spinbox.setValue(settings["rows"])
+        self.show_col_spinbox.setValue(settings["cols"])
+        self.show_size_spinbox.setValue(settings["size"])
+        self.show_radius_spinbox.setValue(settings["radius_rate"])
+        self.coarse_checkbox.setChecked(settings["coarse"])
+
     def show_pattern(self):
         settings = self.get_settings()
 
@@ -120,6 +172,15 @@ class PatternDock(BaseDock):
     def gui_save(self, settings):
         self.display = None
         super().gui_save(settings)
+        settings.setValue(
+            f"{self.save_heading}/coarse_patterns", ",".join(self.coarse_patterns)
+        )
+
+    def gui_restore(self, settings):
+        super().gui_restore(settings)
+        if value := settings.value(f"{self.save_heading}/coarse_patterns"):
+            self.coarse_patterns = set(value.split(","))
+        self.pattern_changed()
 
 
 class MyPatternDisplay(QtWidgets.QLabel):
@@ -0,0 +1,55 @@
+from camera_calibration.custom_components.dock_base import BaseDock
+from camera_calibration.defs import QtWidgets
+
+
+class VideoDock(BaseDock):
+    def __init__(self):
+        super().__init__()
+
+        self.setWindowTitle("Video")
+
+        self.stride_spinbox = QtWidgets.QSpinBox(self)
+        self.stride_spinbox.setPrefix("Every ")
+        self.stride_spinbox.setSuffix(" frames")
+        self.stride_spinbox.setRange(1, 10000)
+        self.stride_spinbox.setValue(10)
+        self.stride_spinbox.setToolTip("Only consider every n-th frame.")
+        self.dock_layout.addWidget(self.stride_spinbox)
+
+        self.motion_spinbox = QtWidgets.QDoubleSpinBox(self)
+        self.motion_spinbox.setPrefix("Min motion ")
+        self.motion_spinbox.setRange(0, 255)
+        self.motion_spinbox.setDecimals(1)
+        self.motion_spinbox.setValue(0)
+        self.motion_spinbox.setToolTip(
+            "Minimum mean intensity change (0-255) from the last kept frame."
+        )
+        self.dock_layout.addWidget(self.motion_spinbox)
+
+        self.max_frames_spinbox = QtWidgets.QSpinBox(self)
+        self.max_frames_spinbox.setPrefix("Max ")
+        self.max_frames_spinbox.setSuffix(" frames")
+        self.max_frames_spinbox.setRange(0, 100000)
+        self.max_frames_spinbox.setSpecialValueText("No frame limit")
+        self.max_frames_spinbox.setValue(100)
+        self.max_frames_spinbox.setToolTip(
+            "Spread at most this many frames over the video."
+        )
+        self.dock_layout.addWidget(self.max_frames_spinbox)
+
+        self.dock_layout.addStretch()
+
+    def get_settings(self):
+        return dict(
+            stride=self.stride_spinbox.value(),
+            min_motion=self.motion_spinbox.value(),
+            max_frames=self.max_frames_spinbox.value(),
+        )
+
+
+if __name__ == "__main__":
+    app = QtWidgets.QApplication([])
+    widget = VideoDock()
+    widget.show()
+
+    app.exec()
@@ -11,10 +11,37 @@ from .coord_transform import (
     opencv_draw_rect,
     cvImg_to_qImg,
 )
+from .qt_image import array_to_qimage, qimage_format, QImageBuffer
 from .draw_cal_pattern import make_pattern_pixmap
 from .intrinsic_calc import (
     find_points,
+    detect_points_preview,
     calibrate_camera,
+    calibrate,
+    save_calibration,
+    load_calibration,
     undistort,
     get_undistort_funcs,
 )
+from .batch_calc import find_points_batch, batch_calibrate
+from .points_cache import PointsCache, image_hash, find_points_cached
+from .image_source import FileImage, MissingImage, SpilledImage, make_thumbnail
+from .video_frames import sample_video_frames
+from .keyframes import KeyframeSelector, rough_pose
+from .view_selection import select_views
+from .reprojection import (
+    reprojection_errors,
+    calibrate_checked,
+    calibrate_rejecting_outliers,
+)
+from .uncertainty import estimate_uncertainty, format_uncertainty
+from .synthetic import SyntheticBoard, SyntheticCamera, generate_views, write_dataset
+from .undistort_maps import (
+    UndistortMapCache,
+    ThumbnailUndistortion,
+    compute_undistort_maps,
+    scale_intrinsics,
+    undistort_maps,
+)
+from .batch_undistort import undistort_batch, undistort_images, undistort_video
+from .session import save_session, load_session
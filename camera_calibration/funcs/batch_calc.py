@@ -0,0 +1,148 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.funcs.check_mimetypes import check_file_type
+from camera_calibration.funcs.intrinsic_calc import find_points
+from camera_calibration.funcs.reprojection import calibrate_rejecting_outliers
+from camera_calibration.funcs.uncertainty import (
+    estimate_uncertainty,
+    format_uncertainty,
+)
+from camera_calibration.funcs.view_selection import select_views
+
+
+def _init_worker():
+    # one OpenCV thread per process, the pool provides the parallelism
+    cv.setNumThreads(1)
+
+
+def _find_points_file(path, nx, ny, pattern, spacing, coarse):
+    img = cv.imread(str(path))
+    if img is None:
+        return path, None, False, None, None
+
+    _, ret, objpoints, imgpoints = find_points(img, nx, ny, pattern, spacing, coarse)
+    return path, img.shape[:2][::-1], ret, objpoints, imgpoints
+
+
+def find_points_batch(
+    img_files,
+    nx,
+    ny,
+    pattern="Checkerboard",
+    spacing=1,
+    workers=None,
+    chunk_size=None,
+    coarse=False,
+):
+    img_files = list(img_files)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, len(img_files) // (workers * 4))
+
+    func = partial(
+        _find_points_file,
+        nx=nx,
+        ny=ny,
+        pattern=pattern,
+        spacing=spacing,
+        coarse=coarse,
+    )
+    if workers == 1:
+        yield from map(func, img_files)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        yield from pool.map(func, img_files, chunksize=chunk_size)
+
+
+def batch_calibrate(
+    img_files,
+    rows,
+    cols,
+    pattern="Checkerboard",
+    spacing=1,
+    fisheye=False,
+    workers=None,
+    chunk_size=None,
+    coarse=False,
+    max_views=0,
+    max_error=0,
+    uncertainty=None,
+    resamples=200,
+):
+    """Calibrate from image files, rows/cols as in the pattern dock.
+
+    With max_views only a subset of the views covering the image and spanning the board
+    poses is used, views with an RMS reprojection error above max_error are dropped.
+    uncertainty: "Bootstrap" or "Jackknife" to log the spread of the intrinsics.
+    """
+    paths = []
+    imgshapes = []
+    objpoints = []
+    imgpoints = []
+    for path, shape, ret, objp, imgp in find_points_batch(
+        img_files, rows - 1, cols - 1, pattern, spacing, workers, chunk_size, coarse
+    ):
+        if shape is None:
+            logging.warning(f"Could not read {path}")
+            continue
+        logging.info(f"{path} - {ret}")
+        if ret:
+            paths.append(path)
+            objpoints.append(objp)
+            imgpoints.append(imgp)
+            imgshapes.append(shape)
+
+    if len(objpoints) == 0:
+        raise ValueError("No calibration data available!")
+    if len(set(imgshapes)) > 1:
+        raise ValueError("Image with different shape was used!")
+
+    selected = select_views(objpoints, imgpoints, imgshapes[0], max_views)
+    if len(selected) < len(objpoints):
+        logging.info(f"Selected {len(selected)} of {len(objpoints)} views")
+        objpoints = [objpoints[i] for i in selected]
+        imgpoints = [imgpoints[i] for i in selected]
+
+    calibration = calibrate_rejecting_outliers(
+        objpoints, imgpoints, imgshapes[0], fisheye, max_error
+    )
+    for i, reason in sorted(calibration["excluded"].items()):
+        logging.info(f"Excluded {paths[selected[i]]} - {reason}")
+    worst = np.argmax(calibration["view_errors"])
+    logging.info(
+        f"Worst view {paths[selected[calibration['kept'][worst]]]} - "
+        f"{calibration['view_errors'][worst]:.3f} px"
+    )
+    if uncertainty:
+        kept = [selected[i] for i in calibration["kept"]]
+        summary = estimate_uncertainty(
+            [objpoints[i] for i in calibration["kept"]],
+            [imgpoints[i] for i in calibration["kept"]],
+            imgshapes[0],
+            fisheye,
+            calibration["results"],
+            uncertainty,
+            resamples,
+            workers=workers,
+        )
+        labels = [Path(paths[i]).name for i in kept]
+        logging.info(f"Uncertainty\n{format_uncertainty(summary, fisheye, labels)}")
+    return calibration["results"]
+
+
+def image_files_in(paths):
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from (
+                p for p in sorted(path.glob("*")) if check_file_type(p, ["image"])
+            )
+        else:
+            yield path
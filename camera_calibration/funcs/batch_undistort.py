@@ -0,0 +1,253 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2 as cv
+
+from camera_calibration.funcs.check_mimetypes import check_file_type
+from camera_calibration.funcs.undistort_maps import undistort_maps
+
+video_fourcc = "mp4v"
+video_suffix = ".mp4"
+
+
+def media_files_in(paths):
+    """Image and video files given directly or found in folders."""
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from (
+                p
+                for p in sorted(path.glob("*"))
+                if check_file_type(p, ["image", "video"])
+            )
+        else:
+            yield path
+
+
+def remap_maps(
+    shape, intrinsic_matrix, distortion_coeffs, fisheye, alpha=None, cache=None
+):
+    # fixed-point maps are smaller than float maps and faster to remap with
+    cache = cache or undistort_maps
+    return cache.get(
+        shape, intrinsic_matrix, distortion_coeffs, fisheye, alpha, cv.CV_16SC2
+    )
+
+
+def remap(img, maps, crop=False):
+    map1, map2, _, roi = maps
+    dst = cv.remap(img, map1, map2, cv.INTER_LINEAR)
+    if crop and roi is not None and roi[2] > 0 and roi[3] > 0:
+        x, y, w, h = roi
+        dst = dst[y : y + h, x : x + w]
+    return dst
+
+
+def pipelined(func, items, workers, depth=None):
+    """Map func over items on a thread pool, yielding the results in order.
+
+    At most depth items are in flight, so reading the items, running func and
+    consuming the results overlap without buffering a whole video.
+    """
+    depth = depth or 2 * workers
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def prefetch(items, depth):
+    """Iterate items on a background thread, e.g. to decode while encoding."""
+    buffer = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                buffer.put(item)
+        except Exception as e:
+            buffer.put(e)
+        buffer.put(done)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while (item := buffer.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # unblock the producer if it's waiting on a full queue
+        while thread.is_alive():
+            try:
+                buffer.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def read_frames(cap):
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            return
+        yield frame
+
+
+def undistort_images(
+    img_files,
+    output_dir,
+    intrinsic_matrix,
+    distortion_coeffs,
+    fisheye=False,
+    crop=False,
+    alpha=None,
+    workers=None,
+    map_cache=None,
+):
+    """Undistort image files into output_dir, keeping their names.
+
+    Each image is read, remapped and written by one of the threads, OpenCV releases
+    the GIL for all three. Returns the number of images written.
+    """
+    output_dir = Path(output_dir)
+    workers = workers or os.cpu_count() or 1
+
+    def undistort_file(path):
+        img = cv.imread(str(path), cv.IMREAD_UNCHANGED)
+        if img is None:
+            return path, None
+        maps = remap_maps(
+            img.shape, intrinsic_matrix, distortion_coeffs, fisheye, alpha, map_cache
+        )
+        output_path = output_dir / path.name
+        if not cv.imwrite(str(output_path), remap(img, maps, crop)):
+            return path, None
+        return path, output_path
+
+    count = 0
+    for path, output_path in pipelined(undistort_file, img_files, workers):
+        if output_path is None:
+            logging.warning(f"Could not undistort {path}")
+        else:
+            count += 1
+    return count
+
+
+def undistort_video(
+    video_path,
+    output_path,
+    intrinsic_matrix,
+    distortion_coeffs,
+    fisheye=False,
+    crop=False,
+    alpha=None,
+    workers=None,
+    map_cache=None,
+):
+    """Undistort a video frame by frame, returns the number of frames written.
+
+    Frames are decoded on a reader thread, remapped across the thread pool and encoded
+    in order on the calling thread.
+    """
+    workers = workers or os.cpu_count() or 1
+    cap = cv.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise IOError(f"Could not open {video_path}")
+
+    fps = cap.get(cv.CAP_PROP_FPS) or 30
+    shape = (
+        int(cap.get(cv.CAP_PROP_FRAME_HEIGHT)),
+        int(cap.get(cv.CAP_PROP_FRAME_WIDTH)),
+    )
+    maps = remap_maps(
+        shape, intrinsic_matrix, distortion_coeffs, fisheye, alpha, map_cache
+    )
+    size = shape[::-1]
+    if crop and maps[3] is not None and maps[3][2] > 0 and maps[3][3] > 0:
+        size = tuple(maps[3][2:])
+
+    writer = cv.VideoWriter(
+        str(output_path), cv.VideoWriter_fourcc(*video_fourcc), fps, size
+    )
+    if not writer.isOpened():
+        cap.release()
+        raise IOError(f"Could not write {output_path}")
+
+    count = 0
+    frames = prefetch(read_frames(cap), 2 * workers)
+    try:
+        for frame in pipelined(lambda f: remap(f, maps, crop), frames, workers):
+            writer.write(frame)
+            count += 1
+    finally:
+        frames.close()  # stop the reader before releasing the capture
+        cap.release()
+        writer.release()
+    return count
+
+
+def undistort_batch(
+    inputs,
+    output_dir,
+    intrinsic_matrix,
+    distortion_coeffs,
+    fisheye=False,
+    crop=False,
+    alpha=None,
+    workers=None,
+    map_cache=None,
+):
+    """Undistort image files, videos and folders of them into output_dir.
+
+    Maps are built once per image size as fixed-point CV_16SC2 maps, map_cache is an
+    UndistortMapCache (default the shared undistort_maps), give it a cache_dir to reuse
+    the maps across runs. crop: crop to the valid region of interest of the standard
+    model, alpha: the free scaling or fisheye balance, see compute_undistort_maps.
+    Returns dict(frames, seconds, fps).
+    """
+    if crop and fisheye:
+        logging.warning("--crop has no effect with the fisheye model, use --alpha")
+        crop = False
+    output_dir = Path(output_dir)
+    img_files, video_files = [], []
+    for path in media_files_in(inputs):
+        if path.parent.resolve() == output_dir.resolve():
+            raise ValueError(f"{path} would be overwritten, use another output folder")
+        (video_files if check_file_type(path, ["video"]) else img_files).append(path)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    args = (
+        intrinsic_matrix,
+        distortion_coeffs,
+        fisheye,
+        crop,
+        alpha,
+        workers,
+        map_cache,
+    )
+    start = time.perf_counter()
+    frames = 0
+    if img_files:
+        frames += undistort_images(img_files, output_dir, *args)
+        logging.info(f"Undistorted {frames} of {len(img_files)} images")
+    for path in video_files:
+        output_path = output_dir / (path.stem + video_suffix)
+        count = undistort_video(path, output_path, *args)
+        logging.info(f"{path} - {count} frames")
+        frames += count
+
+    seconds = time.perf_counter() - start
+    return dict(frames=frames, seconds=seconds, fps=frames / seconds if seconds else 0)
@@ -1,6 +1,6 @@
 import cv2
 
-from camera_calibration.defs import QtGui
+from camera_calibration.funcs.qt_image import QImageBuffer
 
 
 def data_to_bbox(x, y, wx, wy):
@@ -38,9 +38,5 @@ def opencv_draw_rect(frame, x, y, wx, wy):
 
 
 def cvImg_to_qImg(cvImg):
-    height, width, channel = cvImg.shape
-    bytesPerLine = 3 * width
-    cvImg = cv2.cvtColor(cvImg, cv2.COLOR_BGR2RGB)
-    return QtGui.QImage(
-        cvImg.data, width, height, bytesPerLine, QtGui.QImage.Format_RGB888
-    )
+    """QImage owning a copy of the array, see qt_image for zero-copy wrapping."""
+    return QImageBuffer().wrap(cvImg).copy()
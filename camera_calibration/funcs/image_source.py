@@ -0,0 +1,54 @@
+import os
+import tempfile
+from pathlib import Path
+
+import cv2 as cv
+import numpy as np
+
+thumbnail_size = 400  # longest side of thumbnails kept in memory
+
+
+def make_thumbnail(img, size=thumbnail_size):
+    scale = size / max(img.shape[:2])
+    if scale >= 1:
+        return np.ascontiguousarray(img)
+    return cv.resize(img, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+
+
+class FileImage:
+    """Full resolution image reloaded from its file on disk."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def load(self):
+        return cv.imread(str(self.path))
+
+    def release(self):
+        pass
+
+
+class MissingImage:
+    """Full resolution image that can't be reloaded, e.g. a camera frame of a session."""
+
+    def load(self):
+        return None
+
+    def release(self):
+        pass
+
+
+class SpilledImage:
+    """Full resolution image kept in a memory-mapped spill file."""
+
+    def __init__(self, img, spill_dir=None):
+        fd, path = tempfile.mkstemp(suffix=".npy", dir=spill_dir)
+        os.close(fd)
+        self.path = Path(path)
+        np.save(self.path, img)
+
+    def load(self):
+        return np.load(self.path, mmap_mode="r")
+
+    def release(self):
+        self.path.unlink(missing_ok=True)
@@ -6,37 +6,133 @@ from pathlib import Path
 import cv2 as cv
 import numpy as np
 
-criteria = (cv.TERM_CRITERIA_EPS + cv.TERM_CRITERIA_MAX_ITER, 30, 0.001)
-
+from camera_calibration.funcs.undistort_maps import undistort_maps
 
-def find_points(img, nx, ny, pattern="Checkerboard", spacing=1):
+criteria = (cv.TERM_CRITERIA_EPS + cv.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+subpix_win = (5, 5)
+coarse_size = 1280  # longest side of the image used to locate the pattern
+
+# a warm start is close to the optimum, stop once the parameters settle instead of
+# always running the default 30 iterations
+warm_criteria = (cv.TERM_CRITERIA_COUNT + cv.TERM_CRITERIA_EPS, 30, 1e-9)
+# recompute the extrinsics every iteration and fail on ill-conditioned views, only
+# used to find the views a failed fisheye solve can't handle, see
+# reprojection.calibrate_checked
+checked_fisheye_flags = (
+    cv.fisheye.CALIB_RECOMPUTE_EXTRINSIC
+    + cv.fisheye.CALIB_CHECK_COND
+    + cv.fisheye.CALIB_FIX_SKEW
+)
+
+
+def make_objpoints(nx, ny, spacing=1):
     objpoints = np.zeros((nx * ny, 3), np.float32)
     objpoints[:, :2] = np.mgrid[0:nx, 0:ny].T.reshape(-1, 2) * spacing
+    return objpoints
+
+
+def find_points(img, nx, ny, pattern="Checkerboard", spacing=1, coarse=False):
+    objpoints = make_objpoints(nx, ny, spacing)
 
     gray = cv.cvtColor(img, cv.COLOR_BGR2GRAY)
 
+    if coarse and max(gray.shape) > coarse_size:
+        ret, imgpoints = detect_points_coarse(gray, nx, ny, pattern)
+    else:
+        ret, imgpoints = detect_points(gray, nx, ny, pattern)
+
+    return (img, ret, objpoints, imgpoints) if ret else (img, ret, None, None)
+
+
+def detect_points(gray, nx, ny, pattern="Checkerboard"):
     if pattern == "Checkerboard":
         ret, corners = cv.findChessboardCorners(gray, (nx, ny), None)
 
         if not ret:
-            return img, ret, None, None
+            return ret, None
 
-        imgpoints = cv.cornerSubPix(gray, corners, (5, 5), (-1, -1), criteria)
-        return img, ret, objpoints, imgpoints
+        imgpoints = cv.cornerSubPix(gray, corners, subpix_win, (-1, -1), criteria)
+        return ret, imgpoints
 
     elif pattern == "Circles":
-        ret, imgpoints = cv.findCirclesGrid(
+        return cv.findCirclesGrid(
             gray, (nx, ny), flags=cv.CALIB_CB_SYMMETRIC_GRID + cv.CALIB_CB_CLUSTERING
         )
 
-        return (img, ret, objpoints, imgpoints) if ret else (img, ret, None, None)
-
     elif pattern == "Asymmetric Circles":
-        ret, imgpoints = cv.findCirclesGrid(
+        return cv.findCirclesGrid(
             gray, (nx, ny), flags=cv.CALIB_CB_ASYMMETRIC_GRID + cv.CALIB_CB_CLUSTERING
         )
 
-        return (img, ret, objpoints, imgpoints) if ret else (img, ret, None, None)
+    return False, None
+
+
+def detect_points_coarse(gray, nx, ny, pattern="Checkerboard"):
+    """Locate the pattern on a downscaled image, refine at full resolution."""
+    h, w = gray.shape[:2]
+    scale = coarse_size / max(h, w)
+    small = cv.resize(gray, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+
+    ret, imgpoints = detect_points(small, nx, ny, pattern)
+    if not ret:
+        return ret, None
+
+    # map pixel centres back to the full resolution image
+    small_h, small_w = small.shape[:2]
+    imgpoints = (imgpoints + 0.5) * np.float32([w / small_w, h / small_h]) - 0.5
+
+    if pattern == "Checkerboard":
+        imgpoints = cv.cornerSubPix(gray, imgpoints, subpix_win, (-1, -1), criteria)
+    else:
+        imgpoints = refine_circle_centres(gray, imgpoints)
+    return ret, imgpoints
+
+
+def detect_points_preview(img, nx, ny, pattern="Checkerboard", width=640):
+    """Quick detection for live previews, without sub-pixel refinement."""
+    gray = cv.cvtColor(img, cv.COLOR_BGR2GRAY)
+    scale = min(width / gray.shape[1], 1)
+    if scale < 1:
+        gray = cv.resize(gray, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+
+    if pattern == "Checkerboard":
+        ret, imgpoints = cv.findChessboardCorners(
+            gray,
+            (nx, ny),
+            flags=cv.CALIB_CB_ADAPTIVE_THRESH
+            + cv.CALIB_CB_NORMALIZE_IMAGE
+            + cv.CALIB_CB_FAST_CHECK,
+        )
+    else:
+        ret, imgpoints = detect_points(gray, nx, ny, pattern)
+
+    if not ret:
+        return ret, None
+    return ret, ((imgpoints + 0.5) / np.float32(scale) - 0.5).astype(np.float32)
+
+
+def refine_circle_centres(gray, centres):
+    points = centres.reshape(-1, 2)
+    dists = np.linalg.norm(points[:, None] - points[None], axis=-1)
+    np.fill_diagonal(dists, np.inf)
+    half_win = max(2, int(dists.min() * 0.45))
+
+    h, w = gray.shape[:2]
+    refined = points.copy()
+    for i, (x, y) in enumerate(np.round(points).astype(int)):
+        if not (0 <= x < w and 0 <= y < h):
+            continue
+        x0, y0 = max(x - half_win, 0), max(y - half_win, 0)
+        x1, y1 = min(x + half_win + 1, w), min(y + half_win + 1, h)
+
+        _, mask = cv.threshold(
+            gray[y0:y1, x0:x1], 0, 255, cv.THRESH_BINARY_INV + cv.THRESH_OTSU
+        )
+        _, labels, _, centroids = cv.connectedComponentsWithStats(mask)
+        if label := labels[y - y0, x - x0]:
+            refined[i] = centroids[label] + (x0, y0)
+
+    return refined.reshape(centres.shape).astype(np.float32)
 
 
 def calibrate_camera(img_files, nx=9, ny=6):
@@ -60,13 +156,123 @@ def calibrate_camera(img_files, nx=9, ny=6):
     return cv.calibrateCamera(objpoints, imgpoints, gray.shape[::-1], None, None)
 
 
-def undistort(img, intrinsic_matrix, distortion_coeffs):
-    h, w = img.shape[:2]
-    newcameramtx, roi = cv.getOptimalNewCameraMatrix(
-        intrinsic_matrix, distortion_coeffs, (w, h), 1, (w, h)
+def calibrate(
+    objpoints,
+    imgpoints,
+    shape,
+    fisheye=False,
+    intrinsic_matrix=None,
+    distortion_coeffs=None,
+    rotation_vecs=None,
+    translation_vecs=None,
+    fisheye_flags=0,
+):
+    """Calibrate, warm starting from a previous solution if one is given.
+
+    rotation_vecs/translation_vecs hold the previous pose of each view, None for views
+    that are new. They are only used by the standard model, the fisheye solver
+    initialises the extrinsics from the intrinsic guess. fisheye_flags are added to
+    the fisheye solver's flags.
+    """
+    if fisheye:
+        objpoints = np.expand_dims(
+            np.asarray(objpoints), -2
+        )  # https://github.com/opencv/opencv/issues/5534
+        if intrinsic_matrix is None:
+            return cv.fisheye.calibrate(
+                objpoints, imgpoints, shape, None, None, flags=fisheye_flags
+            )
+        return cv.fisheye.calibrate(
+            objpoints,
+            imgpoints,
+            shape,
+            intrinsic_matrix.copy(),
+            distortion_coeffs.copy(),
+            flags=fisheye_flags + cv.fisheye.CALIB_USE_INTRINSIC_GUESS,
+            criteria=warm_criteria,
+        )
+
+    if intrinsic_matrix is None:
+        return cv.calibrateCamera(objpoints, imgpoints, shape, None, None)
+
+    intrinsic_matrix = intrinsic_matrix.copy()
+    distortion_coeffs = distortion_coeffs.copy()
+    flags = cv.CALIB_USE_INTRINSIC_GUESS
+    if rotation_vecs is not None:
+        rotation_vecs = list(rotation_vecs)
+        translation_vecs = list(translation_vecs)
+        for i, rvec in enumerate(rotation_vecs):
+            if rvec is None:
+                _, rotation_vecs[i], translation_vecs[i] = cv.solvePnP(
+                    objpoints[i], imgpoints[i], intrinsic_matrix, distortion_coeffs
+                )
+            else:
+                rotation_vecs[i] = rvec.copy()
+                translation_vecs[i] = translation_vecs[i].copy()
+        flags += cv.CALIB_USE_EXTRINSIC_GUESS
+    return cv.calibrateCamera(
+        objpoints,
+        imgpoints,
+        shape,
+        intrinsic_matrix,
+        distortion_coeffs,
+        rotation_vecs,
+        translation_vecs,
+        flags=flags,
+        criteria=warm_criteria,
     )
 
-    dst = cv.undistort(img, intrinsic_matrix, distortion_coeffs, None, newcameramtx)
+
+def save_calibration(save_path, intrinsic_matrix, distortion_coeffs, fisheye):
+    save_path = Path(save_path)
+
+    if save_path.suffix == ".json":
+        with open(save_path, "w") as f:
+            json.dump(
+                dict(
+                    K=intrinsic_matrix.tolist(),
+                    D=distortion_coeffs.tolist(),
+                    fisheye=fisheye,
+                ),
+                f,
+                sort_keys=False,
+                indent=4,
+            )
+
+    elif save_path.suffix == ".npz":
+        np.savez(
+            save_path,
+            K=intrinsic_matrix,
+            D=distortion_coeffs,
+            fisheye=fisheye,
+        )
+
+
+def load_calibration(load_path):
+    """(K, D, fisheye) from a file written by save_calibration."""
+    load_path = Path(load_path)
+
+    if load_path.suffix == ".json":
+        with open(load_path) as f:
+            data = json.load(f)
+    elif load_path.suffix == ".npz":
+        data = np.load(load_path)
+    else:
+        raise ValueError(f"Unknown calibration format {load_path.suffix}")
+
+    return (
+        np.array(data["K"], np.float64),
+        np.array(data["D"], np.float64),
+        bool(data["fisheye"]),
+    )
+
+
+def undistort(img, intrinsic_matrix, distortion_coeffs):
+    # cv.undistort rebuilds the maps for every image
+    map1, map2, _, roi = undistort_maps.get(
+        img.shape, intrinsic_matrix, distortion_coeffs, map_type=cv.CV_16SC2
+    )
+    dst = cv.remap(img, map1, map2, cv.INTER_LINEAR)
 
     # # crop the image
     # x, y, w, h = roi
@@ -76,29 +282,10 @@ def undistort(img, intrinsic_matrix, distortion_coeffs):
 
 
 def get_undistort_funcs(shape, intrinsic_matrix, distortion_coeffs, fisheye=False):
-    h, w = shape[:2]
-
-    if not fisheye:
-        newcameramtx, roi = cv.getOptimalNewCameraMatrix(
-            intrinsic_matrix, distortion_coeffs, (w, h), 1, (w, h)
-        )
-
-        map_x, map_y = cv.initUndistortRectifyMap(
-            intrinsic_matrix, distortion_coeffs, None, newcameramtx, (w, h), 5
-        )
-    else:
-        newcameramtx = cv.fisheye.estimateNewCameraMatrixForUndistortRectify(
-            intrinsic_matrix, distortion_coeffs, (w, h), np.eye(3), balance=0
-        )
-        map_x, map_y = cv.fisheye.initUndistortRectifyMap(
-            intrinsic_matrix,
-            distortion_coeffs,
-            np.eye(3),
-            newcameramtx,
-            (w, h),
-            cv.CV_16SC2,
-        )
-
+    """Cached, read-only maps, see undistort_maps.UndistortMapCache."""
+    map_x, map_y, newcameramtx, _ = undistort_maps.get(
+        shape, intrinsic_matrix, distortion_coeffs, fisheye
+    )
     return map_x, map_y, newcameramtx
 
 
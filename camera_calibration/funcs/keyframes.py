@@ -0,0 +1,119 @@
+import time
+
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.funcs.intrinsic_calc import make_objpoints
+
+
+def rough_pose(objpoints, imgpoints, width, height):
+    """Board normal in camera coordinates and distance, for an uncalibrated camera.
+
+    The camera matrix is guessed (focal length = longest image side, principal point
+    in the centre), which is enough to compare the tilt and distance of views.
+    """
+    f = max(width, height)
+    K = np.array([[f, 0, width / 2], [0, f, height / 2], [0, 0, 1]], np.float64)
+    _, rvec, tvec = cv.solvePnP(objpoints, imgpoints, K, None)
+    R, _ = cv.Rodrigues(rvec)
+    return R[:, 2], float(np.linalg.norm(tvec))
+
+
+class KeyframeSelector:
+    """Accept board views that cover new parts of the image or show a new rough pose."""
+
+    def __init__(
+        self,
+        nx,
+        ny,
+        grid=(8, 6),
+        min_new_cells=2,
+        min_tilt=10,
+        min_distance_ratio=1.25,
+        min_interval=0.5,
+        max_views=20,
+        target_coverage=0.8,
+    ):
+        self.objpoints = make_objpoints(nx, ny)
+        self.grid = grid
+        self.min_new_cells = min_new_cells
+        self.min_tilt = min_tilt
+        self.min_distance_ratio = min_distance_ratio
+        self.min_interval = min_interval
+        self.max_views = max_views
+        self.target_coverage = target_coverage
+
+        self.coverage = np.zeros(grid[::-1], bool)
+        self.poses = []  # (board normal in camera coordinates, distance)
+        self.last_time = -np.inf
+
+    @property
+    def views(self):
+        return len(self.poses)
+
+    @property
+    def coverage_fraction(self):
+        return self.coverage.mean()
+
+    @property
+    def done(self):
+        return bool(
+            (self.max_views and self.views >= self.max_views)
+            or (self.target_coverage and self.coverage_fraction >= self.target_coverage)
+        )
+
+    def covered_cells(self, imgpoints, shape):
+        """Grid cells whose centre lies inside the board outline."""
+        h, w = shape[:2]
+        gx, gy = self.grid
+        hull = cv.convexHull(imgpoints.reshape(-1, 2).astype(np.float32))
+        cells = np.zeros((gy, gx), bool)
+        for j in range(gy):
+            for i in range(gx):
+                centre = ((i + 0.5) * w / gx, (j + 0.5) * h / gy)
+                cells[j, i] = cv.pointPolygonTest(hull, centre, False) >= 0
+
+        # small boards may not contain any cell centre
+        x, y = imgpoints.reshape(-1, 2).mean(axis=0)
+        cells[min(int(y * gy / h), gy - 1), min(int(x * gx / w), gx - 1)] = True
+        return cells
+
+    def is_new_pose(self, normal, distance):
+        max_log_ratio = np.log(self.min_distance_ratio)
+        for other_normal, other_distance in self.poses:
+            tilt = np.degrees(np.arccos(np.clip(normal @ other_normal, -1, 1)))
+            log_ratio = abs(np.log(distance / other_distance))
+            if tilt < self.min_tilt and log_ratio < max_log_ratio:
+                return False
+        return True
+
+    def consider(self, imgpoints, shape):
+        """Record the view and return True if it adds coverage or a new pose."""
+        now = time.monotonic()
+        if self.done or now - self.last_time < self.min_interval:
+            return False
+
+        cells = self.covered_cells(imgpoints, shape)
+        new_cells = np.count_nonzero(cells & ~self.coverage)
+        normal, distance = rough_pose(self.objpoints, imgpoints, shape[1], shape[0])
+        if new_cells < self.min_new_cells and not self.is_new_pose(normal, distance):
+            return False
+
+        self.coverage |= cells
+        self.poses.append((normal, distance))
+        self.last_time = now
+        return True
+
+
+if __name__ == "__main__":
+    import sys
+
+    from camera_calibration.funcs.intrinsic_calc import find_points
+
+    selector = KeyframeSelector(9, 6, min_interval=0)
+    for path in sys.argv[1:]:
+        img = cv.imread(path)
+        _, ret, _, imgpoints = find_points(img, 9, 6)
+        if ret:
+            added = selector.consider(imgpoints, img.shape)
+            print(path, added, f"{selector.coverage_fraction:.0%}")
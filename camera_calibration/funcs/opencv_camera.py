@@ -1,14 +1,104 @@
+import logging
+import queue
+import threading
+import time
+
 import cv2 as cv
 
+common_resolutions = [
+    (640, 480),
+    (1280, 720),
+    (1280, 960),
+    (1920, 1080),
+    (2592, 1944),
+    (3840, 2160),
+]
 
-def get_cameras(max_no=100):
-    cameras = []
-    for index, _ in enumerate(reversed(range(max_no))):
-        cap = cv.VideoCapture(index)
-        if cap.isOpened():
-            cameras.append(index)
-            cap.release()
-        else:
-            cap.release()
+
+def camera_backend(name=""):
+    """cv.CAP_* constant for a backend name such as "DSHOW", CAP_ANY if unknown."""
+    return getattr(cv, f"CAP_{name}", cv.CAP_ANY) if name else cv.CAP_ANY
+
+
+def probe_camera(index, backend=cv.CAP_ANY):
+    """Index and backend name of a camera, None if it can't be opened."""
+    cap = cv.VideoCapture(index, backend)
+    try:
+        if not cap.isOpened():
+            return None
+        return dict(index=index, backend=cap.getBackendName())
+    finally:
+        cap.release()
+
+
+def camera_resolutions(index, backend=cv.CAP_ANY, resolutions=common_resolutions):
+    """The resolutions a camera accepts, each change can take a second on UVC."""
+    cap = cv.VideoCapture(index, backend)
+    try:
+        if not cap.isOpened():
+            return []
+        supported = []
+        for width, height in resolutions:
+            cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+            cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+            actual = (
+                int(cap.get(cv.CAP_PROP_FRAME_WIDTH)),
+                int(cap.get(cv.CAP_PROP_FRAME_HEIGHT)),
+            )
+            if actual == (width, height):
+                supported.append(actual)
+        return supported
+    finally:
+        cap.release()
+
+
+def probe_cameras(max_no=10, timeout=5, backend=cv.CAP_ANY):
+    """Probe camera indices concurrently, giving up on devices that can't be opened
+    within timeout, then list the resolutions of the cameras found.
+
+    A hanging open can't be interrupted, the probes run on daemon threads so one left
+    behind doesn't keep the interpreter from exiting.
+    """
+    results = queue.Queue()
+
+    def probe(index):
+        try:
+            results.put((index, probe_camera(index, backend), None))
+        except Exception as e:
+            results.put((index, None, e))
+
+    for index in range(max_no):
+        threading.Thread(target=probe, args=(index,), daemon=True).start()
+
+    probed = {}
+    deadline = time.monotonic() + timeout
+    while len(probed) < max_no:
+        try:
+            index, info, error = results.get(
+                timeout=max(deadline - time.monotonic(), 0)
+            )
+        except queue.Empty:
             break
+        probed[index] = (info, error)
+
+    cameras = []
+    for index in range(max_no):
+        if index not in probed:
+            logging.warning(f"Probing camera {index} timed out after {timeout} s")
+            continue
+        info, error = probed[index]
+        if error is not None:
+            logging.warning(f"Probing camera {index} failed: {error}")
+        elif info is not None:
+            cameras.append(info)
+
+    # slow but present cameras aren't dropped, only opening them is timed
+    for info in cameras:
+        try:
+            info["resolutions"] = camera_resolutions(info["index"], backend)
+        except cv.error as e:
+            logging.warning(
+                f"Listing resolutions of camera {info['index']} failed: {e}"
+            )
+            info["resolutions"] = []
     return cameras
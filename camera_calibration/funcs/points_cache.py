@@ -0,0 +1,151 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from camera_calibration.funcs.intrinsic_calc import (
+    coarse_size,
+    criteria,
+    find_points,
+    make_objpoints,
+    subpix_win,
+)
+
+
+def image_hash(img):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((img.shape, img.dtype.str)).encode())
+    h.update(np.ascontiguousarray(img).data)
+    return h.hexdigest()
+
+
+class PointsCache:
+    """On-disk store of detected points keyed by image content and settings.
+
+    Only the image points are stored (float32), object points are rebuilt from
+    the pattern size. Least recently used entries are evicted once the store
+    grows beyond max_size bytes.
+    """
+
+    def __init__(self, path, max_size=32 * 2**20):
+        self.path = path
+        self.max_size = max_size
+        self.lock = threading.Lock()
+
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS points ("
+            "key TEXT PRIMARY KEY, ret INTEGER, data BLOB, size INTEGER, accessed REAL)"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS points_accessed ON points (accessed)"
+        )
+        self.db.commit()
+        (self.size,) = self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM points"
+        ).fetchone()
+
+    @staticmethod
+    def make_key(img_hash, nx, ny, pattern, spacing=1, coarse=False):
+        refine = (subpix_win, criteria) if pattern == "Checkerboard" else None
+        detect = f"coarse{coarse_size}" if coarse else "full"
+        return f"{img_hash}:{pattern}:{nx}x{ny}:{spacing}:{detect}:{refine}"
+
+    def get(self, key, nx, ny, spacing=1):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT ret, data FROM points WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE points SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            self.db.commit()
+
+        ret, data = row
+        if not ret:
+            return False, None, None
+        imgpoints = np.frombuffer(data, np.float32).reshape(-1, 1, 2).copy()
+        return True, make_objpoints(nx, ny, spacing), imgpoints
+
+    def put(self, key, ret, imgpoints):
+        data = np.ascontiguousarray(imgpoints, np.float32).tobytes() if ret else b""
+        size = len(key) + len(data)
+        with self.lock:
+            old = self.db.execute(
+                "SELECT size FROM points WHERE key = ?", (key,)
+            ).fetchone()
+            if old is not None:
+                self.size -= old[0]
+            self.db.execute(
+                "INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?, ?)",
+                (key, int(bool(ret)), data, size, time.time()),
+            )
+            self.size += size
+            self.evict()
+            self.db.commit()
+
+    def evict(self):
+        while self.size > self.max_size:
+            rows = self.db.execute(
+                "SELECT key, size FROM points ORDER BY accessed LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self.size = 0
+                break
+            for key, size in rows:
+                self.db.execute("DELETE FROM points WHERE key = ?", (key,))
+                self.size -= size
+                if self.size <= self.max_size:
+                    break
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM points")
+            self.db.commit()
+            self.size = 0
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def find_points_cached(
+    cache,
+    img,
+    nx,
+    ny,
+    pattern="Checkerboard",
+    spacing=1,
+    img_hash=None,
+    coarse=False,
+):
+    """find_points, or the points cached for img_hash and the settings.
+
+    img may be a callable loading the image, it is only called when the points aren't
+    cached. ret is None if it loads None.
+    """
+    key = None
+    if cache is not None and (img_hash is not None or not callable(img)):
+        key = cache.make_key(
+            img_hash or image_hash(img), nx, ny, pattern, spacing, coarse
+        )
+        if (cached := cache.get(key, nx, ny, spacing)) is not None:
+            return img, *cached
+
+    if callable(img):
+        img = img()
+        if img is None:
+            return None, None, None, None
+    if cache is not None and key is None:
+        key = cache.make_key(image_hash(img), nx, ny, pattern, spacing, coarse)
+
+    img, ret, objpoints, imgpoints = find_points(img, nx, ny, pattern, spacing, coarse)
+    if key is not None:
+        cache.put(key, ret, imgpoints)
+    return img, ret, objpoints, imgpoints
@@ -0,0 +1,78 @@
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.defs import QtGui
+
+# (dtype, channels) -> QImage format with the same memory layout as the array
+qimage_formats = {
+    (np.uint8, 1): QtGui.QImage.Format.Format_Grayscale8,
+    (np.uint16, 1): QtGui.QImage.Format.Format_Grayscale16,
+    (np.uint8, 3): QtGui.QImage.Format.Format_BGR888,
+    (np.uint8, 4): QtGui.QImage.Format.Format_ARGB32,  # BGRA in memory
+}
+
+
+def qimage_format(img):
+    channels = 1 if img.ndim == 2 else img.shape[2]
+    return qimage_formats.get((img.dtype.type, channels))
+
+
+def array_to_qimage(img):
+    """QImage viewing the array memory, img must outlive the QImage and stay unchanged.
+
+    Returns None if the array layout has no matching QImage format.
+    """
+    fmt = qimage_format(img)
+    if fmt is None or not img.flags.c_contiguous:
+        return None
+    height, width = img.shape[:2]
+    return QtGui.QImage(img.data, width, height, img.strides[0], fmt)
+
+
+class QImageBuffer:
+    """Wraps arrays as QImages for one display, reusing a preallocated buffer.
+
+    Supported contiguous arrays are wrapped without copying; anything else (ROIs,
+    16 bit colour, float) is converted into a buffer that is reused between calls.
+    The buffer keeps a reference to the last array, so the returned QImage is valid
+    until the next call to wrap.
+    """
+
+    def __init__(self):
+        self.array = None
+        self.buffer = None
+        self.buffer_qimage = None
+
+    def wrap(self, img):
+        qimage = array_to_qimage(img)
+        if qimage is not None:
+            self.array = img
+            return qimage
+
+        shape = img.shape[:2] if img.ndim == 2 or img.shape[2] == 1 else img.shape
+        dtype = np.uint16 if img.dtype == np.uint16 and len(shape) == 2 else np.uint8
+        if (
+            self.buffer is None
+            or self.buffer.shape != shape
+            or self.buffer.dtype != dtype
+        ):
+            self.buffer = np.empty(shape, dtype)
+            self.buffer_qimage = array_to_qimage(self.buffer)
+        if img.dtype == dtype:
+            np.copyto(self.buffer, img.reshape(shape))
+        elif img.dtype == np.uint16:
+            cv.convertScaleAbs(img.reshape(shape), self.buffer, alpha=1 / 256)
+        else:
+            cv.normalize(
+                img.reshape(shape), self.buffer, 0, 255, cv.NORM_MINMAX, cv.CV_8U
+            )
+
+        self.array = self.buffer
+        return self.buffer_qimage
+
+    def pixmap(self, img, width=None):
+        """Pixmap of img, scaled to width before the pixmap is created if given."""
+        qimage = self.wrap(img)
+        if width is not None and width != qimage.width():
+            qimage = qimage.scaledToWidth(width)
+        return QtGui.QPixmap.fromImage(qimage)
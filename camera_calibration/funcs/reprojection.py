@@ -0,0 +1,245 @@
+import logging
+import re
+
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.funcs.intrinsic_calc import calibrate, checked_fisheye_flags
+
+max_drop_fraction = 0.1  # of the views dropped per outlier rejection round
+
+
+def rotation_matrices(rvecs):
+    """Rodrigues for a stack of rotation vectors, (V, 3) -> (V, 3, 3)."""
+    rvecs = np.asarray(rvecs, np.float64).reshape(-1, 3)
+    theta = np.linalg.norm(rvecs, axis=1)
+    k = rvecs / np.where(theta > 1e-12, theta, 1)[:, None]
+    skew = np.zeros((len(rvecs), 3, 3))
+    skew[:, 0, 1], skew[:, 0, 2], skew[:, 1, 2] = -k[:, 2], k[:, 1], -k[:, 0]
+    skew -= skew.transpose(0, 2, 1)
+    cos, sin = np.cos(theta)[:, None, None], np.sin(theta)[:, None, None]
+    return cos * np.eye(3) + (1 - cos) * k[:, :, None] * k[:, None] + sin * skew
+
+
+def project_points(objpoints, view_index, rvecs, tvecs, K, D, fisheye=False):
+    """Project the points of all views in one pass.
+
+    objpoints: (P, 3) points of all views concatenated, view_index: (P,) view of each
+    point. Matches cv.projectPoints / cv.fisheye.projectPoints.
+    """
+    R = rotation_matrices(rvecs)[view_index]
+    t = np.asarray(tvecs, np.float64).reshape(-1, 3)[view_index]
+    cam = np.einsum("pij,pj->pi", R, objpoints) + t
+    x, y = cam[:, 0] / cam[:, 2], cam[:, 1] / cam[:, 2]
+    fx, fy, cx, cy = K[0, 0], K[1, 1], K[0, 2], K[1, 2]
+    D = np.asarray(D, np.float64).ravel()
+
+    if fisheye:
+        k1, k2, k3, k4 = D[:4]
+        r = np.hypot(x, y)
+        theta = np.arctan(r)
+        theta2 = theta * theta
+        theta_d = theta * (
+            1 + theta2 * (k1 + theta2 * (k2 + theta2 * (k3 + theta2 * k4)))
+        )
+        scale = np.where(r > 1e-8, theta_d / np.where(r > 1e-8, r, 1), 1)
+        xd, yd = x * scale, y * scale
+        alpha = K[0, 1] / fx
+        return np.stack([fx * (xd + alpha * yd) + cx, fy * yd + cy], axis=1)
+
+    k1, k2, p1, p2, k3, k4, k5, k6 = np.pad(D[:8], (0, max(0, 8 - len(D))))
+    r2 = x * x + y * y
+    radial = (1 + r2 * (k1 + r2 * (k2 + r2 * k3))) / (
+        1 + r2 * (k4 + r2 * (k5 + r2 * k6))
+    )
+    xd = x * radial + 2 * p1 * x * y + p2 * (r2 + 2 * x * x)
+    yd = y * radial + p1 * (r2 + 2 * y * y) + 2 * p2 * x * y
+    return np.stack([fx * xd + cx, fy * yd + cy], axis=1)
+
+
+def reprojection_errors(objpoints, imgpoints, rvecs, tvecs, K, D, fisheye=False):
+    """RMS reprojection error of each view and the error of each corner, in pixels.
+
+    Returns (view_errors (V,), corner_errors [array (N_v,) for each view]).
+    """
+    sizes = [len(points.reshape(-1, 2)) for points in imgpoints]
+    if np.ravel(D).size > 8 and not fisheye:
+        # thin prism / tilted models, fall back to OpenCV per view
+        projected = np.concatenate(
+            [
+                cv.projectPoints(o, r, t, K, D)[0].reshape(-1, 2)
+                for o, r, t in zip(objpoints, rvecs, tvecs)
+            ]
+        )
+    else:
+        view_index = np.repeat(np.arange(len(sizes)), sizes)
+        all_objpoints = np.concatenate([o.reshape(-1, 3) for o in objpoints])
+        projected = project_points(
+            all_objpoints.astype(np.float64), view_index, rvecs, tvecs, K, D, fisheye
+        )
+
+    all_imgpoints = np.concatenate([i.reshape(-1, 2) for i in imgpoints])
+    errors = np.linalg.norm(projected - all_imgpoints, axis=1)
+    corner_errors = np.split(errors, np.cumsum(sizes)[:-1])
+    view_errors = np.array([np.sqrt(np.mean(e * e)) for e in corner_errors])
+    return view_errors, corner_errors
+
+
+def ill_conditioned_views(objpoints, imgpoints, shape, K=None, D=None):
+    """Views failing the fisheye conditioning check on their own.
+
+    Each view's extrinsics are estimated with the intrinsics fixed, from a rough
+    fisheye calibration without the check if K and D aren't given.
+    """
+    objpoints = np.expand_dims(np.asarray(objpoints), -2)
+    if K is None:
+        _, K, D, _, _ = cv.fisheye.calibrate(objpoints, imgpoints, shape, None, None)
+
+    flags = (
+        cv.fisheye.CALIB_USE_INTRINSIC_GUESS
+        + cv.fisheye.CALIB_FIX_INTRINSIC
+        + cv.fisheye.CALIB_RECOMPUTE_EXTRINSIC
+        + cv.fisheye.CALIB_CHECK_COND
+    )
+    bad = []
+    for i in range(len(objpoints)):
+        try:
+            cv.fisheye.calibrate(
+                objpoints[i : i + 1],
+                imgpoints[i : i + 1],
+                shape,
+                K.copy(),
+                D.copy(),
+                flags=flags,
+            )
+        except cv.error:
+            bad.append(i)
+    return bad
+
+
+def calibrate_checked(objpoints, imgpoints, shape, fisheye=False, warm_start=()):
+    """calibrate, excluding fisheye views that fail the conditioning check.
+
+    The views are solved with the default flags. Only if a fisheye solve fails are the
+    views failing the conditioning check looked for, with CALIB_CHECK_COND, and the
+    rest solved again.
+    warm_start: (intrinsic matrix, distortion, rvecs, tvecs) of the given views.
+    Returns (indices of the views used, calibrate results).
+    """
+
+    K, D, rvecs, tvecs = warm_start or (None,) * 4
+
+    def solve(kept, fisheye_flags=0):
+        # the previous poses of the views kept only
+        return calibrate(
+            [objpoints[i] for i in kept],
+            [imgpoints[i] for i in kept],
+            shape,
+            fisheye,
+            K,
+            D,
+            None if rvecs is None else [rvecs[i] for i in kept],
+            None if tvecs is None else [tvecs[i] for i in kept],
+            fisheye_flags,
+        )
+
+    kept = list(range(len(objpoints)))
+    try:
+        return kept, solve(kept)
+    except cv.error:
+        if not fisheye:
+            raise
+
+    while True:
+        try:
+            solve(kept, checked_fisheye_flags)
+            break
+        except cv.error as e:
+            # the conditioning check names the view, other failures don't
+            if match := re.search(r"input array (\d+)", str(e)):
+                bad = [kept[int(match.group(1))]]
+            else:
+                bad = [
+                    kept[i]
+                    for i in ill_conditioned_views(
+                        [objpoints[i] for i in kept],
+                        [imgpoints[i] for i in kept],
+                        shape,
+                    )
+                ]
+            if not bad or len(bad) == len(kept):
+                raise
+            logging.info(f"Excluding ill-conditioned views {bad}")
+            kept = [i for i in kept if i not in bad]
+    return kept, solve(kept)
+
+
+def calibrate_rejecting_outliers(
+    objpoints,
+    imgpoints,
+    shape,
+    fisheye=False,
+    max_error=0,
+    max_rounds=5,
+    min_views=4,
+    warm_start=(),
+):
+    """Calibrate, then repeatedly drop views with an RMS error above max_error pixels.
+
+    Each round drops the worst views above the threshold (at most 10 % of them) and
+    re-solves starting from the previous solution. Fisheye views failing the
+    conditioning check are excluded as well.
+    Returns a dict with the indices of the views used ("kept"), the calibrate
+    "results", their "view_errors" and "corner_errors", and the excluded views with
+    the reason ("excluded").
+    """
+    kept, results = calibrate_checked(objpoints, imgpoints, shape, fisheye, warm_start)
+    excluded = {i: "ill-conditioned" for i in set(range(len(objpoints))) - set(kept)}
+
+    for round_no in range(max_rounds + 1):
+        _, K, D, rvecs, tvecs = results
+        view_errors, corner_errors = reprojection_errors(
+            [objpoints[i] for i in kept],
+            [imgpoints[i] for i in kept],
+            rvecs,
+            tvecs,
+            K,
+            D,
+            fisheye,
+        )
+        outliers = np.flatnonzero(view_errors > max_error) if max_error else []
+        drop_count = min(
+            len(outliers),
+            max(1, int(len(kept) * max_drop_fraction)),
+            len(kept) - min_views,
+        )
+        if drop_count <= 0 or round_no == max_rounds:
+            break
+
+        drop = set(outliers[np.argsort(view_errors[outliers])[::-1][:drop_count]])
+        for i in drop:
+            excluded[kept[i]] = f"error {view_errors[i]:.2f} px"
+        logging.info(
+            f"Dropping views {sorted(kept[i] for i in drop)} above {max_error} px"
+        )
+        keep = [i for i in range(len(kept)) if i not in drop]
+        candidates = [kept[i] for i in keep]
+        subset, results = calibrate_checked(
+            [objpoints[i] for i in candidates],
+            [imgpoints[i] for i in candidates],
+            shape,
+            fisheye,
+            (K, D, [rvecs[i] for i in keep], [tvecs[i] for i in keep]),
+        )
+        # calibrate_checked returns indices into the views it was given
+        kept = [candidates[i] for i in subset]
+        for i in set(candidates) - set(kept):
+            excluded[i] = "ill-conditioned"
+
+    return dict(
+        kept=kept,
+        results=results,
+        view_errors=view_errors,
+        corner_errors=corner_errors,
+        excluded=excluded,
+    )
@@ -0,0 +1,162 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2 as cv
+import numpy as np
+
+session_version = 1
+session_suffix = ".ccsession"
+thumbnail_quality = 90  # JPEG, thumbnails are only for display
+
+
+def packed(arrays, dtype, width):
+    """Concatenate arrays into one (n, width) array, with offsets of each."""
+    arrays = [
+        np.zeros((0, width), dtype) if a is None else np.asarray(a, dtype)
+        for a in arrays
+    ]
+    offsets = np.cumsum([0] + [a.size // width for a in arrays], dtype=np.int64)
+    data = np.concatenate([a.reshape(-1, width) for a in arrays] or [[]])
+    return data.astype(dtype).reshape(-1, width), offsets
+
+
+def unpacked(data, offsets):
+    return [data[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def encode_thumbnail(thumbnail):
+    _, data = cv.imencode(
+        ".jpg", thumbnail, [cv.IMWRITE_JPEG_QUALITY, thumbnail_quality]
+    )
+    return data.reshape(-1, 1)
+
+
+def save_session(path, views, settings, calibration=None):
+    """Write the gallery and calibration results to a single binary file.
+
+    views: dicts with label, source (image path or None), img_hash, shape (w, h),
+    thumbnail, settings_key and the detection ret, objpoints and imgpoints for it (ret
+    None if not detected yet).
+    calibration: dict with fisheye, shape, settings_key, rms_error, K, D, views (indices
+    of the views used, -1 if no longer in views) and their labels, rvecs, tvecs,
+    view_errors, corner_errors and excluded ((label, reason) pairs), or None.
+
+    Points and thumbnails are packed into a few flat arrays of an uncompressed .npz, a
+    small JSON header holds the rest.
+    """
+    header = dict(version=session_version, settings=settings, views=[])
+    for view in views:
+        header["views"].append(
+            dict(
+                label=view["label"],
+                source=None if view["source"] is None else str(view["source"]),
+                img_hash=view["img_hash"],
+                shape=list(view["shape"]),
+                settings_key=list(view["settings_key"]),
+                ret=None if view["ret"] is None else bool(view["ret"]),
+            )
+        )
+
+    thumbnails, thumbnail_offsets = packed(
+        [encode_thumbnail(view["thumbnail"]) for view in views], np.uint8, 1
+    )
+    objpoints, point_offsets = packed(
+        [view["objpoints"] if view["ret"] else None for view in views], np.float32, 3
+    )
+    imgpoints, _ = packed(
+        [view["imgpoints"] if view["ret"] else None for view in views], np.float32, 2
+    )
+    arrays = dict(
+        thumbnails=thumbnails,
+        thumbnail_offsets=thumbnail_offsets,
+        objpoints=objpoints,
+        imgpoints=imgpoints,
+        point_offsets=point_offsets,
+    )
+
+    if calibration is not None:
+        header["calibration"] = dict(
+            fisheye=bool(calibration["fisheye"]),
+            shape=list(calibration["shape"]),
+            settings_key=list(calibration["settings_key"]),
+            rms_error=float(calibration["rms_error"]),
+            views=[int(i) for i in calibration["views"]],
+            labels=list(calibration["labels"]),
+            view_errors=[float(e) for e in calibration["view_errors"]],
+            excluded=[list(e) for e in calibration["excluded"]],
+        )
+        corner_errors, corner_offsets = packed(calibration["corner_errors"], float, 1)
+        arrays.update(
+            K=np.asarray(calibration["K"], np.float64),
+            D=np.asarray(calibration["D"], np.float64),
+            rvecs=packed(calibration["rvecs"], float, 3)[0],
+            tvecs=packed(calibration["tvecs"], float, 3)[0],
+            corner_errors=corner_errors,
+            corner_offsets=corner_offsets,
+        )
+
+    arrays["header"] = np.frombuffer(json.dumps(header).encode(), np.uint8)
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_session(path, workers=None):
+    """(views, settings, calibration) as given to save_session.
+
+    Only the thumbnails are decoded, on a thread pool.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        header = json.loads(data["header"].tobytes().decode())
+        if header.get("version") != session_version:
+            raise ValueError(f"Unsupported session version {header.get('version')}")
+        arrays = {name: data[name] for name in data.files if name != "header"}
+
+    with ThreadPoolExecutor(workers) as pool:
+        thumbnails = list(
+            pool.map(
+                lambda buf: cv.imdecode(buf, cv.IMREAD_COLOR),
+                unpacked(arrays["thumbnails"], arrays["thumbnail_offsets"]),
+            )
+        )
+    objpoints = unpacked(arrays["objpoints"], arrays["point_offsets"])
+    imgpoints = unpacked(arrays["imgpoints"], arrays["point_offsets"])
+
+    views = []
+    for i, view in enumerate(header["views"]):
+        view = dict(
+            view,
+            shape=tuple(view["shape"]),
+            settings_key=tuple(view["settings_key"]),
+            thumbnail=thumbnails[i],
+            objpoints=None,
+            imgpoints=None,
+        )
+        if view["ret"]:
+            view["objpoints"] = objpoints[i]
+            view["imgpoints"] = imgpoints[i].reshape(-1, 1, 2)
+        views.append(view)
+
+    calibration = header.get("calibration")
+    if calibration is not None:
+        calibration = dict(
+            calibration,
+            shape=tuple(calibration["shape"]),
+            settings_key=tuple(calibration["settings_key"]),
+            excluded=[tuple(e) for e in calibration["excluded"]],
+            K=arrays["K"],
+            D=arrays["D"],
+            rvecs=list(arrays["rvecs"].reshape(-1, 3, 1)),
+            tvecs=list(arrays["tvecs"].reshape(-1, 3, 1)),
+            corner_errors=[
+                errors[:, 0]
+                for errors in unpacked(
+                    arrays["corner_errors"], arrays["corner_offsets"]
+                )
+            ],
+        )
+    return views, header["settings"], calibration
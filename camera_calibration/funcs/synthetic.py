@@ -0,0 +1,383 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.defs import QtGui
+from camera_calibration.funcs.draw_cal_pattern import (
+    draw_checkerboard_pattern,
+    draw_circles_pattern,
+    draw_acircles_pattern,
+)
+
+background_level = 110  # grey around the board, so checkerboards keep a white border
+
+
+class SyntheticBoard:
+    """Texture of a calibration pattern, drawn as in the Pattern dock.
+
+    nx/ny are the points per row/column as passed to find_points, spacing is the
+    distance between points. The board frame has its origin at the first point.
+    """
+
+    def __init__(
+        self, pattern="Checkerboard", nx=9, ny=6, spacing=1, square_px=60, radius_rate=3
+    ):
+        self.args = (pattern, nx, ny, spacing, square_px, radius_rate)
+        self.pattern = pattern
+        self.nx = nx
+        self.ny = ny
+        self.spacing = spacing
+        self.square_px = square_px
+
+        margin = 2 * square_px
+        if pattern == "Checkerboard":
+            cols, rows = nx + 1, ny + 1
+            width, height = cols * square_px + 2 * margin, rows * square_px + 2 * margin
+            grid = np.mgrid[1:cols, 1:rows].T.reshape(-1, 2) * square_px + margin
+        else:
+            # the drawing functions' radius is the diameter, keep it even so the
+            # circles are centred exactly on the grid
+            radius = square_px // radius_rate // 2 * 2
+            step = 2 if pattern == "Asymmetric Circles" else 1
+            width = (nx - 1) * step * square_px + 2 * radius + 2 * margin
+            height = (ny - 1) * square_px + 2 * radius + 2 * margin
+            grid = np.mgrid[0:nx, 0:ny].T.reshape(-1, 2) * square_px
+            if step == 2:
+                grid[:, 0] = grid[:, 0] * 2 + (grid[:, 1] // square_px % 2) * square_px
+            grid += margin + radius
+
+        image = QtGui.QImage(width, height, QtGui.QImage.Format.Format_Grayscale8)
+        if pattern == "Checkerboard":
+            draw_checkerboard_pattern(
+                image, cols, rows, square_px, square_px, width, height
+            )
+        else:
+            draw = draw_acircles_pattern if step == 2 else draw_circles_pattern
+            draw(image, nx, ny, square_px / radius, square_px, square_px, width, height)
+        texture = np.frombuffer(image.constBits(), np.uint8)
+        texture = texture.reshape(height, image.bytesPerLine())[:, :width].copy()
+
+        # coarser levels for boards seen from far away, remap doesn't filter
+        self.textures = [texture]
+        while min(self.textures[-1].shape) > 32:
+            self.textures.append(cv.pyrDown(self.textures[-1]))
+
+        self.origin = grid[0].astype(np.float64)  # texture pixel edge coordinates
+        objpoints = np.zeros((len(grid), 3), np.float32)
+        objpoints[:, :2] = (grid - self.origin) / square_px * spacing
+        self.objpoints = objpoints
+        # outline of the pattern with a square of white around it, kept in the image
+        low = np.array([margin - square_px] * 2)
+        high = np.array([width, height]) - low
+        outline = np.array([low, [high[0], low[1]], high, [low[0], high[1]]])
+        self.corners = (outline - self.origin) / square_px * spacing
+
+    @property
+    def centre(self):
+        return np.append(self.corners.mean(axis=0), 0)
+
+
+class SyntheticCamera:
+    """Pinhole or fisheye camera rendering boards with known poses.
+
+    The undistorted ray of every pixel is computed once, rendering a view is then a
+    3x3 transform of the rays and a remap of the board texture.
+    """
+
+    def __init__(
+        self,
+        width=1280,
+        height=960,
+        intrinsic_matrix=None,
+        distortion_coeffs=None,
+        fisheye=False,
+    ):
+        self.width = width
+        self.height = height
+        self.fisheye = fisheye
+        if intrinsic_matrix is None:
+            f = 0.8 * width
+            intrinsic_matrix = np.array(
+                [[f, 0, (width - 1) / 2], [0, f, (height - 1) / 2], [0, 0, 1]]
+            )
+        if distortion_coeffs is None:
+            distortion_coeffs = np.zeros((4, 1) if fisheye else (1, 5))
+        self.intrinsic_matrix = np.asarray(intrinsic_matrix, np.float64)
+        self.distortion_coeffs = np.asarray(distortion_coeffs, np.float64)
+        self.args = (
+            width,
+            height,
+            self.intrinsic_matrix,
+            self.distortion_coeffs,
+            fisheye,
+        )
+
+        pixels = np.mgrid[0:height, 0:width][::-1].reshape(2, -1).T
+        pixels = pixels.astype(np.float64).reshape(-1, 1, 2)
+        if fisheye:
+            rays = cv.fisheye.undistortPoints(
+                pixels, self.intrinsic_matrix, self.distortion_coeffs
+            )
+        else:
+            rays = cv.undistortPointsIter(
+                pixels,
+                self.intrinsic_matrix,
+                self.distortion_coeffs,
+                None,
+                None,
+                (cv.TERM_CRITERIA_COUNT + cv.TERM_CRITERIA_EPS, 20, 1e-9),
+            )
+        self.rays = rays.reshape(height, width, 2).astype(np.float32)
+        # the rays lie within this box, used to check whether all of them hit the plane
+        box_min, box_max = self.rays.reshape(-1, 2).min(0), self.rays.reshape(
+            -1, 2
+        ).max(0)
+        self.ray_box = np.array(
+            [
+                [x, y, 1]
+                for x in (box_min[0], box_max[0])
+                for y in (box_min[1], box_max[1])
+            ]
+        )
+
+    @property
+    def shape(self):
+        return self.width, self.height
+
+    def project(self, objpoints, rvec, tvec):
+        if self.fisheye:
+            points, _ = cv.fisheye.projectPoints(
+                objpoints.reshape(-1, 1, 3).astype(np.float64),
+                rvec,
+                tvec,
+                self.intrinsic_matrix,
+                self.distortion_coeffs,
+            )
+        else:
+            points, _ = cv.projectPoints(
+                objpoints.astype(np.float64),
+                rvec,
+                tvec,
+                self.intrinsic_matrix,
+                self.distortion_coeffs,
+            )
+        return points.reshape(-1, 1, 2).astype(np.float32)
+
+    def render(self, board, rvec, tvec):
+        """Grey image of the board at the pose, and the true image points."""
+        R, _ = cv.Rodrigues(np.asarray(rvec, np.float64))
+        tvec = np.asarray(tvec, np.float64).ravel()
+
+        # pick the texture level that is about one texel per pixel
+        imgpoints = self.project(board.objpoints, rvec, tvec).reshape(-1, 2)
+        pixels_per_unit = np.linalg.norm(imgpoints[1] - imgpoints[0]) / (
+            np.linalg.norm(board.objpoints[1] - board.objpoints[0])
+        )
+        texels_per_unit = board.square_px / board.spacing
+        level = int(np.clip(np.log2(texels_per_unit / pixels_per_unit), 0, None))
+        level = min(level, len(board.textures) - 1)
+        texture = board.textures[level]
+
+        # normalised camera coordinates -> board plane (X, Y, 0) -> texture pixel
+        # centres at the chosen level
+        homography = np.column_stack([R[:, 0], R[:, 1], tvec])
+        scale = texels_per_unit / 2**level
+        to_texture = np.array(
+            [
+                [scale, 0, board.origin[0] / 2**level - 0.5],
+                [0, scale, board.origin[1] / 2**level - 0.5],
+                [0, 0, 1],
+            ]
+        )
+        transform = to_texture @ np.linalg.inv(homography)
+        maps = cv.perspectiveTransform(self.rays, transform)
+        # rays parallel to or pointing away from the board see the background, w is
+        # linear in the rays so it is enough to check the corners of their box
+        if (self.ray_box @ transform[2] <= 1e-12).any():
+            maps[self.rays @ transform[2, :2] + transform[2, 2] <= 1e-12] = -1
+        img = cv.remap(
+            texture,
+            maps,
+            None,
+            cv.INTER_LINEAR,
+            borderMode=cv.BORDER_CONSTANT,
+            borderValue=background_level,
+        )
+        return img, imgpoints.reshape(-1, 1, 2)
+
+    def random_pose(self, board, rng, distance=(1.0, 2.5), tilt=40, margin=0.02):
+        """A pose with the whole board in the image, distance relative to the
+        distance at which the board fills the image width."""
+        size = np.ptp(board.corners, axis=0).max()
+        fill_distance = self.intrinsic_matrix[0, 0] * size / self.width
+        corners = np.column_stack([board.corners, np.zeros(4)]).astype(np.float32)
+        low = np.array([self.width, self.height]) * margin
+        high = np.array([self.width, self.height]) * (1 - margin)
+        for _ in range(1000):
+            angles = np.radians(rng.uniform(-tilt, tilt, 3) * [1, 1, 0.5])
+            R, _ = cv.Rodrigues(angles)
+            z = fill_distance * rng.uniform(*distance)
+            # board centre on a random ray through the image
+            target = rng.uniform(low, high)
+            ray = np.linalg.solve(self.intrinsic_matrix, np.append(target, 1))
+            tvec = ray * z / ray[2] - R @ board.centre
+            rvec, _ = cv.Rodrigues(R)
+            projected = self.project(corners, rvec, tvec).reshape(-1, 2)
+            cam_z = (R @ corners.T).T[:, 2] + tvec[2]
+            if (
+                (cam_z > 0).all()
+                and (projected >= low).all()
+                and (projected < high).all()
+            ):
+                return rvec.ravel(), tvec
+        raise ValueError("The board doesn't fit in the image!")
+
+
+def apply_effects(img, rng, noise=2.0, blur=0.8, lighting=0.3):
+    """Random gain, offset and gradient lighting, Gaussian blur and sensor noise.
+
+    lighting: strength of the variation, 0 for none. Returns a BGR image.
+    """
+    img = img.astype(np.float32)
+    if blur:
+        img = cv.GaussianBlur(img, (0, 0), blur)
+    if lighting:
+        h, w = img.shape
+        gain = 1 + rng.uniform(-lighting, lighting / 2)
+        gx, gy = rng.uniform(-lighting, lighting, 2)
+        ramp_x = np.linspace(-0.5, 0.5, w, dtype=np.float32) * gx
+        ramp_y = np.linspace(-0.5, 0.5, h, dtype=np.float32)[:, None] * gy
+        img *= gain + ramp_x + ramp_y
+        img += rng.uniform(-20, 20) * lighting
+    if noise:
+        # OpenCV's generator is much faster than numpy's for whole images
+        cv.setRNGSeed(int(rng.integers(2**31)))
+        img += cv.randn(np.empty_like(img), 0, noise)
+    img = np.clip(img, 0, 255).astype(np.uint8)
+    return cv.cvtColor(img, cv.COLOR_GRAY2BGR)
+
+
+def generate_view(camera, board, index, seed=0, noise=2.0, blur=0.8, lighting=0.3):
+    """(image, rvec, tvec, true imgpoints) of a random pose, the same for the same
+    index and seed."""
+    rng = np.random.default_rng([seed, index])
+    rvec, tvec = camera.random_pose(board, rng)
+    img, imgpoints = camera.render(board, rvec, tvec)
+    return apply_effects(img, rng, noise, blur, lighting), rvec, tvec, imgpoints
+
+
+def generate_views(camera, board, count, seed=0, **effects):
+    """Yield (image, rvec, tvec, true imgpoints) for random poses."""
+    for i in range(count):
+        yield generate_view(camera, board, i, seed, **effects)
+
+
+_generator = None  # (camera, board, output dir, seed, effects) in each worker
+
+
+def _init_generator(camera_args, board_args, output_dir, seed, effects):
+    global _generator
+    # one OpenCV thread per process, the pool provides the parallelism
+    cv.setNumThreads(1)
+    camera = SyntheticCamera(*camera_args)
+    board = SyntheticBoard(*board_args)
+    _generator = (camera, board, output_dir, seed, effects)
+
+
+def _write_view(index):
+    camera, board, output_dir, seed, effects = _generator
+    img, rvec, tvec, imgpoints = generate_view(camera, board, index, seed, **effects)
+    name = f"{index:05d}.png"
+    cv.imwrite(str(Path(output_dir) / name), img)
+    return dict(
+        file=name,
+        rvec=rvec.tolist(),
+        tvec=tvec.tolist(),
+        imgpoints=imgpoints.reshape(-1, 2).tolist(),
+    )
+
+
+def write_dataset(output_dir, camera, board, count, seed=0, workers=None, **effects):
+    """Write the views as PNGs across a process pool, and the ground truth to
+    ground_truth.json."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    initargs = (camera.args, board.args, output_dir, seed, effects)
+    if workers == 1:
+        _init_generator(*initargs)
+        views = list(map(_write_view, range(count)))
+    else:
+        # forked children deadlock in QPainter once the parent has drawn a board
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_generator,
+            initargs=initargs,
+        ) as pool:
+            views = list(
+                pool.map(
+                    _write_view, range(count), chunksize=max(1, count // (workers * 4))
+                )
+            )
+
+    with open(output_dir / "ground_truth.json", "w") as f:
+        json.dump(
+            dict(
+                K=camera.intrinsic_matrix.tolist(),
+                D=camera.distortion_coeffs.tolist(),
+                fisheye=camera.fisheye,
+                width=camera.width,
+                height=camera.height,
+                pattern=board.pattern,
+                nx=board.nx,
+                ny=board.ny,
+                spacing=board.spacing,
+                objpoints=board.objpoints.tolist(),
+                views=views,
+            ),
+            f,
+            indent=4,
+        )
+    return views
+
+
+if __name__ == "__main__":
+    import time
+
+    from camera_calibration.funcs.intrinsic_calc import calibrate, find_points
+
+    camera = SyntheticCamera(
+        1280, 960, distortion_coeffs=np.array([[-0.25, 0.08, 0.001, -0.0005, 0]])
+    )
+    for pattern, nx, ny in [
+        ("Checkerboard", 9, 6),
+        ("Circles", 7, 6),
+        ("Asymmetric Circles", 4, 11),
+    ]:
+        board = SyntheticBoard(pattern, nx, ny)
+        start = time.perf_counter()
+        views = list(generate_views(camera, board, 20))
+        elapsed = time.perf_counter() - start
+
+        objpoints, imgpoints, errors = [], [], []
+        for img, _, _, true_points in views:
+            _, ret, objp, found = find_points(img, nx, ny, pattern)
+            if ret:
+                dists = np.linalg.norm(
+                    found.reshape(-1, 1, 2) - true_points.reshape(1, -1, 2), axis=-1
+                )
+                errors.append(dists.min(axis=1).mean())
+                objpoints.append(objp)
+                imgpoints.append(found)
+        rms, K, *_ = calibrate(objpoints, imgpoints, camera.shape)
+        print(
+            f"{pattern:<20}{elapsed / len(views) * 1000:.1f} ms/view, "
+            f"found {len(errors)}/{len(views)}, point error {np.mean(errors):.3f} px, "
+            f"fx {K[0, 0]:.1f} (true {camera.intrinsic_matrix[0, 0]:.1f})"
+        )
@@ -0,0 +1,220 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.funcs.intrinsic_calc import calibrate
+
+methods = ["Bootstrap", "Jackknife"]
+
+_views = None  # (objpoints, imgpoints, shape, fisheye, warm_start) in each worker
+
+
+def parameter_names(fisheye, distortion_count=5):
+    if fisheye:
+        return ["fx", "fy", "cx", "cy", "k1", "k2", "k3", "k4"]
+    names = ["k1", "k2", "p1", "p2", "k3", "k4", "k5", "k6"]
+    names += ["s1", "s2", "s3", "s4", "tx", "ty"]
+    return ["fx", "fy", "cx", "cy"] + names[:distortion_count]
+
+
+def parameter_vector(intrinsic_matrix, distortion_coeffs):
+    K = intrinsic_matrix
+    return np.concatenate(
+        [[K[0, 0], K[1, 1], K[0, 2], K[1, 2]], np.ravel(distortion_coeffs)]
+    )
+
+
+def resample_sets(view_count, method="Bootstrap", resamples=200, seed=None):
+    """View indices of each resample, leave-one-out for the jackknife."""
+    if method == "Jackknife":
+        return [[j for j in range(view_count) if j != i] for i in range(view_count)]
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, view_count, (resamples, view_count)).tolist()
+
+
+def init_resampling(objpoints, imgpoints, shape, fisheye, warm_start):
+    """Pool initializer, the views are sent to each worker once."""
+    global _views
+    # one OpenCV thread per process, the pool provides the parallelism
+    cv.setNumThreads(1)
+    _views = (objpoints, imgpoints, shape, fisheye, warm_start)
+
+
+def solve_resamples(index_sets):
+    """Calibrate on each set of view indices, NaN for resamples that fail."""
+    objpoints, imgpoints, shape, fisheye, warm_start = _views
+    K, D, rvecs, tvecs = warm_start
+    params = np.full((len(index_sets), len(parameter_vector(K, D))), np.nan)
+    for row, indices in enumerate(index_sets):
+        try:
+            _, K_i, D_i, _, _ = calibrate(
+                [objpoints[i] for i in indices],
+                [imgpoints[i] for i in indices],
+                shape,
+                fisheye,
+                K,
+                D,
+                [rvecs[i] for i in indices],
+                [tvecs[i] for i in indices],
+            )
+        except cv.error:
+            continue
+        params[row] = parameter_vector(K_i, D_i)
+    return params
+
+
+def chunked(items, chunk_size):
+    return [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def summarize(estimate, params, index_sets, view_count, method, confidence=0.95):
+    """Standard deviation, confidence interval and per view influence of each parameter.
+
+    influence[v, p] is the shift of parameter p caused by including view v, in standard
+    deviations: the estimate minus the leave-one-out estimate for the jackknife, the
+    mean over the resamples containing the view minus the mean over those without it
+    (jackknife after bootstrap) for the bootstrap.
+    """
+    ok = ~np.isnan(params).any(axis=1)
+    params = params[ok]
+    index_sets = [indices for indices, valid in zip(index_sets, ok) if valid]
+    n = len(params)
+    if n < 2:
+        raise ValueError("Too few resamples could be calibrated!")
+
+    mean = params.mean(axis=0)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    if method == "Jackknife":
+        std = np.sqrt((n - 1) / n * np.sum((params - mean) ** 2, axis=0))
+        low, high = estimate - z * std, estimate + z * std
+    else:
+        std = params.std(axis=0, ddof=1)
+        low, high = np.percentile(
+            params, [50 - confidence * 50, 50 + confidence * 50], axis=0
+        )
+
+    influence = np.zeros((view_count, len(estimate)))
+    if method == "Jackknife":
+        for indices, row in zip(index_sets, params):
+            (left_out,) = set(range(view_count)) - set(indices)
+            influence[left_out] = estimate - row
+    else:
+        contains = np.zeros((n, view_count), bool)
+        for row, indices in enumerate(index_sets):
+            contains[row, indices] = True
+        for v in range(view_count):
+            if contains[:, v].all() or not contains[:, v].any():
+                continue
+            influence[v] = params[contains[:, v]].mean(axis=0) - params[
+                ~contains[:, v]
+            ].mean(axis=0)
+    influence /= np.where(std > 0, std, 1)
+
+    return dict(
+        method=method,
+        confidence=confidence,
+        resamples=n,
+        failed=int((~ok).sum()),
+        estimate=estimate,
+        std=std,
+        low=low,
+        high=high,
+        influence=influence,
+    )
+
+
+def estimate_uncertainty(
+    objpoints,
+    imgpoints,
+    shape,
+    fisheye,
+    results,
+    method="Bootstrap",
+    resamples=200,
+    confidence=0.95,
+    workers=None,
+    seed=None,
+):
+    """Spread of the intrinsics over calibrations of resampled views.
+
+    results: calibrate results for the views, each resample starts from them. The
+    resamples are solved across a process pool, see summarize for what is returned.
+    """
+    _, K, D, rvecs, tvecs = results
+    index_sets = resample_sets(len(objpoints), method, resamples, seed)
+    workers = workers or os.cpu_count() or 1
+    chunks = chunked(index_sets, max(1, len(index_sets) // (workers * 4)))
+
+    warm_start = (K, D, rvecs, tvecs)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_resampling,
+        initargs=(objpoints, imgpoints, shape, fisheye, warm_start),
+    ) as pool:
+        params = np.concatenate(list(pool.map(solve_resamples, chunks)))
+
+    summary = summarize(
+        parameter_vector(K, D),
+        params,
+        index_sets,
+        len(objpoints),
+        method,
+        confidence,
+    )
+    if summary["failed"]:
+        logging.info(f"{summary['failed']} resamples could not be calibrated")
+    return summary
+
+
+def format_uncertainty(summary, fisheye, view_labels=None, top_views=5):
+    """Text table of the summary, with the most influential views."""
+    names = parameter_names(fisheye, len(summary["estimate"]) - 4)
+    text = (
+        f"{summary['method']}, {summary['resamples']} resamples, "
+        f"{summary['confidence']:.0%} interval\n"
+    )
+    for name, value, std, low, high in zip(
+        names, summary["estimate"], summary["std"], summary["low"], summary["high"]
+    ):
+        text += f"{name} = {value:.4g} ± {std:.2g} [{low:.4g}, {high:.4g}]\n"
+
+    influence = np.abs(summary["influence"]).max(axis=1)
+    if view_labels is None:
+        view_labels = [str(i) for i in range(len(influence))]
+    text += "\nMost Influential Views (std),\n"
+    for i in np.argsort(influence)[::-1][:top_views]:
+        text += f"{view_labels[i]} = {influence[i]:.2f}\n"
+    return text
+
+
+if __name__ == "__main__":
+    import time
+
+    from camera_calibration.funcs.intrinsic_calc import make_objpoints
+
+    # synthetic views of a 9x6 board seen by a known camera
+    K = np.array([[800.0, 0, 640], [0, 800, 480], [0, 0, 1]])
+    D = np.array([[-0.2, 0.05, 0, 0, 0]])
+    rng = np.random.default_rng(0)
+    objp = make_objpoints(9, 6)
+    objpoints, imgpoints = [], []
+    for _ in range(30):
+        rvec = rng.normal(0, 0.3, 3)
+        tvec = np.array([-4, -2.5, 12]) + rng.normal(0, 1, 3)
+        points, _ = cv.projectPoints(objp, rvec, tvec, K, D)
+        points += rng.normal(0, 0.3, points.shape)
+        objpoints.append(objp)
+        imgpoints.append(points.astype(np.float32))
+
+    results = calibrate(objpoints, imgpoints, (1280, 960))
+    for method in methods:
+        start = time.perf_counter()
+        summary = estimate_uncertainty(
+            objpoints, imgpoints, (1280, 960), False, results, method
+        )
+        print(format_uncertainty(summary, False))
+        print(f"{time.perf_counter() - start:.1f} s\n")
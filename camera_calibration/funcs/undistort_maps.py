@@ -0,0 +1,271 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import cv2 as cv
+import numpy as np
+
+
+def default_alpha(fisheye):
+    # free scaling of the standard model keeps all pixels, the fisheye balance crops
+    return 0 if fisheye else 1
+
+
+def default_map_type(fisheye):
+    return cv.CV_16SC2 if fisheye else cv.CV_32FC1
+
+
+def compute_undistort_maps(
+    shape, intrinsic_matrix, distortion_coeffs, fisheye=False, alpha=None, map_type=None
+):
+    """Undistortion maps for images of shape (h, w, ...), without caching.
+
+    alpha is the free scaling of getOptimalNewCameraMatrix, or the balance of the
+    fisheye model. Returns (map1, map2, new intrinsic matrix, valid roi), roi is None
+    for the fisheye model.
+    """
+    h, w = shape[:2]
+    alpha = default_alpha(fisheye) if alpha is None else alpha
+    map_type = default_map_type(fisheye) if map_type is None else map_type
+
+    if not fisheye:
+        new_matrix, roi = cv.getOptimalNewCameraMatrix(
+            intrinsic_matrix, distortion_coeffs, (w, h), alpha, (w, h)
+        )
+        map1, map2 = cv.initUndistortRectifyMap(
+            intrinsic_matrix, distortion_coeffs, None, new_matrix, (w, h), map_type
+        )
+        return map1, map2, new_matrix, tuple(roi)
+
+    new_matrix = cv.fisheye.estimateNewCameraMatrixForUndistortRectify(
+        intrinsic_matrix, distortion_coeffs, (w, h), np.eye(3), balance=alpha
+    )
+    map1, map2 = cv.fisheye.initUndistortRectifyMap(
+        intrinsic_matrix, distortion_coeffs, np.eye(3), new_matrix, (w, h), map_type
+    )
+    return map1, map2, new_matrix, None
+
+
+class UndistortMapCache:
+    """Undistortion maps keyed by image size, camera and output settings.
+
+    Least recently used maps are evicted once they take more than max_size bytes. With
+    a cache_dir the maps are also stored as .npy files, which are memory mapped when
+    a later process needs them, so they are only ever built once per camera. The least
+    recently used files are deleted once they take more than max_disk_size bytes.
+    """
+
+    def __init__(self, max_size=512 * 2**20, cache_dir=None, max_disk_size=2 * 2**30):
+        self.max_size = max_size
+        self.max_disk_size = max_disk_size
+        self.cache_dir = None if cache_dir is None else Path(cache_dir)
+        self.lock = threading.Lock()
+        # threads asking for the same new maps wait for one build instead of each
+        # building them
+        self.build_lock = threading.Lock()
+        self.maps = OrderedDict()
+        self.size = 0
+
+    @staticmethod
+    def make_key(shape, intrinsic_matrix, distortion_coeffs, fisheye, alpha, map_type):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(
+            str(
+                (shape[:2], bool(fisheye), float(alpha), map_type, cv.__version__)
+            ).encode()
+        )
+        h.update(np.ascontiguousarray(intrinsic_matrix, np.float64).data)
+        h.update(np.ascontiguousarray(np.ravel(distortion_coeffs), np.float64).data)
+        return h.hexdigest()
+
+    def get(
+        self,
+        shape,
+        intrinsic_matrix,
+        distortion_coeffs,
+        fisheye=False,
+        alpha=None,
+        map_type=None,
+    ):
+        """(map1, map2, new intrinsic matrix, roi) as compute_undistort_maps.
+
+        The maps are shared between callers and read-only.
+        """
+        alpha = default_alpha(fisheye) if alpha is None else alpha
+        map_type = default_map_type(fisheye) if map_type is None else map_type
+        key = self.make_key(
+            shape, intrinsic_matrix, distortion_coeffs, fisheye, alpha, map_type
+        )
+
+        with self.lock:
+            if key in self.maps:
+                self.maps.move_to_end(key)
+                return self.maps[key]
+
+        with self.build_lock:
+            with self.lock:
+                if key in self.maps:
+                    return self.maps[key]
+
+            maps = self.load(key)
+            if maps is None:
+                maps = compute_undistort_maps(
+                    shape, intrinsic_matrix, distortion_coeffs, fisheye, alpha, map_type
+                )
+                for array in maps[:2]:
+                    if array is not None:
+                        array.setflags(write=False)
+                try:
+                    self.store(key, maps)
+                except OSError as e:
+                    logging.warning(f"Could not store undistortion maps: {e}")
+
+            with self.lock:
+                self.maps[key] = maps
+                self.size += self.nbytes(maps)
+                while self.size > self.max_size and len(self.maps) > 1:
+                    _, evicted = self.maps.popitem(last=False)
+                    self.size -= self.nbytes(evicted)
+            return maps
+
+    @staticmethod
+    def nbytes(maps):
+        return sum(array.nbytes for array in maps[:2] if array is not None)
+
+    def paths(self, key):
+        return [self.cache_dir / f"{key}-{name}" for name in ("1.npy", "2.npy", "json")]
+
+    def load(self, key):
+        if self.cache_dir is None:
+            return None
+        map1_path, map2_path, info_path = self.paths(key)
+        try:
+            with open(info_path) as f:
+                info = json.load(f)
+            map1 = np.load(map1_path, mmap_mode="r")
+            map2 = np.load(map2_path, mmap_mode="r") if info["map2"] else None
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            os.utime(info_path)  # last used, see prune
+        except OSError:
+            pass
+        roi = None if info["roi"] is None else tuple(info["roi"])
+        return map1, map2, np.array(info["new_matrix"]), roi
+
+    def store(self, key, maps):
+        if self.cache_dir is None:
+            return
+        map1, map2, new_matrix, roi = maps
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        map1_path, map2_path, info_path = self.paths(key)
+        # write then rename, other processes may be reading the same entry
+        for path, array in [(map1_path, map1), (map2_path, map2)]:
+            if array is not None:
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                with open(tmp_path, "wb") as f:
+                    np.save(f, array)
+                os.replace(tmp_path, path)
+        tmp_path = info_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                dict(
+                    new_matrix=new_matrix.tolist(),
+                    roi=None if roi is None else list(map(int, roi)),
+                    map2=map2 is not None,
+                ),
+                f,
+            )
+        os.replace(tmp_path, info_path)
+        self.prune()
+
+    def prune(self):
+        """Delete the least recently used files beyond max_disk_size."""
+        entries = []
+        for info_path in self.cache_dir.glob("*-json"):
+            key = info_path.name[: -len("-json")]
+            paths = [path for path in self.paths(key) if path.exists()]
+            try:
+                size = sum(path.stat().st_size for path in paths)
+                entries.append((info_path.stat().st_mtime, size, paths))
+            except OSError:
+                continue  # deleted by another process meanwhile
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, paths in sorted(entries, key=lambda entry: entry[0])[:-1]:
+            if total <= self.max_disk_size:
+                break
+            for path in paths:
+                path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        with self.lock:
+            self.maps.clear()
+            self.size = 0
+
+
+undistort_maps = UndistortMapCache()  # shared by get_undistort_funcs and undistort
+
+
+def scale_intrinsics(intrinsic_matrix, from_size, to_size):
+    """Intrinsic matrix for the image resized from from_size (w, h) to to_size."""
+    sx = to_size[0] / from_size[0]
+    sy = to_size[1] / from_size[1]
+    scaled = np.array(intrinsic_matrix, np.float64)
+    scaled[0, :2] *= sx
+    scaled[1, :2] *= sy
+    # pixel centres, not corners, are at integer coordinates
+    scaled[0, 2] = (scaled[0, 2] + 0.5) * sx - 0.5
+    scaled[1, 2] = (scaled[1, 2] + 0.5) * sy - 0.5
+    return scaled
+
+
+class ThumbnailUndistortion:
+    """Undistort thumbnails of images of image_size (w, h) and points found on them.
+
+    The maps are built at thumbnail resolution from the scaled intrinsic matrix, the
+    distortion coefficients don't depend on the resolution.
+    """
+
+    def __init__(self, image_size, intrinsic_matrix, distortion_coeffs, fisheye=False):
+        self.image_size = tuple(image_size)
+        self.intrinsic_matrix = intrinsic_matrix
+        self.distortion_coeffs = distortion_coeffs
+        self.fisheye = fisheye
+
+    def maps(self, thumbnail_shape):
+        return undistort_maps.get(
+            thumbnail_shape,
+            scale_intrinsics(
+                self.intrinsic_matrix, self.image_size, thumbnail_shape[1::-1]
+            ),
+            self.distortion_coeffs,
+            self.fisheye,
+            map_type=cv.CV_16SC2,
+        )
+
+    def undistort_image(self, thumbnail):
+        map1, map2, _, _ = self.maps(thumbnail.shape)
+        return cv.remap(thumbnail, map1, map2, cv.INTER_LINEAR)
+
+    def undistort_points(self, imgpoints, thumbnail_shape):
+        """Full resolution image points to points on the undistorted thumbnail."""
+        _, _, new_matrix, _ = self.maps(thumbnail_shape)
+        imgpoints = np.asarray(imgpoints, np.float64).reshape(-1, 1, 2)
+        if self.fisheye:
+            points = cv.fisheye.undistortPoints(
+                imgpoints, self.intrinsic_matrix, self.distortion_coeffs, P=new_matrix
+            )
+        else:
+            points = cv.undistortPoints(
+                imgpoints,
+                self.intrinsic_matrix,
+                self.distortion_coeffs,
+                P=new_matrix,
+            )
+        return points.astype(np.float32)
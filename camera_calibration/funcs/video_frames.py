@@ -0,0 +1,59 @@
+import cv2 as cv
+import numpy as np
+
+motion_width = 160  # width of the frames compared for motion
+
+
+def motion_image(frame):
+    scale = motion_width / frame.shape[1]
+    small = cv.resize(frame, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+    return cv.cvtColor(small, cv.COLOR_BGR2GRAY).astype(np.int16)
+
+
+def sample_video_frames(path, stride=1, min_motion=0, max_frames=0):
+    """Yield (frame index, frame) from a video without keeping the whole clip.
+
+    Every `stride`-th frame is considered, it is kept only if its mean absolute
+    difference to the last kept frame (0-255) is at least `min_motion`. With
+    `max_frames` the stride is widened to spread the frames over the clip, and
+    sampling stops once that many frames are kept.
+    """
+    cap = cv.VideoCapture(str(path))
+    if not cap.isOpened():
+        raise IOError(f"Could not open {path}")
+
+    stride = max(int(stride), 1)
+    frame_count = int(cap.get(cv.CAP_PROP_FRAME_COUNT))
+    if max_frames and frame_count > 0:
+        stride = max(stride, frame_count // max_frames)
+
+    kept = 0
+    last = None
+    index = 0
+    try:
+        while True:
+            # skipped frames are only grabbed, not decoded
+            if index % stride:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            if min_motion > 0:
+                current = motion_image(frame)
+                if last is not None and np.abs(current - last).mean() < min_motion:
+                    index += 1
+                    continue
+                last = current
+
+            yield index, frame
+            kept += 1
+            if max_frames and kept >= max_frames:
+                break
+            index += 1
+    finally:
+        cap.release()
@@ -0,0 +1,71 @@
+import numpy as np
+
+from camera_calibration.funcs.keyframes import rough_pose
+
+selection_grid = (16, 12)
+pose_tilt_scale = 10  # degrees
+pose_distance_scale = np.log(1.25)
+
+
+def cell_counts(imgpoints, image_size, grid=selection_grid):
+    """Number of points of each view in each cell of a grid over the image."""
+    width, height = image_size
+    gx, gy = grid
+    counts = np.zeros((len(imgpoints), gx * gy), np.float32)
+    for i, points in enumerate(imgpoints):
+        points = points.reshape(-1, 2)
+        cx = np.clip((points[:, 0] * gx / width).astype(int), 0, gx - 1)
+        cy = np.clip((points[:, 1] * gy / height).astype(int), 0, gy - 1)
+        counts[i] = np.bincount(cy * gx + cx, minlength=gx * gy)
+    return counts
+
+
+def pose_similarity(objpoints, imgpoints, image_size):
+    """Similarity (0 - 1) of the rough poses of every pair of views."""
+    poses = [rough_pose(o, i, *image_size) for o, i in zip(objpoints, imgpoints)]
+    normals = np.array([normal for normal, _ in poses])
+    log_distances = np.log([distance for _, distance in poses])
+
+    tilts = np.degrees(np.arccos(np.clip(normals @ normals.T, -1, 1)))
+    distances = log_distances[:, None] - log_distances[None]
+    return np.exp(
+        -((tilts / pose_tilt_scale) ** 2) - (distances / pose_distance_scale) ** 2
+    ).astype(np.float32)
+
+
+def select_views(objpoints, imgpoints, image_size, max_views, grid=selection_grid):
+    """Greedily pick up to max_views views that cover the image and span the poses.
+
+    Each step adds the view with the largest sum of
+    - coverage gain: new points per grid cell, saturating at the count an even spread
+      of the selected views would give, scaled so a view filling its share gives 1,
+    - pose novelty: 1 - similarity to the closest selected pose, which favours the
+      extreme tilts and distances that constrain the focal length and distortion.
+    Returns the sorted indices of the selected views.
+    """
+    n = len(imgpoints)
+    if not max_views or n <= max_views:
+        return list(range(n))
+
+    counts = cell_counts(imgpoints, image_size, grid)
+    cells = counts.shape[1]
+    cap = max(1.0, counts.sum() / n * max_views / cells)
+    similarity = pose_similarity(objpoints, imgpoints, image_size)
+
+    covered = np.zeros(cells, np.float32)
+    closest = np.zeros(n, np.float32)  # similarity to the closest selected pose
+    available = np.ones(n, bool)
+    selected = []
+    for _ in range(max_views):
+        coverage_gain = (
+            np.minimum(covered + counts, cap) - np.minimum(covered, cap)
+        ).sum(axis=1) * (max_views / (cap * cells))
+        gain = np.where(available, coverage_gain + 1 - closest, -np.inf)
+
+        best = int(np.argmax(gain))
+        selected.append(best)
+        available[best] = False
+        covered += counts[best]
+        closest = np.maximum(closest, similarity[best])
+
+    return sorted(selected)
@@ -1,26 +1,47 @@
-import json
 import logging
+import multiprocessing
 import sys
-from functools import partial
+import tempfile
 from pathlib import Path
 
-import cv2 as cv
-import numpy as np
 import qtawesome as qta
 
-from camera_calibration.custom_components import DroppableWidget, FlowLayout
+from camera_calibration.custom_components import DroppableWidget
 from camera_calibration.defs import (
     QtCore,
     QtGui,
     QtWidgets,
     log_file,
+    project_name,
     settings_file,
+    points_cache_file,
     resource_dir,
 )
-from camera_calibration.display_widgets import ImageDisplay
+from camera_calibration.display_widgets import ImageDisplay, GalleryView
 from camera_calibration.display_widgets.camera_display import CameraDisplay
-from camera_calibration.docks import PatternDock, CameraDock, CalibrateDock
+from camera_calibration.docks import PatternDock, CameraDock, CalibrateDock, VideoDock
+from camera_calibration.funcs import (
+    save_calibration,
+    save_session,
+    load_session,
+    FileImage,
+    MissingImage,
+    PointsCache,
+    image_hash,
+    SpilledImage,
+    check_file_type,
+    format_uncertainty,
+    ThumbnailUndistortion,
+)
+from camera_calibration.funcs.session import session_suffix
 from camera_calibration.menu_bar import MenuBar
+from camera_calibration.workers.worker_calibrate import CalibrateWorker
+from camera_calibration.workers.worker_detect import DetectionScheduler
+from camera_calibration.workers.worker_import import ImportWorker
+from camera_calibration.workers.worker_uncertainty import UncertaintyWorker
+from camera_calibration.workers.worker_undistort_preview import (
+    UndistortPreviewWorker,
+)
 
 
 class MainWidget(QtWidgets.QMainWindow):
@@ -36,9 +57,12 @@ class MainWidget(QtWidgets.QMainWindow):
         self.menu_bar = MenuBar(self)
         self.setMenuBar(self.menu_bar)
         self.menu_bar.open_image_file.connect(self.item_dropped)
+        self.menu_bar.open_video_file.connect(self.item_dropped)
+        self.menu_bar.open_session.connect(self.open_session)
+        self.menu_bar.save_session.connect(self.save_session)
 
-        self.main_widget = DroppableWidget(filetypes=["image"], parent=self)
-        self.main_widget.setToolTip("Drop images here.")
+        self.main_widget = DroppableWidget(filetypes=["image", "video"], parent=self)
+        self.main_widget.setToolTip("Drop images or videos here.")
         self.main_widget.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self.main_widget.customContextMenuRequested.connect(
             self.main_widget_context_menu_requested
@@ -46,14 +70,16 @@ class MainWidget(QtWidgets.QMainWindow):
         self.main_layout = QtWidgets.QVBoxLayout(self.main_widget)
         self.setCentralWidget(self.main_widget)
 
-        self.scroll_area = QtWidgets.QScrollArea(self.main_widget)
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area_contents = QtWidgets.QWidget(self)
-        self.scroll_area.setWidget(self.scroll_area_contents)
-        self.scroll_area_layout = FlowLayout(self.scroll_area_contents)
-        self.main_layout.addWidget(self.scroll_area)
+        self.gallery = GalleryView(self.main_widget)
+        self.gallery.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.gallery.customContextMenuRequested.connect(
+            self.main_widget_context_menu_requested
+        )
+        self.gallery.remove_requested.connect(self.remove_image)
+        self.gallery.tile_width_changed.connect(self.tile_width_changed)
+        self.main_layout.addWidget(self.gallery)
 
-        self.context_menu = QtWidgets.QMenu(self.scroll_area_contents)
+        self.context_menu = QtWidgets.QMenu(self.gallery)
         clear_all_action = self.context_menu.addAction("Clear All")
         clear_all_action.setIcon(qta.icon("mdi6.delete", color="red"))
         clear_all_action.triggered.connect(self.clear_scroll_area)
@@ -62,15 +88,52 @@ class MainWidget(QtWidgets.QMainWindow):
             "Pattern": PatternDock(),
             "Camera": CameraDock(),
             "Calibrate": CalibrateDock(),
+            "Video": VideoDock(),
         }
         for dock in self.docks.values():
             self.addDockWidget(QtCore.Qt.LeftDockWidgetArea, dock)
+        self.docks["Pattern"].detection_settings_changed.connect(self.redetect_images)
+        self.docks["Pattern"].detection_settings_changed.connect(
+            self.camera_pattern_changed
+        )
         self.docks["Camera"].connect_camera_clicked.connect(self.open_camera)
         self.docks["Calibrate"].start_calibrate.connect(self.calibrate)
+        self.docks["Calibrate"].estimate_uncertainty.connect(self.estimate_uncertainty)
+        self.docks["Calibrate"].cancel_clicked.connect(self.cancel_calibration)
         self.docks["Calibrate"].save_clicked.connect(self.save_calibration)
 
-        self.image_display_items = []
+        self.image_hashes = set()
         self.image_width = 100
+        self.gallery.set_tile_width(self.image_width)
+
+        self.calibrate_worker = CalibrateWorker()
+        self.calibrate_worker.finished.connect(self.calibration_finished)
+        self.calibrate_worker.failed.connect(self.calibration_failed)
+        self.calibration_job = 0
+        self.calibrating = None
+        self.calibrated = None  # (fisheye, shape, settings key) of the results
+        self.view_extrinsics = {}  # image key -> (rvec, tvec) of the results
+        self.view_errors = []  # (label, RMS error, corner errors) of the views used
+        self.excluded_views = []  # (label, reason) of views dropped by the solver
+
+        self.uncertainty_worker = UncertaintyWorker()
+        self.uncertainty_worker.progress.connect(self.uncertainty_progress)
+        self.uncertainty_worker.finished.connect(self.uncertainty_finished)
+        self.uncertainty_worker.failed.connect(self.uncertainty_failed)
+        self.uncertainty_labels = []
+
+        self.undistort_preview_worker = UndistortPreviewWorker(parent=self)
+        self.undistort_preview_worker.undistorted.connect(self.thumbnail_undistorted)
+        self.preview_undistortion = None
+        self.docks["Calibrate"].undistort_checkbox.toggled.connect(
+            self.update_undistorted_preview
+        )
+
+        self.recalibrate_timer = QtCore.QTimer(self)
+        self.recalibrate_timer.setSingleShot(True)
+        self.recalibrate_timer.setInterval(1000)
+        self.recalibrate_timer.timeout.connect(self.auto_recalibrate)
+        self.docks["Calibrate"].auto_checkbox.toggled.connect(self.views_changed)
 
         self.camera_display = None
         self.fisheye = None
@@ -82,6 +145,41 @@ class MainWidget(QtWidgets.QMainWindow):
         self.save_path = None
 
         self.pool = QtCore.QThreadPool.globalInstance()
+        self.points_cache = PointsCache(points_cache_file())
+        self.scheduler = DetectionScheduler(parent=self)
+        self.scheduler.points_found.connect(self.points_found)
+        self.scheduler.progress.connect(self.detection_progress)
+        self.scheduler.throughput.connect(self.detection_throughput)
+        self.detection_rate = 0
+
+        # full resolution frames without a file, e.g. from the camera
+        self.spill_dir = tempfile.TemporaryDirectory(prefix=f"{project_name}-")
+
+        # images decoded in the background, held until their points are found
+        self.importing = set()
+        self.import_failed = []
+        self.import_thread = QtCore.QThread()
+        self.import_worker = ImportWorker(spill_dir=self.spill_dir.name)
+        self.import_worker.moveToThread(self.import_thread)
+        self.import_thread.started.connect(self.import_worker.run)
+        self.import_worker.image_loaded.connect(self.image_loaded)
+        self.import_worker.load_failed.connect(self.import_failed.append)
+        self.import_worker.progress.connect(self.import_progress)
+        self.scheduler.job_done.connect(self.detection_job_done)
+        self.import_thread.start()
+
+        self.import_progress_bar = QtWidgets.QProgressBar(self)
+        self.import_progress_bar.setFormat("Importing %v/%m")
+        self.import_progress_bar.setMaximumWidth(200)
+        self.import_progress_bar.hide()
+        self.statusBar().addPermanentWidget(self.import_progress_bar)
+        self.import_cancel_button = QtWidgets.QToolButton(self)
+        self.import_cancel_button.setIcon(qta.icon("mdi6.close"))
+        self.import_cancel_button.setToolTip("Cancel import.")
+        self.import_cancel_button.setAutoRaise(True)
+        self.import_cancel_button.clicked.connect(self.cancel_import)
+        self.import_cancel_button.hide()
+        self.statusBar().addPermanentWidget(self.import_cancel_button)
 
         # load settings from previous session
         self.settings_file = settings_file()
@@ -97,91 +195,363 @@ class MainWidget(QtWidgets.QMainWindow):
         self.context_menu.exec(QtGui.QCursor.pos())
 
     def item_dropped(self, path):
-        img = cv.imread(str(path))
-        if img is None:
-            self.error_dialog(f"Could not read {path}")
-            return
-        self.add_image(img, path.name)
+        if check_file_type(path, ["video"]):
+            self.import_worker.add_path(path, self.docks["Video"].get_settings())
+        else:
+            self.import_worker.add_path(path)
+
+    def image_loaded(self, loaded):
+        image_display = None
+        if loaded.generation == self.import_worker.generation:
+            image_display = self.add_image(
+                loaded.img,
+                loaded.label,
+                loaded.source,
+                loaded.img_hash,
+                loaded.thumbnail,
+            )
+        if image_display is None:
+            loaded.source.release()
+
+        if image_display is not None and self.scheduler.has_job(image_display):
+            self.importing.add(image_display)
+        else:
+            self.import_worker.release_slot()
+
+    def detection_job_done(self, image_display):
+        if image_display in self.importing:
+            self.importing.discard(image_display)
+            self.import_worker.release_slot()
+
+    def import_progress(self, done, total):
+        importing = done < total
+        self.import_progress_bar.setVisible(importing)
+        self.import_cancel_button.setVisible(importing)
+        self.import_progress_bar.setRange(0, total)
+        self.import_progress_bar.setValue(done)
+
+        if not importing and self.import_failed:
+            failed = "\n".join(str(path) for path in self.import_failed[:20])
+            if len(self.import_failed) > 20:
+                failed += f"\n... and {len(self.import_failed) - 20} more"
+            self.import_failed.clear()
+            self.error_dialog(f"Could not read\n{failed}")
+
+    def cancel_import(self):
+        # called directly, the worker's thread is busy in run() and never gets to a
+        # queued slot
+        self.import_worker.cancel()
+
+    def add_image(self, img, text, source=None, img_hash=None, thumbnail=None):
+        img_hash = img_hash or image_hash(img)
+        if img_hash in self.image_hashes:
+            logging.info(f"Skipped {text}, image already added.")
+            self.statusBar().showMessage(f"Skipped {text}, image already added.", 3000)
+            return None
+
+        if source is None:
+            source = SpilledImage(img, self.spill_dir.name)
 
-    def add_image(self, img, text):
         image_display = ImageDisplay()
-        image_display.set_image(img, text)
-        image_display.scale_image_to_width(self.image_width)
-        image_display.close_clicked.connect(partial(self.remove_image, image_display))
+        image_display.img_hash = img_hash
+        image_display.set_image(img, text, source, thumbnail)
+
+        self.find_points(image_display, img=img)
 
+        self.image_hashes.add(img_hash)
+        self.gallery.add_item(image_display)
+        if self.preview_undistortion is not None:
+            image_display.set_undistortion(self.preview_undistortion)
+            self.undistort_preview_worker.submit(
+                [image_display], self.preview_undistortion
+            )
+        return image_display
+
+    @property
+    def image_display_items(self):
+        return self.gallery.items
+
+    def pattern_settings_key(self):
         pattern_settings = self.docks["Pattern"].get_settings()
-        image_display.find_points(
+        return (
             pattern_settings["rows"] - 1,
             pattern_settings["cols"] - 1,
             pattern_settings["pattern"],
+            pattern_settings["coarse"],
         )
 
-        self.image_display_items.append(image_display)
-        self.scroll_area_layout.addWidget(image_display)
-        QtWidgets.QApplication.processEvents()
+    def find_points(self, image_display, priority=0, img=None):
+        """Detect points, from img if given or reloading the full resolution image."""
+        settings_key = self.pattern_settings_key()
+        if image_display.request_points(settings_key):
+            self.scheduler.cancel(image_display)
+            return
+
+        if img is None or self.scheduler.is_full():
+            # jobs queued beyond the bound reload the image instead of holding it
+            img = image_display.source.load
+        self.scheduler.submit(
+            image_display,
+            settings_key,
+            img,
+            self.points_cache,
+            image_display.img_hash,
+            priority,
+        )
+
+    def points_found(self, image_display, results):
+        image_display.points_found(results)
+        self.views_changed()
+
+    def redetect_images(self):
+        # thumbnails in view first
+        for priority, items in [
+            (1, self.gallery.visible_items()),
+            (0, self.image_display_items),
+        ]:
+            for image_display in items:
+                self.find_points(image_display, priority)
+
+    def detection_progress(self, done, total):
+        if done < total:
+            self.statusBar().showMessage(
+                f"Detecting points {done}/{total} ({self.detection_rate:.1f} images/s)"
+            )
+        else:
+            self.statusBar().clearMessage()
+
+    def detection_throughput(self, rate):
+        self.detection_rate = rate
 
     def remove_image(self, image_display):
-        self.scroll_area_layout.removeWidget(image_display)
-        self.image_display_items.remove(image_display)
+        self.scheduler.cancel(image_display)
+        image_display.release()
+        self.image_hashes.discard(image_display.img_hash)
+        self.gallery.remove_item(image_display)
         image_display.deleteLater()
+        self.views_changed()
 
     def clear_scroll_area(self):
         for image_display in self.image_display_items:
-            self.scroll_area_layout.removeWidget(image_display)
+            self.scheduler.cancel(image_display)
+            image_display.release()
             image_display.deleteLater()
-        self.image_display_items.clear()
+        self.image_hashes.clear()
+        self.gallery.clear()
+        self.views_changed()
 
     def open_camera(self, camera_no):
-        self.camera_display = CameraDisplay(camera_no, self)
+        self.camera_display = CameraDisplay(
+            camera_no, self.docks["Pattern"].get_settings(), self
+        )
         self.camera_display.add_image.connect(self.add_image)
-        self.camera_display.closed.connect(self.docks["Camera"].camera_closed())
+        self.camera_display.closed.connect(self.docks["Camera"].camera_closed)
         self.camera_display.show()
 
+    def camera_pattern_changed(self):
+        if self.camera_display is not None:
+            self.camera_display.set_pattern_settings(
+                self.docks["Pattern"].get_settings()
+            )
+
+    def calibration_views(self):
+        return [
+            image_display
+            for image_display in self.image_display_items
+            if image_display.objpoints is not None
+            and image_display.imgpoints is not None
+        ]
+
     def calibrate(self, fisheye):
-        self.fisheye = fisheye
-        imgshapes = []
-        objpoints = []
-        imgpoints = []
-        for image_display in self.image_display_items:
-            if (
-                image_display.objpoints is not None
-                and image_display.imgpoints is not None
-            ):
-                objpoints.append(image_display.objpoints)
-                imgpoints.append(image_display.imgpoints)
-                imgshapes.append(image_display.shape)
-
-        if len(objpoints) == 0 or len(imgpoints) == 0:
+        views = self.calibration_views()
+        if len(views) == 0:
             self.error_dialog("No calibration data available!")
             self.clear_results()
             return
 
-        if len(set(imgshapes)) > 1:
+        if len({view.shape for view in views}) > 1:
             self.error_dialog("Image with different shape was used!")
             self.clear_results()
             return
-        if fisheye:
-            objpoints = np.expand_dims(
-                np.asarray(objpoints), -2
-            )  # https://github.com/opencv/opencv/issues/5534
-            (
-                self.rms_error,
+
+        objpoints = [view.objpoints for view in views]
+        imgpoints = [view.imgpoints for view in views]
+        keys = [view.key for view in views]
+        labels = [view.label or view.key for view in views]
+        state = (fisheye, views[0].shape, self.pattern_settings_key())
+
+        # start from the previous results if they are for the same camera setup
+        warm_start = ()
+        if state == self.calibrated:
+            extrinsics = [self.view_extrinsics.get(key, (None, None)) for key in keys]
+            warm_start = (
                 self.intrinsic_matrix,
                 self.distortion_coeffs,
-                self.rotation_vecs,
-                self.translation_vecs,
-            ) = cv.fisheye.calibrate(objpoints, imgpoints, imgshapes[0], None, None)
+                [rvec for rvec, _ in extrinsics],
+                [tvec for _, tvec in extrinsics],
+            )
+
+        # a newer request supersedes the running one
+        self.calibrate_worker.cancel()
+        self.uncertainty_worker.cancel()
+        self.calibration_job += 1
+        self.calibrating = (state, keys, labels)
+        self.calibrate_worker.submit(
+            self.calibration_job,
+            objpoints,
+            imgpoints,
+            state[1],
+            fisheye,
+            warm_start,
+            self.docks["Calibrate"].max_views_spinbox.value(),
+            self.docks["Calibrate"].max_error_spinbox.value(),
+        )
+        self.docks["Calibrate"].set_busy(len(objpoints))
 
+    def views_changed(self):
+        if self.docks["Calibrate"].auto_checkbox.isChecked():
+            self.recalibrate_timer.start()
+
+    def auto_recalibrate(self):
+        views = self.calibration_views()
+        if len(views) >= 3 and len({view.shape for view in views}) == 1:
+            self.docks["Calibrate"].calibrate_button_clicked()
+
+    def calibration_finished(self, job_id, results):
+        if job_id != self.calibration_job:
+            return
+        state, keys, labels = self.calibrating
+        kept = results["kept"]
+        self.fisheye = state[0]
+        (
+            self.rms_error,
+            self.intrinsic_matrix,
+            self.distortion_coeffs,
+            self.rotation_vecs,
+            self.translation_vecs,
+        ) = results["results"]
+        self.calibrated = state
+        self.view_extrinsics = dict(
+            zip(
+                [keys[i] for i in kept],
+                zip(self.rotation_vecs, self.translation_vecs),
+            )
+        )
+        self.view_errors = [
+            (labels[i], error, corner_errors)
+            for i, error, corner_errors in zip(
+                kept, results["view_errors"], results["corner_errors"]
+            )
+        ]
+        self.excluded_views = [
+            (labels[i], reason) for i, reason in sorted(results["excluded"].items())
+        ]
+        if len(kept) < len(keys):
+            message = f"Calibrated {len(kept)} of {{views}} views"
         else:
+            message = "Calibrated {views} views"
+        self.docks["Calibrate"].set_done(message + " in {elapsed:.2f} s")
+        self.output_results()
+        self.update_undistorted_preview()
+
+    def calibration_failed(self, job_id, error):
+        if job_id != self.calibration_job:
+            return
+        self.docks["Calibrate"].set_done("Calibration failed after {elapsed:.2f} s")
+        self.clear_results()
+        self.error_dialog(f"Calibration failed!\n{error}")
+
+    def update_undistorted_preview(self):
+        """Undistort the thumbnails with the results, visible ones first."""
+        self.undistort_preview_worker.cancel()
+        self.preview_undistortion = None
+        if self.docks["Calibrate"].undistort_checkbox.isChecked() and self.calibrated:
+            self.preview_undistortion = ThumbnailUndistortion(
+                self.calibrated[1],
+                self.intrinsic_matrix,
+                self.distortion_coeffs,
+                self.fisheye,
+            )
+
+        for image_display in self.image_display_items:
+            image_display.set_undistortion(self.preview_undistortion)
+        if self.preview_undistortion is not None:
+            visible_items = self.gallery.visible_items()
+            visible = set(visible_items)
+            self.undistort_preview_worker.submit(
+                visible_items
+                + [item for item in self.image_display_items if item not in visible],
+                self.preview_undistortion,
+            )
+
+    def thumbnail_undistorted(self, image_display, undistortion, image):
+        if image_display.source is not None:  # not removed meanwhile
+            image_display.set_undistorted(undistortion, image)
+
+    def estimate_uncertainty(self, method, resamples):
+        if self.calibrated is None:
+            self.error_dialog("No calibration available!")
+            return
+        views = {view.key: view for view in self.calibration_views()}
+        keys = list(self.view_extrinsics)
+        if (
+            any(key not in views for key in keys)
+            or self.pattern_settings_key() != self.calibrated[2]
+        ):
+            self.error_dialog("The views have changed, recalibrate first!")
+            return
+
+        views = [views[key] for key in keys]
+        self.uncertainty_labels = [view.label or view.key for view in views]
+        self.calibrate_worker.cancel()
+        self.calibration_job += 1
+        self.uncertainty_worker.submit(
+            self.calibration_job,
+            [view.objpoints for view in views],
+            [view.imgpoints for view in views],
+            self.calibrated[1],
+            self.fisheye,
             (
                 self.rms_error,
                 self.intrinsic_matrix,
                 self.distortion_coeffs,
                 self.rotation_vecs,
                 self.translation_vecs,
-            ) = cv.calibrateCamera(objpoints, imgpoints, imgshapes[0], None, None)
+            ),
+            method,
+            resamples,
+        )
+        self.docks["Calibrate"].set_busy(
+            len(views), f"Estimating uncertainty from {{views}} views ({method})"
+        )
 
-        self.output_results()
+    def uncertainty_progress(self, job_id, done, total):
+        if job_id == self.calibration_job:
+            self.docks["Calibrate"].set_progress(done, total)
+
+    def uncertainty_finished(self, job_id, summary):
+        if job_id != self.calibration_job:
+            return
+        self.docks["Calibrate"].set_done(
+            f"Solved {summary['resamples']} resamples in {{elapsed:.1f}} s"
+        )
+        self.docks["Calibrate"].set_uncertainty(
+            format_uncertainty(summary, self.fisheye, self.uncertainty_labels)
+        )
+
+    def uncertainty_failed(self, job_id, error):
+        if job_id != self.calibration_job:
+            return
+        self.uncertainty_worker.cancel()
+        self.calibration_job += 1  # ignore the other chunks failing
+        self.docks["Calibrate"].set_done("Uncertainty failed after {elapsed:.1f} s")
+        self.error_dialog(f"Uncertainty estimation failed!\n{error}")
+
+    def cancel_calibration(self):
+        self.calibrate_worker.cancel()
+        self.uncertainty_worker.cancel()
+        self.calibration_job += 1
+        self.docks["Calibrate"].set_done("Cancelled after {elapsed:.1f} s")
 
     def save_calibration(self):
         if any(
@@ -202,27 +572,162 @@ class MainWidget(QtWidgets.QMainWindow):
         )
         self.save_path = Path(save_url.toLocalFile())
 
-        if self.save_path.suffix == ".json":
-            with open(self.save_path, "w") as f:
-                json.dump(
-                    dict(
-                        K=self.intrinsic_matrix.tolist(),
-                        D=self.distortion_coeffs.tolist(),
-                        fisheye=self.fisheye,
+        save_calibration(
+            self.save_path, self.intrinsic_matrix, self.distortion_coeffs, self.fisheye
+        )
+        self.calibration_saved.emit(self.save_path)
+
+    def save_session(self, path=None):
+        """Save the views, their points, thumbnails and the results to a file."""
+        if path is None:
+            path, _ = QtWidgets.QFileDialog.getSaveFileName(
+                self, "Save Session", None, f"Session (*{session_suffix})"
+            )
+            if not path:
+                return
+            path = Path(path).with_suffix(session_suffix)
+
+        views = []
+        for image_display in self.image_display_items:
+            settings_key = image_display.settings_key or self.pattern_settings_key()
+            ret, objpoints, imgpoints = None, None, None
+            if (results := image_display.results.get(settings_key)) is not None:
+                _, ret, objpoints, imgpoints = results
+            source = image_display.source
+            views.append(
+                dict(
+                    label=image_display.label,
+                    # frames from cameras and videos only live in the spill folder
+                    source=(
+                        source.path.resolve() if isinstance(source, FileImage) else None
                     ),
-                    f,
-                    sort_keys=False,
-                    indent=4,
+                    img_hash=image_display.img_hash,
+                    shape=image_display.shape,
+                    thumbnail=image_display.thumbnail,
+                    settings_key=settings_key,
+                    ret=ret,
+                    objpoints=objpoints,
+                    imgpoints=imgpoints,
                 )
+            )
 
-        elif self.save_path.suffix == ".npz":
-            np.savez(
-                self.save_path,
+        calibration = None
+        if self.calibrated is not None:
+            index = {view.key: i for i, view in enumerate(self.image_display_items)}
+            calibration = dict(
+                fisheye=self.fisheye,
+                shape=self.calibrated[1],
+                settings_key=self.calibrated[2],
+                rms_error=self.rms_error,
                 K=self.intrinsic_matrix,
                 D=self.distortion_coeffs,
-                fisheye=self.fisheye,
+                views=[index.get(key, -1) for key in self.view_extrinsics],
+                labels=[label for label, _, _ in self.view_errors],
+                rvecs=self.rotation_vecs,
+                tvecs=self.translation_vecs,
+                view_errors=[error for _, error, _ in self.view_errors],
+                corner_errors=[errors for _, _, errors in self.view_errors],
+                excluded=self.excluded_views,
             )
-        self.calibration_saved.emit(self.save_path)
+
+        settings = dict(
+            pattern=self.docks["Pattern"].get_settings(),
+            camera_model=self.docks["Calibrate"].camera_model_combobox.currentText(),
+        )
+        try:
+            save_session(path, views, settings, calibration)
+        except OSError as e:
+            self.error_dialog(f"Could not save {path}!\n{e}")
+            return
+        self.statusBar().showMessage(f"Saved {len(views)} views to {path}", 3000)
+
+    def open_session(self, path=None):
+        """Replace the gallery and results with a saved session.
+
+        Thumbnails and points come from the file, images are only reloaded for
+        detecting with other settings.
+        """
+        if path is None:
+            path, _ = QtWidgets.QFileDialog.getOpenFileName(
+                self, "Open Session", None, f"Session (*{session_suffix})"
+            )
+            if not path:
+                return
+
+        try:
+            views, settings, calibration = load_session(path)
+            pattern_settings = settings["pattern"]
+            camera_model = settings["camera_model"]
+        except (OSError, ValueError, KeyError) as e:
+            self.error_dialog(f"Could not open {path}!\n{e}")
+            return
+
+        self.import_worker.cancel()
+        # results of a running job are for the old gallery
+        self.calibrate_worker.cancel()
+        self.uncertainty_worker.cancel()
+        self.calibration_job += 1
+        self.docks["Calibrate"].set_done("")
+        self.clear_scroll_area()
+        self.clear_results()
+        self.docks["Pattern"].set_settings(pattern_settings)
+        self.docks["Calibrate"].camera_model_combobox.setCurrentText(camera_model)
+
+        image_displays = []
+        for view in views:
+            image_display = ImageDisplay()
+            image_display.img_hash = view["img_hash"]
+            image_display.set_thumbnail(
+                view["thumbnail"],
+                view["shape"],
+                view["label"],
+                FileImage(view["source"]) if view["source"] else MissingImage(),
+            )
+            if view["ret"] is not None:
+                image_display.results[view["settings_key"]] = (
+                    view["settings_key"],
+                    view["ret"],
+                    view["objpoints"],
+                    view["imgpoints"],
+                )
+            self.image_hashes.add(view["img_hash"])
+            self.gallery.add_item(image_display)
+            image_displays.append(image_display)
+        for image_display in image_displays:
+            self.find_points(image_display)  # only views saved before detection
+
+        if calibration is not None:
+            self.fisheye = calibration["fisheye"]
+            self.rms_error = calibration["rms_error"]
+            self.intrinsic_matrix = calibration["K"]
+            self.distortion_coeffs = calibration["D"]
+            self.rotation_vecs = calibration["rvecs"]
+            self.translation_vecs = calibration["tvecs"]
+            self.calibrated = (
+                self.fisheye,
+                calibration["shape"],
+                calibration["settings_key"],
+            )
+            self.view_extrinsics = {
+                image_displays[i].key: extrinsics
+                for i, extrinsics in zip(
+                    calibration["views"],
+                    zip(self.rotation_vecs, self.translation_vecs),
+                )
+                if i >= 0
+            }
+            self.view_errors = list(
+                zip(
+                    calibration["labels"],
+                    calibration["view_errors"],
+                    calibration["corner_errors"],
+                )
+            )
+            self.excluded_views = calibration["excluded"]
+            self.output_results()
+            self.update_undistorted_preview()
+        self.recalibrate_timer.stop()  # the results are those of the session
+        self.statusBar().showMessage(f"Opened {len(views)} views from {path}", 3000)
 
     def clear_results(self):
         self.rms_error = None
@@ -232,7 +737,14 @@ class MainWidget(QtWidgets.QMainWindow):
         self.translation_vecs = None
         self.fisheye = None
         self.save_path = None
+        self.calibrated = None
+        self.view_extrinsics = {}
+        self.view_errors = []
+        self.excluded_views = []
         self.docks["Calibrate"].results_label.setText("")
+        self.docks["Calibrate"].uncertainty_label.setText("")
+        if self.preview_undistortion is not None:
+            self.update_undistorted_preview()
 
     def output_results(self):
         self.docks["Calibrate"].set_results(
@@ -242,16 +754,12 @@ class MainWidget(QtWidgets.QMainWindow):
             self.rotation_vecs,
             self.translation_vecs,
             self.fisheye,
+            self.view_errors,
+            self.excluded_views,
         )
 
-    def wheelEvent(self, evt):
-        if evt.modifiers() == QtCore.Qt.KeyboardModifier.ControlModifier:
-            self.image_width += evt.angleDelta().y() / 12
-            if self.image_width < 0:
-                self.image_width = 0
-
-            for image_display in self.image_display_items:
-                image_display.scale_image_to_width(self.image_width)
+    def tile_width_changed(self, width):
+        self.image_width = width
 
     def gui_save(self, settings):
         for dock in self.docks.values():
@@ -273,6 +781,16 @@ class MainWidget(QtWidgets.QMainWindow):
 
     def closeEvent(self, event):
         """save before closing"""
+        self.import_worker.cancel()
+        self.import_worker.stop()
+        self.import_thread.quit()
+        self.import_thread.wait()
+        self.scheduler.cancel_all()
+        self.scheduler.pool.waitForDone()
+        self.calibrate_worker.close()
+        self.uncertainty_worker.cancel()
+        self.undistort_preview_worker.cancel()
+        self.undistort_preview_worker.pool.waitForDone()
         settings = QtCore.QSettings(str(self.settings_file), QtCore.QSettings.IniFormat)
         self.gui_save(settings)
         event.accept()
@@ -297,6 +815,8 @@ class MainWidget(QtWidgets.QMainWindow):
 
 
 def main():
+    # spawned calibration and uncertainty processes of a frozen build start here
+    multiprocessing.freeze_support()
     app = QtWidgets.QApplication([])
     win = MainWidget()
     win.show()
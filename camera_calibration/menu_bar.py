@@ -8,6 +8,9 @@ from camera_calibration.funcs import get_extensions_for_type
 
 class MenuBar(QtWidgets.QMenuBar):
     open_image_file = Signal(object)
+    open_video_file = Signal(object)
+    open_session = Signal()
+    save_session = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent=parent)
@@ -25,6 +28,25 @@ class MenuBar(QtWidgets.QMenuBar):
         )
         self.open_image_folder_action.triggered.connect(self.add_folder)
 
+        self.open_video_file_action = self.file_menu.addAction(
+            qta.icon("mdi6.file-video"), "Open Video File..."
+        )
+        self.open_video_file_action.triggered.connect(self.add_video)
+
+        self.file_menu.addSeparator()
+
+        self.open_session_action = self.file_menu.addAction(
+            qta.icon("mdi6.folder-open-outline"), "Open Session..."
+        )
+        self.open_session_action.setShortcut("Ctrl+Shift+O")
+        self.open_session_action.triggered.connect(self.open_session)
+
+        self.save_session_action = self.file_menu.addAction(
+            qta.icon("mdi6.content-save-outline"), "Save Session..."
+        )
+        self.save_session_action.setShortcut("Ctrl+S")
+        self.save_session_action.triggered.connect(self.save_session)
+
     def add_file(self):
         extensions = [f"*{x}" for x, _ in get_extensions_for_type("image")]
         file_names, _ = QtWidgets.QFileDialog.getOpenFileNames(
@@ -37,6 +59,18 @@ class MenuBar(QtWidgets.QMenuBar):
             for file_path in file_names:
                 self.open_image_file.emit(Path(file_path))
 
+    def add_video(self):
+        extensions = [f"*{x}" for x, _ in get_extensions_for_type("video")]
+        file_names, _ = QtWidgets.QFileDialog.getOpenFileNames(
+            self,
+            "Open Video File",
+            None,
+            f"Video Files ({' '.join(extensions)})",
+        )
+        if file_names:
+            for file_path in file_names:
+                self.open_video_file.emit(Path(file_path))
+
     def add_folder(self):
         folder_name = QtWidgets.QFileDialog.getExistingDirectory(
             self,
@@ -0,0 +1,91 @@
+import multiprocessing
+
+from camera_calibration.defs import QtCore, Signal
+from camera_calibration.funcs.reprojection import calibrate_rejecting_outliers
+from camera_calibration.funcs.view_selection import select_views
+
+
+def calibrate_subset(
+    objpoints, imgpoints, shape, fisheye, max_views, warm_start, max_error=0
+):
+    """Select at most max_views views and calibrate, dropping views above max_error.
+
+    Returns calibrate_rejecting_outliers' dict, with the view indices into objpoints.
+    """
+    selected = select_views(objpoints, imgpoints, shape, max_views)
+    if len(selected) < len(objpoints):
+        objpoints = [objpoints[i] for i in selected]
+        imgpoints = [imgpoints[i] for i in selected]
+        if warm_start:
+            K, D, rvecs, tvecs = warm_start
+            warm_start = (
+                K,
+                D,
+                [rvecs[i] for i in selected],
+                [tvecs[i] for i in selected],
+            )
+    calibration = calibrate_rejecting_outliers(
+        objpoints, imgpoints, shape, fisheye, max_error, warm_start=warm_start
+    )
+    calibration["kept"] = [selected[i] for i in calibration["kept"]]
+    calibration["excluded"] = {
+        selected[i]: reason for i, reason in calibration["excluded"].items()
+    }
+    return calibration
+
+
+class CalibrateWorker(QtCore.QObject):
+    """Run calibrations in a child process, so a running job can be cancelled.
+
+    The OpenCV solvers can't be interrupted, cancelling a running job terminates the
+    process and a new one is started for the next job. Otherwise the process is kept,
+    starting one takes about a second.
+    """
+
+    finished = Signal(int, object)  # job id, calibrate_subset results
+    failed = Signal(int, str)
+
+    def __init__(self):
+        super().__init__()
+
+        self.pool = None
+        self.jobs = []  # AsyncResult of each job submitted to the current pool
+
+    def submit(
+        self,
+        job_id,
+        objpoints,
+        imgpoints,
+        shape,
+        fisheye,
+        warm_start=(),
+        max_views=0,
+        max_error=0,
+    ):
+        """warm_start: previous intrinsic matrix, distortion and per view extrinsics."""
+        if self.pool is None:
+            # Qt threads are running, fork is not safe
+            self.pool = multiprocessing.get_context("spawn").Pool(1)
+        self.jobs = [job for job in self.jobs if not job.ready()]
+        job = self.pool.apply_async(
+            calibrate_subset,
+            (objpoints, imgpoints, shape, fisheye, max_views, warm_start, max_error),
+            callback=lambda results: self.finished.emit(job_id, results),
+            error_callback=lambda error: self.failed.emit(job_id, str(error)),
+        )
+        self.jobs.append(job)
+
+    def is_running(self):
+        return any(not job.ready() for job in self.jobs)
+
+    def cancel(self):
+        """Terminate the running job, if any."""
+        if self.is_running():
+            self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        self.jobs = []
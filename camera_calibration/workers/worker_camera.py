@@ -0,0 +1,27 @@
+import threading
+
+from camera_calibration.defs import QtCore, Signal
+from camera_calibration.funcs.opencv_camera import probe_cameras, camera_backend
+
+
+class CameraProbeWorker(QtCore.QObject):
+    """Probe cameras on a daemon thread, a hanging device never blocks closing."""
+
+    finished = Signal(object)
+
+    def __init__(self, max_no=10, timeout=5, backend=""):
+        super().__init__()
+
+        self.max_no = max_no
+        self.timeout = timeout
+        self.backend = camera_backend(backend)
+
+    def start(self):
+        threading.Thread(target=self.probe, daemon=True).start()
+
+    def probe(self):
+        cameras = probe_cameras(self.max_no, self.timeout, self.backend)
+        try:
+            self.finished.emit(cameras)
+        except RuntimeError:
+            pass  # the window was closed meanwhile
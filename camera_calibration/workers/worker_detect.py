@@ -0,0 +1,177 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from camera_calibration.defs import QtCore, Signal
+from camera_calibration.funcs import find_points_cached
+
+
+class DetectionJob:
+    def __init__(self, owner, settings_key, img, cache, img_hash, priority, seq):
+        self.owner = owner
+        self.settings_key = settings_key
+        self.img = img
+        self.cache = cache
+        self.img_hash = img_hash
+        self.priority = priority
+        self.seq = seq
+        self.cancelled = threading.Event()
+
+    def __lt__(self, other):
+        return (-self.priority, self.seq) < (-other.priority, other.seq)
+
+
+class DetectionScheduler(QtCore.QObject):
+    """Cancellable priority queue of point detection jobs.
+
+    Each owner (an image in the gallery) has at most one job, submitting again
+    with other settings cancels the previous one. The image may be given as a
+    callable to load it on the worker thread. Submitting never blocks, the queue
+    is drained as the pool frees up; callers should give a loader instead of the
+    decoded image once it is_full, to keep memory flat. Results carry only the
+    detected points.
+    """
+
+    points_found = Signal(object, object)
+    job_done = Signal(object)
+    progress = Signal(int, int)
+    throughput = Signal(float)
+
+    def __init__(self, max_pending=64, max_threads=None, parent=None):
+        super().__init__(parent=parent)
+
+        self.max_pending = max_pending
+        self.pool = QtCore.QThreadPool(self)
+        if max_threads is not None:
+            self.pool.setMaxThreadCount(max_threads)
+
+        self.pending = []
+        self.stale = 0  # cancelled jobs still in pending
+        self.jobs = {}
+        self.running = set()
+        self.seq = itertools.count()
+
+        self.done = 0
+        self.total = 0
+        self.start_time = None
+
+    def has_job(self, owner):
+        return owner in self.jobs
+
+    def is_full(self):
+        return len(self.pending) - self.stale >= self.max_pending
+
+    def submit(self, owner, settings_key, img, cache=None, img_hash=None, priority=0):
+        if (job := self.jobs.get(owner)) is not None:
+            if job.settings_key == settings_key and not job.cancelled.is_set():
+                return
+            self.cancel(owner)
+
+        job = DetectionJob(
+            owner, settings_key, img, cache, img_hash, priority, next(self.seq)
+        )
+        self.jobs[owner] = job
+        heapq.heappush(self.pending, job)
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        self.total += 1
+        self.progress.emit(self.done, self.total)
+        self.dispatch()
+
+    def cancel(self, owner):
+        if (job := self.jobs.pop(owner, None)) is not None:
+            job.cancelled.set()
+            job.img = None
+            if job not in self.running:
+                # drop from the queue lazily, it is skipped when popped
+                self.stale += 1
+                self.job_finished(job, counted=False)
+
+    def cancel_all(self):
+        for owner in list(self.jobs):
+            self.cancel(owner)
+
+    def dispatch(self):
+        while self.pending and len(self.running) < self.pool.maxThreadCount():
+            job = heapq.heappop(self.pending)
+            if job.cancelled.is_set():
+                self.stale -= 1
+                continue
+            runnable = DetectionRunnable(job)
+            runnable.signals.finished.connect(self.runnable_finished)
+            self.running.add(job)
+            self.pool.start(runnable, job.priority)
+
+        # keep the queue tidy when many jobs were cancelled
+        if self.stale > max(len(self.pending) // 2, self.max_pending):
+            self.pending = [job for job in self.pending if not job.cancelled.is_set()]
+            heapq.heapify(self.pending)
+            self.stale = 0
+
+    def runnable_finished(self, job, results):
+        self.running.discard(job)
+        if not job.cancelled.is_set() and self.jobs.get(job.owner) is job:
+            del self.jobs[job.owner]
+            self.points_found.emit(job.owner, results)
+        self.job_finished(job)
+
+    def job_finished(self, job, counted=True):
+        self.job_done.emit(job.owner)
+        if counted:
+            self.done += 1
+        else:
+            self.total -= 1
+
+        if self.start_time is not None and self.done:
+            self.throughput.emit(self.done / (time.perf_counter() - self.start_time))
+        self.progress.emit(self.done, self.total)
+
+        if not self.jobs and not self.running:
+            self.done = 0
+            self.total = 0
+            self.start_time = None
+        self.dispatch()
+
+
+class DetectionSignals(QtCore.QObject):
+    finished = Signal(object, object)
+
+
+class DetectionRunnable(QtCore.QRunnable):
+    def __init__(self, job):
+        super().__init__()
+
+        self.job = job
+        self.signals = DetectionSignals()
+
+    def run(self):
+        job = self.job
+        results = None
+        try:
+            img = job.img
+            if callable(img):
+                # reload the full resolution image only if the points aren't cached
+                def img(load=img):
+                    return None if job.cancelled.is_set() else load()
+
+            if not job.cancelled.is_set() and img is not None:
+                nx, ny, pattern, coarse = job.settings_key
+                _, ret, objpoints, imgpoints = find_points_cached(
+                    job.cache,
+                    img,
+                    nx,
+                    ny,
+                    pattern,
+                    img_hash=job.img_hash,
+                    coarse=coarse,
+                )
+                if ret is not None:
+                    results = (job.settings_key, ret, objpoints, imgpoints)
+        except Exception as e:
+            # e.g. a corrupt or released image, the job must still finish
+            logging.exception(e)
+            results = None
+        job.img = None
+        self.signals.finished.emit(job, results)
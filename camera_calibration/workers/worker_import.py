@@ -0,0 +1,146 @@
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2 as cv
+
+from camera_calibration.defs import QtCore, Signal
+from camera_calibration.funcs import (
+    FileImage,
+    SpilledImage,
+    check_file_type,
+    image_hash,
+    make_thumbnail,
+    sample_video_frames,
+)
+
+
+class LoadedImage:
+    def __init__(self, path, img, generation, label=None, source=None):
+        self.path = path
+        self.img = img
+        self.generation = generation
+        self.label = label or path.name
+        self.source = source or FileImage(path)
+        self.img_hash = image_hash(img)
+        self.thumbnail = make_thumbnail(img)
+
+
+class ImportWorker(QtCore.QObject):
+    """Decode image files in the background with bounded prefetch.
+
+    At most `prefetch` decoded images are alive at once, a slot is handed back
+    with release_slot() once the consumer no longer needs the full resolution
+    image. Video files are sampled frame by frame, kept frames are spilled to
+    spill_dir so they can be reloaded.
+    """
+
+    image_loaded = Signal(object)
+    load_failed = Signal(object)
+    progress = Signal(int, int)
+    finished = Signal()
+
+    def __init__(self, prefetch=8, workers=None, spill_dir=None):
+        super().__init__()
+
+        self.spill_dir = spill_dir
+        self.workers = workers or min(os.cpu_count() or 1, 8)
+        self.slots = threading.Semaphore(prefetch)
+        self.paths = queue.Queue()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.done = 0
+        self.total = 0
+        self.stop_flag = False
+
+    def add_path(self, path, video_settings=None):
+        with self.lock:
+            self.total += 1
+            self.paths.put((self.generation, Path(path), video_settings or {}))
+        self.progress.emit(self.done, self.total)
+
+    def cancel(self):
+        with self.lock:
+            self.generation += 1
+            self.done = 0
+            self.total = 0
+            while not self.paths.empty():
+                self.paths.get_nowait()
+        self.progress.emit(0, 0)
+
+    def release_slot(self):
+        self.slots.release()
+
+    def run(self):
+        self.stop_flag = False
+        with ThreadPoolExecutor(self.workers) as pool:
+            while not self.stop_flag:
+                try:
+                    generation, path, video_settings = self.paths.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if check_file_type(path, ["video"]):
+                    pool.submit(self.load_video, generation, path, video_settings)
+                elif self.wait_for_slot(generation):
+                    pool.submit(self.load, generation, path)
+        self.finished.emit()
+
+    def wait_for_slot(self, generation):
+        while not self.slots.acquire(timeout=0.1):
+            if self.stop_flag or generation != self.generation:
+                return False
+        if generation != self.generation:
+            self.slots.release()
+            return False
+        return True
+
+    def load(self, generation, path):
+        try:
+            img = cv.imread(str(path))
+            if generation != self.generation:
+                self.slots.release()
+                return
+
+            if img is None:
+                self.slots.release()
+                self.load_failed.emit(path)
+            else:
+                self.image_loaded.emit(LoadedImage(path, img, generation))
+        except Exception as e:
+            logging.exception(e)
+            self.slots.release()
+            self.load_failed.emit(path)
+
+        self.count_done(generation)
+
+    def load_video(self, generation, path, video_settings):
+        try:
+            for index, frame in sample_video_frames(path, **video_settings):
+                if not self.wait_for_slot(generation):
+                    break
+                self.image_loaded.emit(
+                    LoadedImage(
+                        path,
+                        frame,
+                        generation,
+                        f"{path.name} #{index}",
+                        SpilledImage(frame, self.spill_dir),
+                    )
+                )
+        except Exception as e:
+            logging.exception(e)
+            self.load_failed.emit(path)
+
+        self.count_done(generation)
+
+    def count_done(self, generation):
+        with self.lock:
+            if generation == self.generation:
+                self.done += 1
+        self.progress.emit(self.done, self.total)
+
+    def stop(self):
+        self.stop_flag = True
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from camera_calibration.defs import QtCore, Signal
+from camera_calibration.funcs import detect_points_preview
+
+
+class LiveDetectWorker(QtCore.QObject):
+    """Detect the pattern on the newest submitted frame, older frames are dropped."""
+
+    # frame, ret, imgpoints, latency, fps
+    points_found = Signal(object, object, object, float, float)
+    finished = Signal()
+
+    def __init__(self, detect_width=640):
+        super().__init__()
+
+        self.detect_width = detect_width
+        self.pattern_settings = None
+        self.stop_flag = False
+
+        self.lock = threading.Lock()
+        self.frame_ready = threading.Event()
+        self.frame = None
+        self.frame_time = 0
+
+    def set_pattern_settings(self, nx, ny, pattern):
+        self.pattern_settings = (nx, ny, pattern)
+
+    def submit(self, frame):
+        with self.lock:
+            self.frame = frame
+            self.frame_time = time.perf_counter()
+        self.frame_ready.set()
+
+    def run(self):
+        self.stop_flag = False
+        fps = 0.0
+        last_done = None
+
+        while not self.stop_flag:
+            if not self.frame_ready.wait(0.1):
+                continue
+            with self.lock:
+                frame, frame_time = self.frame, self.frame_time
+                self.frame = None
+                self.frame_ready.clear()
+            if frame is None or self.pattern_settings is None:
+                continue
+
+            ret, imgpoints = detect_points_preview(
+                frame, *self.pattern_settings, width=self.detect_width
+            )
+
+            done = time.perf_counter()
+            if last_done is not None:
+                rate = 1 / max(done - last_done, 1e-6)
+                fps = rate if not fps else 0.9 * fps + 0.1 * rate
+            last_done = done
+            self.points_found.emit(frame, ret, imgpoints, done - frame_time, fps)
+
+        self.finished.emit()
+
+    def stop(self):
+        self.stop_flag = True
+        self.frame_ready.set()
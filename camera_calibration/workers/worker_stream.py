@@ -1,10 +1,18 @@
+import threading
+
 import cv2 as cv
 
 from camera_calibration.defs import QtCore, Signal
 
 
 class StreamWorker(QtCore.QObject):
-    new_frame = Signal(object)
+    """Capture frames into a single-slot mailbox, unread frames are overwritten.
+
+    frame_ready is only emitted when the mailbox goes from empty to full, so at most
+    one event is ever queued for the consumer no matter how slow it is.
+    """
+
+    frame_ready = Signal()
     finished = Signal()
 
     def __init__(
@@ -16,7 +24,15 @@ class StreamWorker(QtCore.QObject):
         self.camera_no = camera_no
         self.stop_flag = False
         self.cap = None
+
+        self.lock = threading.Lock()
         self.frame = None
+        self.captured = 0
+        self.dropped = 0
+
+    @property
+    def queue_depth(self):
+        return int(self.frame is not None)
 
     def stream(self):
         self.stop_flag = False
@@ -25,12 +41,26 @@ class StreamWorker(QtCore.QObject):
         while not self.stop_flag:
             ret, frame = self.cap.read()
             if ret:
-                self.new_frame.emit(frame)
+                self.publish(frame)
         self.cap.release()
         self.finished.emit()
         self.stop_flag = False
         self.deleteLater()
 
+    def publish(self, frame):
+        with self.lock:
+            was_empty = self.frame is None
+            self.dropped += not was_empty
+            self.captured += 1
+            self.frame = frame
+        if was_empty:
+            self.frame_ready.emit()
+
+    def take_frame(self):
+        with self.lock:
+            frame, self.frame = self.frame, None
+        return frame
+
     def stop_stream(self):
         self.stop_flag = True
 
@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+from camera_calibration.defs import QtCore, Signal
+from camera_calibration.funcs.uncertainty import (
+    chunked,
+    init_resampling,
+    parameter_vector,
+    resample_sets,
+    solve_resamples,
+    summarize,
+)
+
+
+class UncertaintyWorker(QtCore.QObject):
+    """Solve the resamples of an uncertainty estimate across one process per core.
+
+    A pool is started for each job with the views sent to each process once, it is
+    closed once all resamples are solved, cancelling terminates it.
+    """
+
+    progress = Signal(int, int, int)  # job id, resamples done, total
+    finished = Signal(int, object)  # job id, summarize results
+    failed = Signal(int, str)
+    pool_done = Signal(object)  # queued to the worker's thread
+
+    def __init__(self, workers=None):
+        super().__init__()
+
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.pool_done.connect(self.close_pool)
+
+    def submit(
+        self,
+        job_id,
+        objpoints,
+        imgpoints,
+        shape,
+        fisheye,
+        results,
+        method="Bootstrap",
+        resamples=200,
+    ):
+        """results: calibrate results for the views, each resample starts from them."""
+        self.cancel()
+
+        _, K, D, rvecs, tvecs = results
+        index_sets = resample_sets(len(objpoints), method, resamples)
+        chunks = chunked(index_sets, max(1, len(index_sets) // (self.workers * 4)))
+        solved = {}
+
+        def chunk_done(chunk_no, params):
+            # runs on the pool's result thread, one callback at a time
+            solved[chunk_no] = params
+            done = sum(len(chunks[i]) for i in solved)
+            self.progress.emit(job_id, done, len(index_sets))
+            if len(solved) < len(chunks):
+                return
+            self.pool_done.emit(pool)
+            try:
+                summary = summarize(
+                    parameter_vector(K, D),
+                    np.concatenate([solved[i] for i in range(len(chunks))]),
+                    index_sets,
+                    len(objpoints),
+                    method,
+                )
+            except ValueError as e:
+                self.failed.emit(job_id, str(e))
+                return
+            self.finished.emit(job_id, summary)
+
+        # Qt threads are running, fork is not safe
+        self.pool = pool = multiprocessing.get_context("spawn").Pool(
+            self.workers,
+            initializer=init_resampling,
+            initargs=(objpoints, imgpoints, shape, fisheye, (K, D, rvecs, tvecs)),
+        )
+        for chunk_no, chunk in enumerate(chunks):
+            self.pool.apply_async(
+                solve_resamples,
+                (chunk,),
+                callback=lambda params, i=chunk_no: chunk_done(i, params),
+                error_callback=lambda error: self.failed.emit(job_id, str(error)),
+            )
+
+    def close_pool(self, pool):
+        # the processes hold the views and the GUI imports, don't keep them idle
+        pool.close()
+        if pool is self.pool:
+            self.pool = None
+
+    def cancel(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
@@ -0,0 +1,60 @@
+import threading
+
+from camera_calibration.defs import QtCore, Signal
+
+
+class UndistortPreviewSignals(QtCore.QObject):
+    undistorted = Signal(object, object, object)  # image display, undistortion, image
+
+
+class UndistortPreviewRunnable(QtCore.QRunnable):
+    def __init__(self, items, undistortion, cancelled):
+        super().__init__()
+
+        self.items = items
+        self.undistortion = undistortion
+        self.cancelled = cancelled
+        self.signals = UndistortPreviewSignals()
+
+    def run(self):
+        for image_display, thumbnail in self.items:
+            if self.cancelled.is_set():
+                return
+            image = self.undistortion.undistort_image(thumbnail)
+            self.signals.undistorted.emit(image_display, self.undistortion, image)
+
+
+class UndistortPreviewWorker(QtCore.QObject):
+    """Undistort gallery thumbnails on a background thread.
+
+    The maps are built once at thumbnail resolution, see ThumbnailUndistortion, so
+    each thumbnail is a single remap. Images of another size than the calibration are
+    skipped.
+    """
+
+    undistorted = Signal(object, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.cancelled = threading.Event()
+
+    def submit(self, image_displays, undistortion):
+        # thumbnails are read here, the gallery may change while the job runs
+        items = [
+            (image_display, image_display.thumbnail)
+            for image_display in image_displays
+            if image_display.shape == undistortion.image_size
+        ]
+        if not items:
+            return
+        runnable = UndistortPreviewRunnable(items, undistortion, self.cancelled)
+        runnable.signals.undistorted.connect(self.undistorted)
+        self.pool.start(runnable)
+
+    def cancel(self):
+        self.cancelled.set()
+        self.pool.clear()
+        self.cancelled = threading.Event()
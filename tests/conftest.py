@@ -0,0 +1,63 @@
+import os
+
+import cv2 as cv
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from camera_calibration.defs import QtWidgets
+
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def main_widget(qapp, tmp_path, monkeypatch):
+    """MainWidget with its settings and caches in tmp_path."""
+    from camera_calibration import main_widget as module
+
+    monkeypatch.setattr(module, "settings_file", lambda: tmp_path / "settings.ini")
+    monkeypatch.setattr(module, "points_cache_file", lambda: tmp_path / "points.sqlite")
+    win = module.MainWidget()
+    yield win
+    win.close()
+    win.points_cache.close()
+
+
+def synthetic_views(count, fisheye=False, width=1280, height=960, seed=0):
+    """(objpoints, imgpoints, K, D) of a 9x6 board seen from random poses."""
+    from camera_calibration.funcs.intrinsic_calc import make_objpoints
+
+    rng = np.random.default_rng(seed)
+    K = np.array(
+        [[0.75 * width, 0, width / 2], [0, 0.75 * width, height / 2], [0, 0, 1]]
+    )
+    D = np.array([[-0.25, 0.08, 0.001, -0.0005, -0.01]])
+    if fisheye:
+        D = np.array([[0.05], [-0.02], [0.01], [-0.002]])
+    objp = make_objpoints(9, 6)
+    objpoints, imgpoints = [], []
+    while len(objpoints) < count:
+        rvec = rng.normal(0, 0.35, 3)
+        tvec = np.array(
+            [rng.uniform(-8, 0), rng.uniform(-5.5, 0.5), rng.uniform(8, 20)]
+        )
+        if fisheye:
+            points, _ = cv.fisheye.projectPoints(objp[:, None], rvec, tvec, K, D)
+        else:
+            points, _ = cv.projectPoints(objp, rvec, tvec, K, D)
+        points = points.reshape(-1, 2)
+        if points.min() < 0 or (points > (width, height)).any():
+            continue
+        points += rng.normal(0, 0.2, points.shape)
+        objpoints.append(objp)
+        imgpoints.append(points.astype(np.float32).reshape(-1, 1, 2))
+    return objpoints, imgpoints, K, D
+
+
+@pytest.fixture
+def views():
+    return synthetic_views
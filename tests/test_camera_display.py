@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+from camera_calibration.defs import QtCore
+from camera_calibration.display_widgets.camera_display import CameraDisplay
+
+checkerboard = dict(rows=7, cols=10, pattern="Checkerboard")
+
+
+@pytest.fixture
+def camera_display(qapp):
+    # no such camera, the stream just never delivers a frame
+    widget = CameraDisplay(99, checkerboard)
+    closed = []
+    widget.closed.connect(lambda: closed.append(True))
+    yield widget
+    widget.close()
+    deadline = time.monotonic() + 10
+    while not closed and time.monotonic() < deadline:
+        QtCore.QCoreApplication.processEvents(QtCore.QEventLoop.AllEvents, 50)
+    assert closed
+
+
+def test_auto_capture_uses_the_pattern(camera_display):
+    camera_display.auto_checkbox.setChecked(True)
+    assert camera_display.overlay_checkbox.isChecked()
+    assert camera_display.keyframes.objpoints.shape == (9 * 6, 3)
+
+
+def test_pattern_change_restarts_auto_capture(camera_display):
+    camera_display.auto_checkbox.setChecked(True)
+    camera_display.set_pattern_settings(dict(rows=5, cols=8, pattern="Checkerboard"))
+    assert camera_display.auto_checkbox.isChecked()
+    assert camera_display.keyframes.objpoints.shape == (7 * 4, 3)
+    assert camera_display.detect_worker.pattern_settings == (4, 7, "Checkerboard")
@@ -0,0 +1,121 @@
+import importlib
+import json
+import logging
+
+import cv2 as cv
+import numpy as np
+import pytest
+
+from camera_calibration.cli import main
+from camera_calibration.funcs import save_calibration
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    """Synthetic views of a 9x6 checkerboard, with ground_truth.json."""
+    output = tmp_path_factory.mktemp("synth")
+    main(
+        [
+            "synth",
+            str(output),
+            "-n",
+            "12",
+            "--width",
+            "640",
+            "--height",
+            "480",
+            "--distortion",
+            "-0.2",
+            "0.05",
+            "0",
+            "0",
+            "0",
+            "-j",
+            "1",
+        ]
+    )
+    with open(output / "ground_truth.json") as f:
+        return output, json.load(f)
+
+
+def projected(calibration):
+    """Image points of rays spread over the field of view."""
+    x, y = np.meshgrid(np.linspace(-0.5, 0.5, 9), np.linspace(-0.4, 0.4, 7))
+    rays = np.stack([x.ravel(), y.ravel(), np.ones(x.size)], axis=1)
+    K, D = np.array(calibration["K"]), np.array(calibration["D"])
+    return cv.projectPoints(rays, np.zeros(3), np.zeros(3), K, D)[0].reshape(-1, 2)
+
+
+def test_batch_recovers_ground_truth(dataset, tmp_path):
+    images, truth = dataset
+    output = tmp_path / "calibration.json"
+    main(
+        [
+            "batch",
+            str(images),
+            "-o",
+            str(output),
+            "--rows",
+            "7",
+            "--cols",
+            "10",
+            "-j",
+            "2",
+        ]
+    )
+
+    with open(output) as f:
+        calibration = json.load(f)
+    np.testing.assert_allclose(calibration["K"], truth["K"], rtol=0.01, atol=2)
+    # k2 and k3 trade off against each other, compare where the points are projected
+    assert abs(projected(calibration) - projected(truth)).max() < 1
+
+
+def test_batch_output_suffix(dataset, tmp_path):
+    images, _ = dataset
+    with pytest.raises(SystemExit):
+        main(["batch", str(images), "-o", str(tmp_path / "calibration.txt")])
+
+
+def undistort(calibration, image, output, *options):
+    main(
+        ["undistort", str(calibration), str(image), "-o", str(output)]
+        + ["--map-cache", "", "-j", "1", *options]
+    )
+    return cv.imread(str(output / image.name))
+
+
+def test_undistort_crop(dataset, tmp_path):
+    images, _ = dataset
+    image = images / "00000.png"
+    calibration = images / "ground_truth.json"
+
+    full = undistort(calibration, image, tmp_path / "full")
+    cropped = undistort(calibration, image, tmp_path / "cropped", "--crop")
+    assert full.shape == (480, 640, 3)
+    assert cropped.shape[0] < 480 and cropped.shape[1] < 640
+
+
+def test_undistort_fisheye_crop_warns(dataset, tmp_path, caplog):
+    images, truth = dataset
+    calibration = tmp_path / "fisheye.json"
+    save_calibration(calibration, np.array(truth["K"]), np.zeros((4, 1)), True)
+
+    with caplog.at_level(logging.WARNING):
+        undistorted = undistort(calibration, images / "00000.png", tmp_path, "--crop")
+    assert "--crop has no effect" in caplog.text
+    assert undistorted.shape == (480, 640, 3)
+
+
+class FrozenChild(Exception):
+    pass
+
+
+@pytest.mark.parametrize("module", ["cli", "main_widget"])
+def test_entry_points_start_frozen_children_first(module, monkeypatch):
+    def freeze_support():
+        raise FrozenChild
+
+    monkeypatch.setattr("multiprocessing.freeze_support", freeze_support)
+    with pytest.raises(FrozenChild):
+        importlib.import_module(f"camera_calibration.{module}").main()
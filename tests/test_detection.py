@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from camera_calibration.funcs import SyntheticBoard, SyntheticCamera, find_points
+from camera_calibration.funcs.synthetic import generate_view
+
+
+@pytest.fixture(scope="module")
+def large_view():
+    """A 4000x3000 view of a 9x6 checkerboard and its true corners."""
+    camera = SyntheticCamera(4000, 3000)
+    board = SyntheticBoard("Checkerboard", 9, 6, square_px=200)
+    img, _, _, imgpoints = generate_view(camera, board, 0)
+    return img, imgpoints.reshape(-1, 2)
+
+
+def test_coarse_matches_full_resolution(large_view):
+    img, truth = large_view
+    _, ret, _, full = find_points(img, 9, 6)
+    _, coarse_ret, objpoints, coarse = find_points(img, 9, 6, coarse=True)
+
+    assert ret and coarse_ret
+    assert objpoints.shape == (54, 3)
+    assert coarse.shape == full.shape and coarse.dtype == np.float32
+    assert abs(coarse - full).max() < 0.05
+    assert abs(coarse.reshape(-1, 2) - truth).max() < 0.5
+
+
+def test_coarse_not_found():
+    img = np.full((3000, 4000, 3), 255, np.uint8)
+    assert find_points(img, 9, 6, coarse=True)[1:] == (False, None, None)
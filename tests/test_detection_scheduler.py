@@ -0,0 +1,43 @@
+import time
+
+import numpy as np
+
+from camera_calibration.defs import QtCore
+from camera_calibration.workers.worker_detect import DetectionScheduler
+
+settings_key = (9, 6, "Checkerboard", False)
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        QtCore.QCoreApplication.processEvents(QtCore.QEventLoop.AllEvents, 50)
+
+
+def test_submit_beyond_the_bound_does_not_block(qapp):
+    scheduler = DetectionScheduler(max_pending=4, max_threads=1)
+    found = {}
+    scheduler.points_found.connect(found.__setitem__)
+    img = np.zeros((60, 80, 3), np.uint8)
+
+    owners = [f"image {i}" for i in range(20)]
+    for owner in owners:
+        scheduler.submit(owner, settings_key, img)
+    assert scheduler.is_full()
+
+    scheduler.cancel(owners[-1])
+    wait_until(lambda: not scheduler.jobs and not scheduler.running)
+    assert set(found) == set(owners[:-1])
+    assert found[owners[0]] == (settings_key, False, None, None)
+
+
+def test_cancelled_jobs_do_not_count(qapp):
+    scheduler = DetectionScheduler(max_pending=4, max_threads=0)  # nothing runs
+    for i in range(4):
+        scheduler.submit(i, settings_key, lambda: None)
+    assert scheduler.is_full()
+
+    scheduler.cancel_all()
+    assert not scheduler.is_full()
+    assert scheduler.total == 0
@@ -0,0 +1,56 @@
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.funcs import calibrate
+
+shape = (1280, 960)
+
+
+def test_warm_start_matches_cold_start(views):
+    objpoints, imgpoints, K, D = views(20)
+    _, K_old, D_old, rvecs, tvecs = calibrate(objpoints[:18], imgpoints[:18], shape)
+
+    cold = calibrate(objpoints, imgpoints, shape)
+    # the new views have no previous pose
+    warm = calibrate(
+        objpoints,
+        imgpoints,
+        shape,
+        False,
+        K_old,
+        D_old,
+        list(rvecs) + [None, None],
+        list(tvecs) + [None, None],
+    )
+
+    np.testing.assert_allclose(warm[1], cold[1], rtol=1e-4)
+    np.testing.assert_allclose(warm[0], cold[0], rtol=1e-3)
+    np.testing.assert_allclose(warm[1], K, rtol=0.01)
+    assert len(warm[3]) == len(objpoints)
+
+
+def test_fisheye_warm_start(views):
+    objpoints, imgpoints, K, D = views(20, fisheye=True)
+    rms, K_warm, D_warm, rvecs, _ = calibrate(
+        objpoints,
+        imgpoints,
+        shape,
+        True,
+        K * [[1.02], [0.98], [1]],
+        D * 0.8,
+        fisheye_flags=cv.fisheye.CALIB_RECOMPUTE_EXTRINSIC,
+    )
+    assert rms < 0.5
+    np.testing.assert_allclose(K_warm, K, rtol=0.01, atol=1)
+    assert len(rvecs) == len(objpoints)
+
+
+def test_warm_start_keeps_the_previous_solution(views):
+    objpoints, imgpoints, _, _ = views(10)
+    _, K, D, rvecs, tvecs = calibrate(objpoints, imgpoints, shape)
+    K_before, D_before, rvec_before = K.copy(), D.copy(), rvecs[0].copy()
+
+    calibrate(objpoints, imgpoints, shape, False, K, D, rvecs, tvecs)
+    np.testing.assert_array_equal(K, K_before)
+    np.testing.assert_array_equal(D, D_before)
+    np.testing.assert_array_equal(rvecs[0], rvec_before)
@@ -0,0 +1,48 @@
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.funcs import KeyframeSelector
+from camera_calibration.funcs.intrinsic_calc import make_objpoints
+
+shape = (480, 640, 3)
+K = np.array([[640.0, 0, 320], [0, 640, 240], [0, 0, 1]])
+
+
+def view(x=0.0, y=0.0, distance=20.0, tilt=0.0):
+    """Image points of a 9x6 board centred at (x, y), tilted about its y axis."""
+    objpoints = make_objpoints(9, 6) - (4, 2.5, 0)
+    rvec = np.array([0, np.radians(tilt), 0])
+    tvec = np.array([x, y, distance], np.float64)
+    imgpoints, _ = cv.projectPoints(objpoints, rvec, tvec, K, None)
+    return imgpoints.astype(np.float32)
+
+
+def test_rejects_repeated_views():
+    selector = KeyframeSelector(9, 6, min_interval=0)
+    assert selector.consider(view(), shape)
+    assert not selector.consider(view(0.1, 0.1), shape)
+    assert selector.views == 1
+
+
+def test_accepts_new_coverage_and_poses():
+    selector = KeyframeSelector(9, 6, min_interval=0)
+    assert selector.consider(view(-8, -5), shape)
+    assert selector.consider(view(8, 5), shape)  # other corner of the image
+    assert selector.consider(view(8, 5, tilt=30), shape)  # same place, tilted
+    assert selector.consider(view(8, 5, distance=40), shape)  # further away
+    assert selector.views == 4
+    assert 0 < selector.coverage_fraction < 1
+
+
+def test_min_interval():
+    selector = KeyframeSelector(9, 6, min_interval=60)
+    assert selector.consider(view(-8, -5), shape)
+    assert not selector.consider(view(8, 5), shape)
+
+
+def test_done_after_max_views():
+    selector = KeyframeSelector(9, 6, min_interval=0, max_views=2)
+    selector.consider(view(-8, -5), shape)
+    selector.consider(view(8, 5), shape)
+    assert selector.done
+    assert not selector.consider(view(8, -5), shape)
@@ -0,0 +1,36 @@
+import threading
+import time
+
+import cv2 as cv
+
+from camera_calibration.funcs import opencv_camera
+from camera_calibration.funcs.opencv_camera import camera_backend, probe_cameras
+
+
+def test_timeout_applies_to_opening_only(monkeypatch):
+    hang = threading.Event()
+
+    def probe_camera(index, backend):
+        if index == 1:
+            hang.wait()  # a device that never opens
+        return dict(index=index, backend="TEST") if index < 3 else None
+
+    def camera_resolutions(index, backend):
+        time.sleep(0.3)  # slow, but longer than the timeout in total
+        return [(640, 480)]
+
+    monkeypatch.setattr(opencv_camera, "probe_camera", probe_camera)
+    monkeypatch.setattr(opencv_camera, "camera_resolutions", camera_resolutions)
+
+    start = time.monotonic()
+    cameras = probe_cameras(5, timeout=0.5)
+    hang.set()
+
+    assert [info["index"] for info in cameras] == [0, 2]
+    assert all(info["resolutions"] == [(640, 480)] for info in cameras)
+    assert time.monotonic() - start < 2
+
+
+def test_camera_backend():
+    assert camera_backend("DSHOW") == cv.CAP_DSHOW
+    assert camera_backend("") == camera_backend("NOPE") == cv.CAP_ANY
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from camera_calibration.funcs.points_cache import (
+    PointsCache,
+    find_points_cached,
+    image_hash,
+)
+
+imgpoints = np.arange(54 * 2, dtype=np.float32).reshape(-1, 1, 2)
+entry_size = len(PointsCache.make_key("0" * 32, 9, 6, "Checkerboard")) + 54 * 2 * 4
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PointsCache(tmp_path / "points.sqlite", max_size=3 * entry_size)
+    yield cache
+    cache.close()
+
+
+def key(i):
+    return PointsCache.make_key(f"{i:032d}", 9, 6, "Checkerboard")
+
+
+def test_put_get(cache):
+    assert cache.get(key(0), 9, 6) is None
+    cache.put(key(0), True, imgpoints)
+    cache.put(key(1), False, None)
+
+    ret, objpoints, points = cache.get(key(0), 9, 6, spacing=2)
+    assert ret
+    assert objpoints.shape == (54, 3) and objpoints[:, :2].max() == 16
+    np.testing.assert_array_equal(points, imgpoints)
+    assert cache.get(key(1), 9, 6) == (False, None, None)
+
+
+def test_settings_change_the_key():
+    keys = {
+        PointsCache.make_key("h", 9, 6, "Checkerboard"),
+        PointsCache.make_key("h", 6, 9, "Checkerboard"),
+        PointsCache.make_key("h", 9, 6, "Circles Grid"),
+        PointsCache.make_key("h", 9, 6, "Checkerboard", spacing=2),
+        PointsCache.make_key("h", 9, 6, "Checkerboard", coarse=True),
+    }
+    assert len(keys) == 5
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Distinct access times, however fast the test runs."""
+    now = iter(range(10**6))
+    monkeypatch.setattr(
+        "camera_calibration.funcs.points_cache.time.time", lambda: next(now)
+    )
+
+
+def test_evicts_least_recently_used(cache, clock):
+    for i in range(3):
+        cache.put(key(i), True, imgpoints)
+    assert cache.size == 3 * entry_size
+
+    cache.get(key(0), 9, 6)  # now 1 is the least recently used
+    cache.put(key(3), True, imgpoints)
+    assert cache.get(key(1), 9, 6) is None
+    assert all(cache.get(key(i), 9, 6) is not None for i in (0, 2, 3))
+    assert cache.size <= cache.max_size
+
+    # replacing an entry doesn't count it twice
+    cache.put(key(3), True, imgpoints)
+    assert cache.size == 3 * entry_size
+
+
+def test_size_is_restored_on_open(tmp_path):
+    path = tmp_path / "points.sqlite"
+    cache = PointsCache(path)
+    cache.put(key(0), True, imgpoints)
+    size = cache.size
+    cache.close()
+
+    cache = PointsCache(path)
+    assert cache.size == size
+    cache.clear()
+    assert cache.size == 0 and cache.get(key(0), 9, 6) is None
+    cache.close()
+
+
+def test_find_points_cached_loads_only_on_a_miss(cache):
+    img = np.zeros((60, 80, 3), np.uint8)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return img
+
+    for _ in range(2):
+        _, ret, _, _ = find_points_cached(cache, load, 9, 6, img_hash=image_hash(img))
+        assert not ret
+    assert len(loads) == 1
+
+    assert find_points_cached(cache, lambda: None, 9, 6, img_hash="missing") == (
+        None,
+        None,
+        None,
+        None,
+    )
+
+
+def test_stays_within_size_bound(tmp_path, clock):
+    cache = PointsCache(tmp_path / "points.sqlite", max_size=10 * entry_size)
+    for i in range(100):
+        cache.put(key(i), True, imgpoints)
+        assert cache.size <= cache.max_size
+    # only the most recent entries are kept
+    kept = [i for i in range(100) if cache.get(key(i), 9, 6) is not None]
+    assert kept == list(range(90, 100))
+    cache.close()
+
+
+def test_duplicate_drops_are_skipped(main_widget):
+    img = np.zeros((60, 80, 3), np.uint8)
+    assert main_widget.add_image(img, "a") is not None
+    assert main_widget.add_image(img.copy(), "b") is None
+    assert len(main_widget.image_display_items) == 1
+
+    # once removed, it can be added again
+    main_widget.remove_image(main_widget.image_display_items[0])
+    assert main_widget.add_image(img, "a") is not None
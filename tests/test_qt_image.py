@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from camera_calibration.funcs import QImageBuffer, array_to_qimage
+
+
+@pytest.mark.parametrize(
+    "shape, dtype",
+    [
+        ((4, 6), np.uint8),
+        ((4, 6), np.uint16),
+        ((4, 6, 3), np.uint8),
+        ((4, 6, 4), np.uint8),
+    ],
+)
+def test_wraps_without_copying(shape, dtype):
+    img = np.zeros(shape, dtype)
+    qimage = array_to_qimage(img)
+    assert (qimage.width(), qimage.height()) == (6, 4)
+
+    before = qimage.pixelColor(2, 1)
+    img[1, 2] = 200
+    assert qimage.pixelColor(2, 1) != before
+
+
+def test_bgr_order():
+    img = np.zeros((2, 2, 3), np.uint8)
+    img[0, 0] = (255, 0, 0)  # blue
+    color = array_to_qimage(img).pixelColor(0, 0)
+    assert (color.red(), color.green(), color.blue()) == (0, 0, 255)
+
+
+def test_unsupported_layouts():
+    img = np.zeros((8, 8, 3), np.uint8)
+    assert array_to_qimage(img[2:6, 2:6]) is None
+    assert array_to_qimage(np.zeros((8, 8), np.float32)) is None
+
+
+def test_buffer_is_reused_for_conversions():
+    buffer = QImageBuffer()
+    img = np.arange(64, dtype=np.uint8).reshape(8, 8)
+    first = buffer.wrap(img[2:6, 2:6])
+    assert first.pixelColor(0, 0).red() == img[2, 2]
+
+    second = buffer.wrap(img[4:8, 4:8])
+    assert second is first
+    assert second.pixelColor(0, 0).red() == img[4, 4]
+
+
+def test_buffer_converts_16_bit_colour_and_float():
+    buffer = QImageBuffer()
+    qimage = buffer.wrap(np.full((2, 2, 3), 256 * 100, np.uint16))
+    assert qimage.pixelColor(0, 0).red() == 100
+
+    qimage = buffer.wrap(np.array([[0, 0.5], [1, 1]], np.float32))
+    assert qimage.pixelColor(0, 0).red() == 0 and qimage.pixelColor(0, 1).red() == 255
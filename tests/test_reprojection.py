@@ -0,0 +1,143 @@
+import cv2 as cv
+import numpy as np
+import pytest
+
+from camera_calibration.funcs.intrinsic_calc import make_objpoints
+from camera_calibration.funcs import reprojection
+from camera_calibration.funcs.intrinsic_calc import checked_fisheye_flags
+from camera_calibration.funcs.reprojection import (
+    calibrate_checked,
+    calibrate_rejecting_outliers,
+    reprojection_errors,
+)
+
+K = np.array([[800.0, 0, 640], [0, 790, 480], [0, 0, 1]])
+shape = (1280, 960)
+
+
+def posed_views(fisheye, count=4, seed=0):
+    """Board views in front of the camera, with noisy image points."""
+    rng = np.random.default_rng(seed)
+    objpoints = make_objpoints(9, 6, 0.03)
+    rvecs = [rng.normal(0, 0.3, (3, 1)) for _ in range(count)]
+    tvecs = [np.array([[-0.12], [-0.08], [0.5 + 0.1 * i]]) for i in range(count)]
+    if fisheye:
+        D = np.array([0.05, -0.01, 0.002, -0.0005])
+        project = lambda r, t: cv.fisheye.projectPoints(
+            objpoints.reshape(-1, 1, 3).astype(np.float64), r, t, K, D
+        )[0]
+    else:
+        D = np.array([-0.2, 0.05, 0.001, -0.002, 0.01])
+        project = lambda r, t: cv.projectPoints(objpoints, r, t, K, D)[0]
+    imgpoints = [
+        (project(r, t) + rng.normal(0, 0.5, (len(objpoints), 1, 2))).astype(np.float32)
+        for r, t in zip(rvecs, tvecs)
+    ]
+    return [objpoints] * count, imgpoints, rvecs, tvecs, D
+
+
+def opencv_errors(objpoints, imgpoints, rvecs, tvecs, D, fisheye):
+    errors = []
+    for o, i, r, t in zip(objpoints, imgpoints, rvecs, tvecs):
+        if fisheye:
+            o = o.reshape(-1, 1, 3).astype(np.float64)
+            projected = cv.fisheye.projectPoints(o, r, t, K, D)[0]
+        else:
+            projected = cv.projectPoints(o, r, t, K, D)[0]
+        errors.append(
+            np.linalg.norm(projected.reshape(-1, 2) - i.reshape(-1, 2), axis=1)
+        )
+    return errors
+
+
+@pytest.mark.parametrize("fisheye", [False, True])
+def test_matches_opencv(fisheye):
+    objpoints, imgpoints, rvecs, tvecs, D = posed_views(fisheye)
+    view_errors, corner_errors = reprojection_errors(
+        objpoints, imgpoints, rvecs, tvecs, K, D, fisheye
+    )
+    expected = opencv_errors(objpoints, imgpoints, rvecs, tvecs, D, fisheye)
+
+    assert view_errors.shape == (len(objpoints),)
+    assert len(corner_errors) == len(objpoints)
+    for errors, reference in zip(corner_errors, expected):
+        np.testing.assert_allclose(errors, reference, atol=1e-4)
+    np.testing.assert_allclose(
+        view_errors, [np.sqrt(np.mean(e * e)) for e in expected], atol=1e-4
+    )
+
+
+@pytest.mark.parametrize("count", [8, 12, 14])
+def test_rational_and_thin_prism_models(count):
+    objpoints, imgpoints, rvecs, tvecs, _ = posed_views(False)
+    D = np.zeros(count)
+    D[:8] = [-0.2, 0.05, 0.001, -0.002, 0.01, 0.02, -0.01, 0.005]
+    D[8:] = 0.001
+    _, corner_errors = reprojection_errors(objpoints, imgpoints, rvecs, tvecs, K, D)
+    expected = opencv_errors(objpoints, imgpoints, rvecs, tvecs, D, False)
+    for errors, reference in zip(corner_errors, expected):
+        np.testing.assert_allclose(errors, reference, atol=1e-4)
+
+
+def test_views_of_different_sizes():
+    objpoints, imgpoints, rvecs, tvecs, D = posed_views(False, count=3)
+    objpoints[1], imgpoints[1] = objpoints[1][:20], imgpoints[1][:20]
+    view_errors, corner_errors = reprojection_errors(
+        objpoints, imgpoints, rvecs, tvecs, K, D
+    )
+    assert [len(e) for e in corner_errors] == [54, 20, 54]
+    expected = opencv_errors(objpoints, imgpoints, rvecs, tvecs, D, False)
+    np.testing.assert_allclose(corner_errors[1], expected[1], atol=1e-4)
+
+
+def test_fisheye_solve_keeps_the_default_flags(views):
+    objpoints, imgpoints, _, _ = views(12, fisheye=True)
+    kept, results = calibrate_checked(objpoints, imgpoints, shape, fisheye=True)
+    expected = cv.fisheye.calibrate(
+        np.expand_dims(np.asarray(objpoints), -2), imgpoints, shape, None, None
+    )
+    assert kept == list(range(12))
+    assert results[0] == expected[0]
+    np.testing.assert_array_equal(results[1], expected[1])
+
+
+def test_failed_fisheye_solve_drops_ill_conditioned_views(views, monkeypatch):
+    objpoints, imgpoints, K, D = views(8, fisheye=True)
+    calls = []
+
+    def calibrate(objpoints, imgpoints, shape, fisheye, K, D, rvecs, tvecs, flags):
+        calls.append((len(objpoints), len(rvecs), flags))
+        if len(objpoints) == 8:
+            raise cv.error(
+                "CALIB_CHECK_COND - Ill-conditioned matrix for input array 2"
+            )
+        return 0.1, K, D, rvecs, tvecs
+
+    monkeypatch.setattr(reprojection, "calibrate", calibrate)
+    rvecs = [np.full((3, 1), i, np.float64) for i in range(8)]
+    kept, results = calibrate_checked(
+        objpoints, imgpoints, shape, True, (K, D, rvecs, rvecs)
+    )
+
+    assert kept == [0, 1, 3, 4, 5, 6, 7]
+    # only the search for the views uses the check, the warm start follows the views
+    assert calls == [
+        (8, 8, 0),
+        (8, 8, checked_fisheye_flags),
+        (7, 7, checked_fisheye_flags),
+        (7, 7, 0),
+    ]
+    assert [r[0, 0] for r in results[3]] == kept
+
+
+def test_outliers_are_dropped(views):
+    objpoints, imgpoints, _, _ = views(20)
+    imgpoints[5] = imgpoints[5] + np.random.default_rng(0).normal(
+        0, 5, imgpoints[5].shape
+    ).astype(np.float32)
+
+    result = calibrate_rejecting_outliers(objpoints, imgpoints, shape, max_error=1)
+    assert 5 not in result["kept"] and len(result["kept"]) == 19
+    assert result["excluded"][5].startswith("error")
+    assert result["view_errors"].max() < 1
+    assert len(result["corner_errors"]) == 19
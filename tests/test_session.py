@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from camera_calibration.funcs.intrinsic_calc import make_objpoints
+from camera_calibration.funcs.session import load_session, save_session
+
+# as MainWidget.save_session and MainWidget.pattern_settings_key build them
+pattern_settings = dict(
+    pattern="Checkerboard", rows=7, cols=10, size=25, radius_rate=5, coarse=False
+)
+settings = dict(pattern=pattern_settings, camera_model="Standard")
+settings_key = (
+    pattern_settings["rows"] - 1,
+    pattern_settings["cols"] - 1,
+    pattern_settings["pattern"],
+    pattern_settings["coarse"],
+)
+
+
+def make_view(label, ret, rng, shape=(1280, 960)):
+    objpoints = imgpoints = None
+    if ret:
+        objpoints = make_objpoints(*settings_key[:2])
+        imgpoints = rng.uniform(0, 900, (54, 1, 2)).astype(np.float32)
+    return dict(
+        label=label,
+        source=None if label == "camera" else f"/img/{label}.png",
+        img_hash=f"hash-{label}",
+        shape=shape,
+        thumbnail=np.full((120, 160, 3), 128, np.uint8),
+        settings_key=settings_key,
+        ret=ret,
+        objpoints=objpoints,
+        imgpoints=imgpoints,
+    )
+
+
+@pytest.fixture
+def views():
+    rng = np.random.default_rng(0)
+    return [
+        make_view("a", True, rng),
+        make_view("undetected", False, rng),
+        make_view("not detected yet", None, rng),
+        make_view("camera", True, rng),
+    ]
+
+
+def assert_views_equal(loaded, views):
+    assert len(loaded) == len(views)
+    for view, expected in zip(loaded, views):
+        for name in ("label", "source", "img_hash", "shape", "settings_key", "ret"):
+            assert view[name] == expected[name]
+        assert view["thumbnail"].shape == expected["thumbnail"].shape
+        # JPEG is lossy
+        assert np.abs(view["thumbnail"].astype(int) - expected["thumbnail"]).max() < 4
+        if expected["ret"]:
+            np.testing.assert_array_equal(view["objpoints"], expected["objpoints"])
+            np.testing.assert_array_equal(view["imgpoints"], expected["imgpoints"])
+        else:
+            assert view["objpoints"] is None and view["imgpoints"] is None
+
+
+def test_round_trip_without_calibration(tmp_path, views):
+    path = tmp_path / "views.ccsession"
+    save_session(path, views, settings)
+    loaded, loaded_settings, calibration = load_session(path)
+
+    assert_views_equal(loaded, views)
+    assert loaded_settings == settings
+    assert calibration is None
+
+
+def test_empty_session(tmp_path):
+    path = tmp_path / "empty.ccsession"
+    save_session(path, [], settings)
+    assert load_session(path) == ([], settings, None)
+
+
+def test_round_trip_with_calibration(tmp_path, views):
+    rng = np.random.default_rng(1)
+    calibration = dict(
+        fisheye=False,
+        shape=(1280, 960),
+        settings_key=settings_key,
+        rms_error=0.25,
+        K=np.array([[800.0, 0, 640], [0, 800, 480], [0, 0, 1]]),
+        D=rng.normal(0, 0.1, (1, 5)),
+        # the second view used was removed from the gallery since
+        views=[0, -1, 3],
+        labels=["a", "removed", "camera"],
+        rvecs=[rng.normal(size=(3, 1)) for _ in range(3)],
+        tvecs=[rng.normal(size=(3, 1)) for _ in range(3)],
+        view_errors=[0.2, 0.3, 0.25],
+        corner_errors=[rng.uniform(0, 1, n) for n in (54, 20, 54)],
+        excluded=[("undetected", "error 3.00 px")],
+    )
+    path = tmp_path / "calibrated.ccsession"
+    save_session(path, views, settings, calibration)
+    loaded, _, loaded_calibration = load_session(path, workers=2)
+
+    assert_views_equal(loaded, views)
+    for name in ("fisheye", "shape", "settings_key", "rms_error", "views", "labels"):
+        assert loaded_calibration[name] == calibration[name]
+    assert loaded_calibration["view_errors"] == calibration["view_errors"]
+    assert loaded_calibration["excluded"] == calibration["excluded"]
+    np.testing.assert_array_equal(loaded_calibration["K"], calibration["K"])
+    np.testing.assert_array_equal(loaded_calibration["D"], calibration["D"])
+    for name in ("rvecs", "tvecs", "corner_errors"):
+        assert len(loaded_calibration[name]) == len(calibration[name])
+        for loaded_array, array in zip(loaded_calibration[name], calibration[name]):
+            assert loaded_array.shape == array.shape
+            np.testing.assert_array_equal(loaded_array, array)
+
+
+def test_settings_key_matches_main_widget(main_widget):
+    main_widget.docks["Pattern"].set_settings(pattern_settings)
+    assert main_widget.pattern_settings_key() == settings_key
+
+
+def test_unsupported_version(tmp_path):
+    path = tmp_path / "future.npz"
+    np.savez(path, header=np.frombuffer(b'{"version": 99}', np.uint8))
+    with pytest.raises(ValueError):
+        load_session(path)
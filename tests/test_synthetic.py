@@ -0,0 +1,63 @@
+import cv2 as cv
+import numpy as np
+import pytest
+
+from camera_calibration.funcs import SyntheticBoard, SyntheticCamera, find_points
+from camera_calibration.funcs.synthetic import generate_view
+
+boards = [("Checkerboard", 9, 6), ("Circles", 7, 6), ("Asymmetric Circles", 4, 11)]
+
+
+@pytest.fixture(scope="module")
+def cameras():
+    return {
+        False: SyntheticCamera(
+            1280, 960, distortion_coeffs=np.array([[-0.2, 0.05, 0, 0, 0]])
+        ),
+        True: SyntheticCamera(
+            1280,
+            960,
+            distortion_coeffs=np.array([[0.05], [0.01], [0], [0]]),
+            fisheye=True,
+        ),
+    }
+
+
+@pytest.mark.parametrize("fisheye", [False, True])
+def test_true_points_are_projections(cameras, fisheye):
+    camera = cameras[fisheye]
+    board = SyntheticBoard("Checkerboard", 9, 6, spacing=25)
+    _, rvec, tvec, imgpoints = generate_view(camera, board, 0)
+
+    objpoints = board.objpoints.reshape(-1, 1, 3).astype(np.float64)
+    K, D = camera.intrinsic_matrix, camera.distortion_coeffs
+    if fisheye:
+        expected, _ = cv.fisheye.projectPoints(objpoints, rvec, tvec, K, D)
+    else:
+        expected, _ = cv.projectPoints(objpoints, rvec, tvec, K, D)
+    assert imgpoints.shape == (54, 1, 2)
+    assert abs(imgpoints - expected).max() < 1e-3
+
+
+@pytest.mark.parametrize("pattern, nx, ny", boards)
+def test_detected_points_match_truth(cameras, pattern, nx, ny):
+    board = SyntheticBoard(pattern, nx, ny)
+    img, _, _, imgpoints = generate_view(cameras[False], board, 1)
+    _, ret, _, found = find_points(img, nx, ny, pattern)
+
+    assert ret
+    # a symmetric grid looks the same rotated by 180 degrees
+    error = min(abs(found - imgpoints).max(), abs(found[::-1] - imgpoints).max())
+    assert error < 0.5
+
+
+def test_same_seed_same_view(cameras):
+    board = SyntheticBoard()
+    first = generate_view(cameras[False], board, 2, seed=7)
+    again = generate_view(cameras[False], board, 2, seed=7)
+    other = generate_view(cameras[False], board, 2, seed=8)
+
+    for a, b in zip(first, again):
+        assert np.array_equal(a, b)
+    assert not np.array_equal(first[1], other[1])
+    assert not np.array_equal(first[0], other[0])
@@ -0,0 +1,76 @@
+import multiprocessing
+import time
+
+import numpy as np
+import pytest
+
+from camera_calibration.defs import QtCore
+from camera_calibration.funcs import calibrate
+from camera_calibration.funcs.uncertainty import resample_sets, summarize
+from camera_calibration.workers.worker_uncertainty import UncertaintyWorker
+
+
+def test_jackknife_leaves_one_view_out():
+    sets = resample_sets(4, "Jackknife")
+    assert sets == [[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]]
+
+
+def test_bootstrap_sets_are_seeded():
+    sets = resample_sets(5, "Bootstrap", resamples=10, seed=3)
+    assert len(sets) == 10 and all(len(s) == 5 for s in sets)
+    assert sets == resample_sets(5, "Bootstrap", resamples=10, seed=3)
+
+
+def test_jackknife_summary():
+    estimate = np.array([800.0, 0.1])
+    # leave-one-out estimates, view 2 pulls the first parameter up the most
+    params = np.array([[801.0, 0.1], [799.0, 0.12], [796.0, 0.1], [800.0, 0.08]])
+    n = len(params)
+    summary = summarize(
+        estimate, params, resample_sets(n, "Jackknife"), n, "Jackknife", 0.95
+    )
+
+    mean = params.mean(axis=0)
+    std = np.sqrt((n - 1) / n * ((params - mean) ** 2).sum(axis=0))
+    np.testing.assert_allclose(summary["std"], std)
+    np.testing.assert_allclose(summary["low"], estimate - 1.959964 * std, rtol=1e-6)
+    np.testing.assert_allclose(summary["high"], estimate + 1.959964 * std, rtol=1e-6)
+    np.testing.assert_allclose(summary["influence"], (estimate - params) / std)
+    assert np.argmax(np.abs(summary["influence"][:, 0])) == 2
+    assert summary["resamples"] == n and summary["failed"] == 0
+
+
+def test_failed_resamples_are_dropped():
+    estimate = np.array([1.0])
+    params = np.array([[1.0], [np.nan], [2.0], [1.5]])
+    summary = summarize(estimate, params, resample_sets(4, "Jackknife"), 4, "Jackknife")
+    assert summary["resamples"] == 3 and summary["failed"] == 1
+    # the view left out of the failed resample has no influence
+    assert summary["influence"][1, 0] == 0
+
+    with pytest.raises(ValueError):
+        summarize(estimate, params[:2], resample_sets(2, "Jackknife"), 2, "Jackknife")
+
+
+def test_worker_closes_the_pool_after_the_last_chunk(qapp, views):
+    objpoints, imgpoints, _, _ = views(8)
+    shape = (1280, 960)
+    results = calibrate(objpoints, imgpoints, shape)
+
+    worker = UncertaintyWorker(workers=1)
+    finished = []
+    worker.finished.connect(lambda job_id, summary: finished.append((job_id, summary)))
+    worker.failed.connect(lambda job_id, error: finished.append((job_id, error)))
+    worker.submit(1, objpoints, imgpoints, shape, False, results, "Jackknife")
+    pool = worker.pool
+
+    deadline = time.monotonic() + 60
+    while not finished or worker.pool is not None:
+        assert time.monotonic() < deadline, "timed out"
+        QtCore.QCoreApplication.processEvents(QtCore.QEventLoop.AllEvents, 50)
+
+    job_id, summary = finished[0]
+    assert job_id == 1 and summary["resamples"] == 8
+    # closed, not terminated, so joining returns once the processes are done
+    pool.join()
+    assert not multiprocessing.active_children()
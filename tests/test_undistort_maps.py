@@ -0,0 +1,57 @@
+import cv2 as cv
+import numpy as np
+
+from camera_calibration.funcs import (
+    ThumbnailUndistortion,
+    UndistortMapCache,
+    compute_undistort_maps,
+    undistort_maps,
+)
+
+K = np.array([[500.0, 0, 319.5], [0, 500.0, 239.5], [0, 0, 1]])
+D = np.array([[-0.2, 0.05, 0, 0, 0]])
+shape = (480, 640, 3)
+
+
+def test_maps_are_built_once_and_read_only():
+    cache = UndistortMapCache()
+    map1, map2, new_matrix, roi = cache.get(shape, K, D)
+    expected = compute_undistort_maps(shape, K, D)
+
+    assert np.array_equal(map1, expected[0]) and np.array_equal(map2, expected[1])
+    assert cache.get(shape, K, D)[0] is map1
+    assert not map1.flags.writeable
+    assert cache.get(shape, K, D * 2)[0] is not map1
+
+
+def test_evicts_least_recently_used():
+    one = compute_undistort_maps(shape, K, D)
+    cache = UndistortMapCache(max_size=2 * UndistortMapCache.nbytes(one))
+    first = cache.get(shape, K, D)
+    cache.get(shape, K, D * 2)
+    cache.get(shape, K, D)  # most recently used again
+    cache.get(shape, K, D * 3)
+
+    assert len(cache.maps) == 2 and cache.size <= cache.max_size
+    assert cache.get(shape, K, D) is first
+
+
+def test_disk_round_trip(tmp_path):
+    built = UndistortMapCache(cache_dir=tmp_path).get(shape, K, D, map_type=cv.CV_16SC2)
+    loaded = UndistortMapCache(cache_dir=tmp_path).get(
+        shape, K, D, map_type=cv.CV_16SC2
+    )
+
+    assert isinstance(loaded[0], np.memmap)
+    for a, b in zip(built[:3], loaded[:3]):
+        assert np.array_equal(a, b)
+    assert loaded[3] == built[3]
+
+
+def test_previews_stay_in_memory(main_widget, tmp_path):
+    assert undistort_maps.cache_dir is None
+    undistortion = ThumbnailUndistortion((1280, 960), K * [[2], [2], [1]], D)
+    map1, _, _, _ = undistortion.maps((96, 128, 3))
+
+    assert not isinstance(map1, np.memmap)
+    assert not any(tmp_path.rglob("*.npy"))
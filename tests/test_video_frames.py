@@ -0,0 +1,46 @@
+import cv2 as cv
+import numpy as np
+import pytest
+
+from camera_calibration.funcs import sample_video_frames
+
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+    """30 frames, a bar moving right in the first 10 and still for the rest."""
+    path = tmp_path_factory.mktemp("video") / "clip.avi"
+    writer = cv.VideoWriter(str(path), cv.VideoWriter_fourcc(*"MJPG"), 30, (320, 240))
+    for i in range(30):
+        frame = np.zeros((240, 320, 3), np.uint8)
+        x = 20 * min(i, 9)
+        frame[:, x : x + 40] = 255
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def indices(*args, **kwargs):
+    return [index for index, _ in sample_video_frames(*args, **kwargs)]
+
+
+def test_all_frames(video):
+    frames = list(sample_video_frames(video))
+    assert [index for index, _ in frames] == list(range(30))
+    assert frames[0][1].shape == (240, 320, 3)
+
+
+def test_stride(video):
+    assert indices(video, stride=7) == [0, 7, 14, 21, 28]
+
+
+def test_max_frames_spreads_over_the_clip(video):
+    assert indices(video, max_frames=3) == [0, 10, 20]
+
+
+def test_still_frames_are_skipped(video):
+    assert indices(video, min_motion=5) == list(range(10))
+
+
+def test_missing_video(tmp_path):
+    with pytest.raises(IOError):
+        next(sample_video_frames(tmp_path / "missing.avi"))
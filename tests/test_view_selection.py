@@ -0,0 +1,31 @@
+import numpy as np
+
+from camera_calibration.funcs import calibrate, select_views
+
+shape = (1280, 960)
+
+
+def test_keeps_all_views_below_the_limit(views):
+    objpoints, imgpoints, _, _ = views(5)
+    assert select_views(objpoints, imgpoints, shape, 0) == list(range(5))
+    assert select_views(objpoints, imgpoints, shape, 5) == list(range(5))
+
+
+def test_skips_redundant_views(views):
+    objpoints, imgpoints, _, _ = views(6)
+    # the first view repeated many times, as from a rig standing still
+    objpoints = objpoints + [objpoints[0]] * 30
+    imgpoints = imgpoints + [imgpoints[0] + 0.1] * 30
+
+    selected = select_views(objpoints, imgpoints, shape, 6)
+    assert len(selected) == 6
+    assert sum(i == 0 or i >= 6 for i in selected) == 1
+
+
+def test_subset_calibrates_close_to_all_views(views):
+    objpoints, imgpoints, K, _ = views(60)
+    selected = select_views(objpoints, imgpoints, shape, 15)
+    _, K_subset, _, _, _ = calibrate(
+        [objpoints[i] for i in selected], [imgpoints[i] for i in selected], shape
+    )
+    np.testing.assert_allclose(K_subset, K, rtol=0.01)